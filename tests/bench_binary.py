@@ -0,0 +1,68 @@
+"""Micro-benchmark of the binary codecs in `urest.http.binary`, comparing the
+size of each encoded payload, and the time to encode and decode it, against
+the default JSON codec (and the pure-Python JSON codec, which is the fair
+comparison on platforms without a native JSON library). For each payload the
+best time per call, over several runs, is reported.
+
+Run from the root of the repository as: `python -m tests.bench_binary`
+"""
+
+from urest.http.binary import CBOR, MSGPACK
+from urest.http.codec import JSON, JSONCodec
+
+from .bench_codec import PAYLOADS, best_time
+
+SHAPES = dict(PAYLOADS)
+SHAPES["channels"] = {f"ch{index}": 512 * index - 2048 for index in range(16)}
+SHAPES["counters"] = {"rx": 4294967295, "tx": 1099511627776, "errors": 0, "drops": 3}
+
+
+def codecs():
+    """Return the codecs to compare: the default JSON codec, the pure-Python
+    JSON codec (if different), and the binary codecs."""
+    found = [JSON]
+
+    if JSON.backend != "python":
+        found.append(JSONCodec(None))
+
+    return [*found, CBOR, MSGPACK]
+
+
+def label(codec):
+    """Return the column label for the `codec`."""
+    if codec.name == "json":
+        return f"json/{codec.backend}"
+
+    return codec.name
+
+
+def main():
+    compared = codecs()
+    names = "".join(f" {label(codec):>14}" for codec in compared)
+
+    print("Size (bytes)")
+    print(f"{'Payload':<10}{names}")
+
+    for name, state in SHAPES.items():
+        sizes = "".join(f" {len(codec.encode(state)):>14}" for codec in compared)
+        print(f"{name:<10}{sizes}")
+
+    print()
+    print("Encode (us)")
+    print(f"{'Payload':<10}{names}")
+
+    for name, state in SHAPES.items():
+        times = "".join(f" {best_time(codec.encode, state):>14.2f}" for codec in compared)
+        print(f"{name:<10}{times}")
+
+    print()
+    print("Decode (us)")
+    print(f"{'Payload':<10}{names}")
+
+    for name, state in SHAPES.items():
+        times = "".join(f" {best_time(codec.decode, codec.encode(state)):>14.2f}" for codec in compared)
+        print(f"{name:<10}{times}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Micro-benchmark of the codecs in `urest.http.codec`, comparing each JSON
+backend available on this platform against the original request body parser
+(`RESTServer._parse_data`) and response encoder of `urest.http.server`. For
+each payload the best time per call, over several runs, is reported; together
+with whether the original parser decoded the payload correctly.
+
+Run from the root of the repository as: `python -m tests.bench_codec`
+"""
+
+import json
+import timeit
+
+from urest.http.codec import JSON, JSONCodec
+
+ASCII_UPPERCASE = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")
+ASCII_DIGITS = set("0123456789")
+
+JSON_TYPE_INT = 0
+JSON_TYPE_STR = 1
+JSON_TYPE_ERROR = 1
+
+PAYLOADS = {
+    "led": {"led": 1},
+    "pwm": {"desired": 1, "current": 0},
+    "sensor": {
+        "temperature": 2150,
+        "humidity": 4375,
+        "pressure": 101325,
+        "battery": 87,
+        "uptime": 86400,
+        "status": "ok",
+    },
+    "strings": {"name": "green_led0", "colour": "green", "mode": "blink", "rate": 5},
+}
+
+ITERATIONS = 20000
+REPEAT = 5
+
+
+def legacy_decode(data):
+    """The original body parser, decoding the body to a string and then
+    walking the string character by character."""
+    return_dictionary = {}
+    parse_stack = []
+    object_start = False
+
+    token_start = False
+    token_sep = False
+
+    token_type = JSON_TYPE_INT
+    token_str = ""
+
+    for char in data.decode("utf8"):
+        if char in ["{"]:
+            object_start = True
+
+        if object_start:
+            if char in ['"']:
+                if token_start:
+                    if token_type == JSON_TYPE_STR:
+                        parse_stack.append(token_str)
+                        token_start = False
+                    else:
+                        raise ValueError("Invalid string termination")
+
+                    token_type = JSON_TYPE_INT
+                    token_sep = False
+                    token_start = False
+                    token_str = ""
+                else:
+                    token_type = JSON_TYPE_STR
+                    token_start = True
+                    token_str = ""
+
+            if char in [":"]:
+                token_sep = True
+
+            if char in [",", "}"]:
+                if token_sep:
+                    if token_type == JSON_TYPE_INT:
+                        parse_stack.append(token_str)
+
+                    value = parse_stack.pop()
+                    key = parse_stack.pop()
+
+                    if token_type == JSON_TYPE_STR:
+                        return_dictionary[key] = str(value)
+
+                    if token_type == JSON_TYPE_INT:
+                        return_dictionary[key] = int(value)
+
+                if char in ["}"]:
+                    return return_dictionary
+                else:
+                    token_type = JSON_TYPE_ERROR
+                    token_sep = False
+                    token_start = False
+
+            if object_start and ((char in ASCII_UPPERCASE) or (char in ASCII_DIGITS)):
+                token_str = token_str + str(char)
+
+    return return_dictionary
+
+
+def legacy_encode(state):
+    """The original response encoder, building the body by string
+    concatenation."""
+    response_str = "{"
+
+    for key in state:
+        if isinstance(state[key], int):
+            response_str = response_str + f'"{key.lower()}": {state[key]},'
+        else:
+            response_str = response_str + f'"{key.lower()}": "{state[key]}",'
+
+    response_str = response_str[:-1] + "}"
+    return response_str.encode()
+
+
+def codecs():
+    """Return the codecs to compare: the default codec, the pure-Python
+    codec, and (if different) `ujson`."""
+    found = [JSON]
+
+    if JSON.backend != "python":
+        found.append(JSONCodec(None))
+
+    try:
+        import ujson
+
+        if JSON.backend != "ujson":
+            found.append(JSONCodec(ujson))
+    except ImportError:
+        pass
+
+    return found
+
+
+def best_time(function, argument):
+    """Return the best time, in microseconds, for a single call of `function`
+    on the `argument`."""
+    runs = timeit.repeat(lambda: function(argument), number=ITERATIONS, repeat=REPEAT)
+    return min(runs) / ITERATIONS * 1e6
+
+
+def legacy_correct(data, state):
+    """Return 'yes' if the original parser decodes `data` to `state`."""
+    try:
+        return "yes" if legacy_decode(data) == state else "no"
+    except ValueError:
+        return "error"
+
+
+def main():
+    compared = codecs()
+    names = "".join(f" {codec.backend + ' (us)':>14}" for codec in compared)
+
+    print("Decode")
+    print(f"{'Payload':<10} {'Legacy (us)':>12} {'Legacy OK':>10}{names}")
+
+    for name, state in PAYLOADS.items():
+        data = json.dumps(state).encode()
+        legacy = best_time(legacy_decode, data)
+        times = "".join(f" {best_time(codec.decode, data):>14.2f}" for codec in compared)
+
+        print(f"{name:<10} {legacy:>12.2f} {legacy_correct(data, state):>10}{times}")
+
+    print()
+    print("Encode")
+    print(f"{'Payload':<10} {'Legacy (us)':>12} {'':>10}{names}")
+
+    for name, state in PAYLOADS.items():
+        legacy = best_time(legacy_encode, state)
+        times = "".join(f" {best_time(codec.encode, state):>14.2f}" for codec in compared)
+
+        print(f"{name:<10} {legacy:>12.2f} {'':>10}{times}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Micro-benchmark of the request line parser, comparing the bytes-level
+parser in `urest.http.request` against the original character-by-character
+parser from `urest.http.server.RESTServer.dispatch_noun`. For each request
+line the best time per call, over several runs, is reported.
+
+Run from the root of the repository as: `python -m tests.bench_request_line`
+"""
+
+import timeit
+
+from urest.http.request import parse_noun, parse_request_line
+
+ASCII_UPPERCASE = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")
+ASCII_DIGITS = set("0123456789")
+ASCII_EXTRA = set("_")
+HTTP_LONGEST_VERB = 7
+
+REQUEST_LINES = [
+    b"GET /led HTTP/1.1",
+    b"PUT /green_led0 HTTP/1.1",
+    b"GET /Temperature_Sensor_01?units=c HTTP/1.1",
+    b"DELETE /pwm0 HTTP/1.0",
+    b"GET /bank1_channel_calibration_table_offsets HTTP/1.1",
+]
+
+ITERATIONS = 100000
+REPEAT = 5
+
+
+def legacy_parse(request_uri):
+    """The original parser, decoding the request line to a string and then
+    walking the string character by character."""
+    request_string = request_uri.decode("utf8").strip()
+
+    first_space = request_string.find(" ", 0, 7)
+
+    if first_space > HTTP_LONGEST_VERB:
+        first_space = HTTP_LONGEST_VERB
+
+    verb = request_string[0:first_space].upper()
+
+    uri_root = request_string.find("/", first_space)
+
+    noun = ""
+    start_noun = False
+
+    for char in request_string[uri_root:]:
+        if (char in ASCII_UPPERCASE) or (char in ASCII_DIGITS) or (char in ASCII_EXTRA):
+            start_noun = True
+            noun = noun + str(char)
+        else:
+            if start_noun:
+                break
+
+    return (verb, noun.lower())
+
+
+def bytes_parse(request_uri):
+    """The bytes-level parser from `urest.http.request`."""
+    method_end, path_end, _target_end = parse_request_line(request_uri)
+    return (
+        request_uri[:method_end].upper(),
+        parse_noun(request_uri, method_end + 1, path_end),
+    )
+
+
+def best_time(parser, line):
+    """Return the best time, in microseconds, for a single call of `parser`
+    on the request `line`."""
+    runs = timeit.repeat(lambda: parser(line), number=ITERATIONS, repeat=REPEAT)
+    return min(runs) / ITERATIONS * 1e6
+
+
+def main():
+    print(
+        f"{'Request Line':<56} {'Legacy (us)':>12} {'Bytes (us)':>12} {'Speed-up':>9}"
+    )
+
+    for line in REQUEST_LINES:
+        legacy = best_time(legacy_parse, line)
+        current = best_time(bytes_parse, line)
+
+        print(
+            f"{line.decode():<56} {legacy:>12.3f} {current:>12.3f} {legacy / current:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Tests of the admission control of `urest.http.admission`, and of its use by
+`urest.http.server.RESTServer` to shed load with '`503 Service Unavailable`'.
+The limits are tested directly, and the server is run locally (on CPython), so
+only the standard library is needed.
+
+Run as: `py.test test_admission.py`
+"""
+
+import asyncio
+import socket
+import time
+
+import pytest
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+from urest.http.admission import READ_LANE, WRITE_LANE, AdmissionControl
+from urest.ticks import ticks_ms
+
+HOST = "127.0.0.1"
+SLOW_HANDLER_DELAY = 0.5
+
+
+class SlowNoun(APIBase):
+    """A noun taking `SLOW_HANDLER_DELAY` seconds to read its state."""
+
+    async def get_state(self):
+        await asyncio.sleep(SLOW_HANDLER_DELAY)
+        return super().get_state()
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+async def request(port, data):
+    """Send the request `data` to the server, returning the response."""
+
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(data)
+    await writer.drain()
+
+    response = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+    return response
+
+
+def test_limit_too_small():
+    """Test.
+
+    ----.
+
+    A limit which leaves no slots for writes once the `priority_slots` are
+    held back is refused, rather than shedding every write.
+
+    Expectation
+    -----------
+
+    **Pass**: `ValueError` is raised for `max_inflight=1` with the default
+    single priority slot, by the admission control and by the server.
+    """
+
+    with pytest.raises(ValueError):
+        AdmissionControl(1)
+
+    with pytest.raises(ValueError):
+        AdmissionControl(3, priority_slots=3)
+
+    with pytest.raises(ValueError):
+        RESTServer(max_inflight=1)
+
+    assert RESTServer(max_inflight=1, priority_slots=0).admission.limit == 1
+
+
+def test_lanes():
+    """Test.
+
+    ----.
+
+    Writes may not use the slots held back for reads, and the slots are
+    given back once the tickets are released.
+
+    Expectation
+    -----------
+
+    **Pass**: With three slots, one held back, two writes are admitted and a
+    third is refused; a read is still admitted, and a fourth request refused.
+    Releasing a write ticket (twice) frees a single slot, which is still held
+    back for reads; once the read is released, a write is admitted again.
+    """
+
+    control = AdmissionControl(3)
+
+    first = control.admit(b"PUT")
+    second = control.admit(b"DELETE")
+
+    assert first.lane == WRITE_LANE
+    assert control.admit(b"POST") is None
+
+    read = control.admit(b"GET")
+
+    assert read.lane == READ_LANE
+    assert control.admit(b"GET") is None
+    assert (control.inflight, control.admitted, control.shed) == (3, 3, 2)
+
+    first.release()
+    first.release()
+
+    assert control.inflight == 2
+    assert second.lane == WRITE_LANE
+    assert control.admit(b"PUT") is None
+
+    read.release()
+
+    assert control.admit(b"PUT") is not None
+
+
+def test_adaptive_limit():
+    """Test.
+
+    ----.
+
+    An adaptive limit is cut by a quarter when a handler is slower than the
+    target, at most once in each period of the target and never below the
+    floor, and grows again while handlers are faster than the target.
+
+    Expectation
+    -----------
+
+    **Pass**: The limit falls from 8 to 6, is not cut again straight away, is
+    never cut below 2, and grows by `1 / limit` after a fast handler.
+    """
+
+    control = AdmissionControl(8, target_ms=10)
+    time.sleep(0.02)
+
+    control.admit(b"GET").release(ticks_ms() - 100)
+    assert control.limit == 6
+
+    control.admit(b"GET").release(ticks_ms() - 100)
+    assert control.limit == 6
+
+    for _ in range(10):
+        time.sleep(0.02)
+        control.admit(b"GET").release(ticks_ms() - 100)
+
+    assert control.limit == 2
+
+    control.admit(b"GET").release(ticks_ms())
+    assert control.limit == 2.5
+
+
+async def shed_writes():
+    """Start a server with two slots, and make requests while a slow read holds
+    one of them. Returns the responses to a write and a read made during the
+    slow read, and to a write made once it has finished."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32, max_inflight=2, retry_after=7)
+
+    slow = SlowNoun()
+    slow.set_state({"led": 1})
+    server.register_noun("slow", slow)
+    server.register_noun("led", APIBase())
+
+    await server.start()
+
+    try:
+        held = asyncio.create_task(
+            request(port, b"GET /slow HTTP/1.1\r\nConnection: close\r\n\r\n"),
+        )
+        await asyncio.sleep(0.1)
+
+        put = b'PUT /led HTTP/1.1\r\nContent-Length: 10\r\n\r\n{"led": 1}'
+        during = await request(port, put)
+        read = await request(port, b"GET /led HTTP/1.1\r\nConnection: close\r\n\r\n")
+
+        assert (await held).startswith(b"HTTP/1.1 200 OK")
+
+        after = await request(
+            port, put.replace(b"\r\n\r\n", b"\r\nConnection: close\r\n\r\n")
+        )
+
+        assert server.admission.inflight == 0
+        assert server.admission.shed == 1
+
+        return during, read, after
+    finally:
+        await server.stop()
+
+
+def test_load_shedding():
+    """Test.
+
+    ----.
+
+    Writes beyond the limit of the server are answered at once with '`503
+    Service Unavailable`' and a `Retry-After` header field, while reads may
+    still use the held back slot.
+
+    Expectation
+    -----------
+
+    **Pass**: The write made during the slow read gets a 503 with
+    `Retry-After: 7`, and the read a 200; the write made once the server is
+    idle again gets a 200.
+    """
+
+    during, read, after = asyncio.run(shed_writes())
+
+    assert during.startswith(b"HTTP/1.1 503 Service Unavailable")
+    assert b"Retry-After: 7\r\n" in during
+    assert read.startswith(b"HTTP/1.1 200 OK")
+    assert after.startswith(b"HTTP/1.1 200 OK")
@@ -0,0 +1,176 @@
+"""Tests of the nouns whose methods are co-routines, awaited by
+`urest.http.server.RESTServer`, and of the '`504 Gateway Timeout`' responses
+to calls taking longer than the `timeout` of the noun. The server is run
+locally (on CPython), so only the standard library is needed.
+
+Run as: `py.test test_async_nouns.py`
+"""
+
+import asyncio
+import socket
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+
+HOST = "127.0.0.1"
+
+
+class AsyncNoun(APIBase):
+    """A noun whose methods are co-routines, taking `delay` seconds, and
+    recording the calls cancelled before they finished."""
+
+    def __init__(self, delay):
+        super().__init__()
+        self._state_attributes = {"led": 1}
+        self.delay = delay
+        self.cancelled = 0
+
+    async def _wait(self):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+    async def get_state(self):
+        await self._wait()
+        return super().get_state()
+
+    async def set_state(self, state_attributes):
+        await self._wait()
+        super().set_state(state_attributes)
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+def parse_responses(data):
+    """Split the `data` returned by the server into a list of the status codes
+    and bodies of the responses."""
+
+    responses = []
+
+    while data:
+        head, _, data = data.partition(b"\r\n\r\n")
+        lines = head.split(b"\r\n")
+        length = 0
+
+        for line in lines[1:]:
+            name, _, value = line.partition(b": ")
+
+            if name.lower() == b"content-length":
+                length = int(value)
+
+        body, data = data[:length], data[length:]
+        responses.append((int(lines[0].split()[1]), body))
+
+    return responses
+
+
+async def exchange(noun, requests, **kwargs):
+    """Start a local server with the `noun`, registered with `kwargs`, and send
+    the `requests` on one connection. Returns the responses."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32)
+    server.register_noun("led", noun, **kwargs)
+
+    await server.start()
+
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(
+            b"".join(requests) + b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n",
+        )
+        await writer.drain()
+
+        data = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+
+        return parse_responses(data)[:-1]
+    finally:
+        await server.stop()
+
+
+GET = b"GET /led HTTP/1.1\r\n\r\n"
+PUT = b'PUT /led HTTP/1.1\r\nContent-Length: 10\r\n\r\n{"led": 0}'
+
+
+def test_coroutines():
+    """Test.
+
+    ----.
+
+    Co-routines returned by the methods of a noun are awaited.
+
+    Expectation
+    -----------
+
+    **Pass**: The state is read, and then written.
+    """
+
+    noun = AsyncNoun(0.01)
+
+    assert asyncio.run(exchange(noun, [GET, PUT])) == [
+        (200, b'{"led": 1}'),
+        (200, b""),
+    ]
+    assert noun._state_attributes == {"led": 0}
+
+
+def test_timeout():
+    """Test.
+
+    ----.
+
+    Co-routines taking longer than the `timeout` of the noun are cancelled,
+    and the request answered with '`504 Gateway Timeout`', keeping the
+    connection open.
+
+    Expectation
+    -----------
+
+    **Pass**: The read and the write are answered with `504`, and the request
+    sent next with `404`; both calls were cancelled, and the state of the
+    noun is assumed changed by the write.
+    """
+
+    noun = AsyncNoun(2)
+    statuses = [
+        status
+        for status, _ in asyncio.run(
+            exchange(noun, [GET, PUT, b"GET /switch HTTP/1.1\r\n\r\n"], timeout=0.1),
+        )
+    ]
+
+    assert statuses == [504, 504, 404]
+    assert noun.cancelled == 2
+    assert noun.state_version == 1
+
+
+def test_timeout_inline():
+    """Test.
+
+    ----.
+
+    The `timeout` only applies to co-routines: plain methods are called as
+    they are.
+
+    Expectation
+    -----------
+
+    **Pass**: The state of an `APIBase` registered with a short timeout is
+    read as normal.
+    """
+
+    noun = APIBase()
+    noun.set_state({"led": 1})
+
+    assert asyncio.run(exchange(noun, [GET], timeout=0.001)) == [
+        (200, b'{"led": 1}'),
+    ]
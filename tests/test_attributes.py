@@ -0,0 +1,216 @@
+"""Tests of the addressing of single noun attributes as `/noun/<key>` by
+`urest.http.server.RESTServer`. The server is run locally (on CPython), so only
+the standard library is needed.
+
+Run as: `py.test test_attributes.py`
+"""
+
+import asyncio
+import json
+import socket
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+
+HOST = "127.0.0.1"
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+def parse_responses(data):
+    """Split the `data` returned by the server into a list of the status codes,
+    header fields (with lowercase names) and bodies of the responses."""
+
+    responses = []
+
+    while data:
+        head, _, data = data.partition(b"\r\n\r\n")
+        lines = head.split(b"\r\n")
+        fields = {}
+
+        for line in lines[1:]:
+            name, _, value = line.partition(b": ")
+            fields[name.lower()] = value
+
+        length = int(fields.get(b"content-length", b"0"))
+        body, data = data[:length], data[length:]
+
+        responses.append((int(lines[0].split()[1]), fields, body))
+
+    return responses
+
+
+async def exchange(requests):
+    """Start a local server with the nouns `led` and `led/sub`, send the
+    `requests` on one connection, and return the parsed responses."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32)
+
+    led = APIBase()
+    led.set_state({"led": 1, "name": "green"})
+    server.register_noun("led", led)
+
+    sub = APIBase()
+    sub.set_state({"sub": 2})
+    server.register_noun("led/sub", sub)
+
+    await server.start()
+
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(
+            b"".join(requests) + b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n"
+        )
+        await writer.drain()
+
+        data = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+
+        return parse_responses(data)[:-1]
+    finally:
+        await server.stop()
+
+
+def request(method, noun, body=None):
+    """Return a request with the `method` for the `noun`, sending the `body`
+    (if not `None`) as JSON."""
+
+    if body is None:
+        return method + b" /" + noun + b" HTTP/1.1\r\n\r\n"
+
+    data = json.dumps(body).encode()
+    return (
+        method
+        + b" /"
+        + noun
+        + b" HTTP/1.1\r\nContent-Length: "
+        + str(len(data)).encode()
+        + b"\r\n\r\n"
+        + data
+    )
+
+
+def test_get_attribute():
+    """Test.
+
+    ----.
+
+    Single attributes of a noun are read through the noun, whatever the case
+    of their name; nouns registered below a noun are preferred to attributes.
+
+    Expectation
+    -----------
+
+    **Pass**: Each attribute is returned alone as JSON, and `/led/sub` returns
+    the state of the noun `led/sub`.
+    """
+
+    responses = asyncio.run(
+        exchange(
+            [
+                request(b"GET", b"led/led"),
+                request(b"GET", b"LED/Name"),
+                request(b"GET", b"led/sub"),
+            ],
+        ),
+    )
+
+    assert [(status, json.loads(body)) for status, _, body in responses] == [
+        (200, {"led": 1}),
+        (200, {"name": "green"}),
+        (200, {"sub": 2}),
+    ]
+    assert all(
+        fields[b"content-type"] == b"application/json" for _, fields, _ in responses
+    )
+
+
+def test_missing_attribute():
+    """Test.
+
+    ----.
+
+    Attributes which the noun does not hold are not found, and the response
+    is labelled as the HTML it holds.
+
+    Expectation
+    -----------
+
+    **Pass**: `404 Not Found` is returned as `text/html`, and the connection
+    is kept open.
+    """
+
+    [(status, fields, body)] = asyncio.run(exchange([request(b"GET", b"led/zz")]))
+
+    assert status == 404
+    assert fields[b"content-type"] == b"text/html"
+    assert fields[b"connection"] == b"keep-alive"
+    assert b"Not Found" in body
+
+
+def test_put_attribute():
+    """Test.
+
+    ----.
+
+    Single attributes are written by sending the new value, under the name of
+    the attribute, in the body of a `PUT`. Other attributes are unchanged.
+
+    Expectation
+    -----------
+
+    **Pass**: The `PUT` is answered with `200 OK`, and the state of the noun
+    read afterwards holds the new value. A body without the attribute gets a
+    `400`, and the state is unchanged.
+    """
+
+    responses = asyncio.run(
+        exchange(
+            [
+                request(b"PUT", b"led/led", {"led": 0}),
+                request(b"GET", b"led"),
+                request(b"PUT", b"led/led", {"name": "red"}),
+                request(b"GET", b"led"),
+            ],
+        ),
+    )
+
+    assert [status for status, _, _ in responses] == [200, 200, 400, 200]
+    assert json.loads(responses[1][2]) == {"led": 0, "name": "green"}
+    assert json.loads(responses[3][2]) == {"led": 0, "name": "green"}
+
+
+def test_attribute_methods():
+    """Test.
+
+    ----.
+
+    Only `GET` and `PUT` may be used on a single attribute.
+
+    Expectation
+    -----------
+
+    **Pass**: `DELETE` and `POST` of an attribute are answered with `405
+    Method Not Allowed`, naming `GET, PUT` in the `Allow` header field.
+    """
+
+    responses = asyncio.run(
+        exchange(
+            [
+                request(b"DELETE", b"led/led"),
+                request(b"POST", b"led/led", {"led": 1}),
+            ],
+        ),
+    )
+
+    assert [(status, fields[b"allow"]) for status, fields, _ in responses] == [
+        (405, b"GET, PUT"),
+        (405, b"GET, PUT"),
+    ]
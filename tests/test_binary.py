@@ -0,0 +1,246 @@
+"""Tests of the CBOR and MessagePack codecs of `urest.http.binary`, which
+decode the bodies of requests from the network client. The codecs are called
+directly, so no server (and only the standard library) is needed.
+
+Run as: `py.test test_binary.py`
+"""
+
+import pytest
+
+from urest.http.binary import CBOR, MSGPACK
+from urest.http.codec import BufferedDecoder
+
+STATES = [
+    {},
+    {"led": 1},
+    {"led": 0, "name": "green_led0", "rate": -15},
+    {"unicode": "température ✓", "empty": "", "long": "x" * 300},
+    {"small": -24, "byte": 255, "short": -65536, "word": 1 << 32, "max": (1 << 64) - 1},
+    {"min": -(1 << 63), "huge": 1 << 70, "tiny": -(1 << 70)},
+]
+
+# Bodies which are well-formed, but hold items the nouns cannot be passed:
+# nested maps and arrays, byte strings, tags or extension types, and keys
+# which are not strings
+UNSUPPORTED = {
+    "cbor": [
+        "a1616180",
+        "a16161a0",
+        "a1616140",
+        "a16161c001",
+        "a1616161bf",
+        "a10101",
+        "a1f501",
+        "80",
+        "61",
+        "9f",
+    ],
+    "msgpack": [
+        "81a16190",
+        "81a16180",
+        "81a161c400",
+        "81a161d40100",
+        "810101",
+        "81c301",
+        "90",
+        "a161",
+        "c0",
+    ],
+}
+
+# Bodies which are cut short by the size they declare, or hold data after the
+# map
+MALFORMED = {
+    "cbor": [
+        "",
+        "a1",
+        "a161",
+        "a16161",
+        "a1616118",
+        "baffffffff",
+        "a16161f9",
+        "a101016161",
+        "a0a0",
+    ],
+    "msgpack": [
+        "",
+        "81",
+        "81a1",
+        "81a161",
+        "81a161cd00",
+        "dfffffffff",
+        "81a161cb00",
+        "8080",
+    ],
+}
+
+CODECS = {"cbor": CBOR, "msgpack": MSGPACK}
+
+
+@pytest.mark.parametrize("name", CODECS)
+@pytest.mark.parametrize("state", STATES)
+def test_round_trip(name, state):
+    """Test.
+
+    ----.
+
+    States encoded by the codec are decoded to the same state. Integers which
+    cannot be held in 64 bits are sent as text.
+
+    Expectation
+    -----------
+
+    **Pass**: The decoded body equals the original state, with the integers
+    beyond 64 bits as strings.
+    """
+
+    codec = CODECS[name]
+    expected = {
+        key: str(value) if value >= 1 << 64 or value < -(1 << 63) else value
+        for key, value in state.items()
+        if isinstance(value, int)
+    }
+    expected.update(
+        {key: value for key, value in state.items() if isinstance(value, str)}
+    )
+
+    assert codec.decode(codec.encode(state)) == expected
+
+
+def test_known_encodings():
+    """Test.
+
+    ----.
+
+    The codecs follow the published encodings of the standards, including the
+    items which are decoded but never encoded.
+
+    Expectation
+    -----------
+
+    **Pass**: The encodings of a small map match RFC 8949 and the MessagePack
+    specification; and booleans, `null`, floats and an indefinite-length CBOR
+    map are decoded as for JSON.
+    """
+
+    assert CBOR.encode({"a": 1}) == bytes.fromhex("a1616101")
+    assert MSGPACK.encode({"a": 1}) == bytes.fromhex("81a16101")
+
+    assert CBOR.decode(bytes.fromhex("a46174f56166f4616ef66168f93e00")) == {
+        "t": 1,
+        "f": 0,
+        "n": "",
+        "h": "1.5",
+    }
+    assert CBOR.decode(bytes.fromhex("bf6161f5ff")) == {"a": 1}
+    assert MSGPACK.decode(bytes.fromhex("83a174c3a166c2a16ec0")) == {
+        "t": 1,
+        "f": 0,
+        "n": "",
+    }
+    assert MSGPACK.decode(bytes.fromhex("81a161cb3ff8000000000000")) == {"a": "1.5"}
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_truncated(name):
+    """Test.
+
+    ----.
+
+    Bodies cut short at any point are rejected.
+
+    Expectation
+    -----------
+
+    **Pass**: Every proper prefix of an encoded state raises `ValueError`.
+    """
+
+    codec = CODECS[name]
+    data = codec.encode(STATES[4])
+
+    for end in range(len(data)):
+        with pytest.raises(ValueError):
+            codec.decode(data[:end])
+
+
+@pytest.mark.parametrize(
+    ("name", "body"), [(n, b) for n in CODECS for b in UNSUPPORTED[n]]
+)
+def test_unsupported(name, body):
+    """Test.
+
+    ----.
+
+    Nested, binary, tagged and other unsupported items are rejected, as are
+    bodies which are not a single map with string keys.
+
+    Expectation
+    -----------
+
+    **Pass**: `ValueError` is raised.
+    """
+
+    with pytest.raises(ValueError):
+        CODECS[name].decode(bytes.fromhex(body))
+
+
+@pytest.mark.parametrize(
+    ("name", "body"), [(n, b) for n in CODECS for b in MALFORMED[n]]
+)
+def test_malformed(name, body):
+    """Test.
+
+    ----.
+
+    Bodies shorter than the sizes they declare (including maps declaring
+    millions of pairs), or with data after the map, are rejected.
+
+    Expectation
+    -----------
+
+    **Pass**: `ValueError` is raised.
+    """
+
+    with pytest.raises(ValueError):
+        CODECS[name].decode(bytes.fromhex(body))
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_buffered_limits(name):
+    """Test.
+
+    ----.
+
+    Bodies fed to the stream decoder of the codec are limited in size and in
+    the number of keys.
+
+    Expectation
+    -----------
+
+    **Pass**: A body within the limits is decoded from pieces of one byte; a
+    body over `max_size` raises `ValueError` as it is fed; and a body over
+    `max_keys` raises `ValueError` when the decoder is closed.
+    """
+
+    codec = CODECS[name]
+    state = {f"k{i}": i for i in range(8)}
+    data = codec.encode(state)
+
+    decoder = codec.stream_decoder(len(data), 8)
+    assert isinstance(decoder, BufferedDecoder)
+
+    for i in range(len(data)):
+        decoder.feed(data[i : i + 1])
+
+    assert decoder.close() == state
+
+    decoder = codec.stream_decoder(len(data) - 1, 8)
+
+    with pytest.raises(ValueError):
+        decoder.feed(data)
+
+    decoder = codec.stream_decoder(len(data), 7)
+    decoder.feed(data)
+
+    with pytest.raises(ValueError):
+        decoder.close()
@@ -0,0 +1,304 @@
+"""Tests of the cache of encoded `GET` responses, `urest.http.cache`, and of the
+`state_version` of the nouns it is keyed on. The cache is tested directly, and
+the server is run locally (on CPython), so only the standard library is
+needed.
+
+Run as: `py.test test_cache.py`
+"""
+
+import asyncio
+import json
+import socket
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+from urest.http.cache import ResponseCache
+
+HOST = "127.0.0.1"
+
+
+class CountingNoun(APIBase):
+    """A noun counting the calls to `get_state()`."""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def get_state(self):
+        self.reads += 1
+        return super().get_state()
+
+
+class LiveNoun(CountingNoun):
+    """A noun whose state is read live, and so cannot be cached."""
+
+    cacheable = False
+
+
+class PlainNoun(CountingNoun):
+    """A noun overriding `set_state()`, without calling `touch()`."""
+
+    def set_state(self, state_attributes):
+        self._state_attributes = state_attributes
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+def parse_bodies(data):
+    """Split the `data` returned by the server into a list of the status codes
+    and (decoded) bodies of the responses."""
+
+    responses = []
+
+    while data:
+        head, _, data = data.partition(b"\r\n\r\n")
+        lines = head.split(b"\r\n")
+        length = 0
+
+        for line in lines[1:]:
+            name, _, value = line.partition(b": ")
+
+            if name.lower() == b"content-length":
+                length = int(value)
+
+        body, data = data[:length], data[length:]
+        responses.append((int(lines[0].split()[1]), json.loads(body) if body else None))
+
+    return responses
+
+
+def get(noun):
+    """Return a `GET` request for the `noun`."""
+
+    return b"GET /" + noun + b" HTTP/1.1\r\n\r\n"
+
+
+def put(noun, state):
+    """Return a `PUT` request setting the `state` of the `noun`."""
+
+    body = json.dumps(state).encode()
+    return (
+        b"PUT /"
+        + noun
+        + b" HTTP/1.1\r\nContent-Length: "
+        + str(len(body)).encode()
+        + b"\r\n\r\n"
+        + body
+    )
+
+
+async def send(port, requests):
+    """Send the `requests` to the server on one connection, returning the
+    parsed responses."""
+
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(b"".join(requests) + b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n")
+    await writer.drain()
+
+    data = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+
+    return parse_bodies(data)[:-1]
+
+
+async def exchange(nouns, *batches):
+    """Start a local server with the `nouns` (by name) and no coalescing of
+    reads, and send each of the `batches` of requests on a new connection.
+    Returns the server, and the parsed responses to each batch."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32, coalesce_window=0)
+
+    for name, noun in nouns.items():
+        server.register_noun(name, noun)
+
+    await server.start()
+
+    try:
+        return server, [await send(port, requests) for requests in batches]
+    finally:
+        await server.stop()
+
+
+def test_response_cache():
+    """Test.
+
+    ----.
+
+    Entries are only returned for the state version they were encoded at.
+
+    Expectation
+    -----------
+
+    **Pass**: The body is returned for its own version, and `None` for a
+    missing key or another version; the hits and misses are counted, and
+    kept when the cache is cleared.
+    """
+
+    cache = ResponseCache()
+
+    assert cache.get(b"led", 0) is None
+
+    cache.put(b"led", 1, b"{}")
+
+    assert cache.get(b"led", 1) == b"{}"
+    assert cache.get(b"led", 2) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    cache.clear()
+
+    assert cache.get(b"led", 1) is None
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_repeated_reads():
+    """Test.
+
+    ----.
+
+    Repeated reads of an unchanged noun are answered from the cache, and each
+    write is seen by the next read.
+
+    Expectation
+    -----------
+
+    **Pass**: The state is read once for three `GET` requests, and once more
+    after the `PUT`; every response holds the current state.
+    """
+
+    noun = CountingNoun()
+    noun.set_state({"led": 1})
+
+    server, [responses] = asyncio.run(
+        exchange(
+            {"led": noun},
+            [
+                get(b"led"),
+                get(b"led"),
+                get(b"led"),
+                put(b"led", {"led": 0}),
+                get(b"led"),
+            ],
+        ),
+    )
+
+    assert responses == [
+        (200, {"led": 1}),
+        (200, {"led": 1}),
+        (200, {"led": 1}),
+        (200, None),
+        (200, {"led": 0}),
+    ]
+    assert noun.reads == 2
+    assert server.cache.hits == 2
+
+
+def test_state_version():
+    """Test.
+
+    ----.
+
+    Each write moves the `state_version` of the noun on exactly once: by the
+    default methods of the noun, or by the server for nouns whose methods do
+    not call `touch()`.
+
+    Expectation
+    -----------
+
+    **Pass**: Two writes of each noun move its version on by two, and the
+    state of the noun overriding `set_state()` is still read again after each
+    write.
+    """
+
+    noun = CountingNoun()
+    plain = PlainNoun()
+    plain.set_state({"led": 1})
+
+    _, [responses] = asyncio.run(
+        exchange(
+            {"led": noun, "plain": plain},
+            [
+                put(b"led", {"led": 1}),
+                b'PUT /led/led HTTP/1.1\r\nContent-Length: 10\r\n\r\n{"led": 2}',
+                get(b"plain"),
+                put(b"plain", {"led": 2}),
+                get(b"plain"),
+                b'PUT /plain/led HTTP/1.1\r\nContent-Length: 10\r\n\r\n{"led": 3}',
+                get(b"plain"),
+            ],
+        ),
+    )
+
+    assert noun.state_version == 2
+    assert plain.state_version == 2
+    assert [body for _, body in responses if body is not None] == [
+        {"led": 1},
+        {"led": 2},
+        {"led": 3},
+    ]
+
+
+def test_not_cacheable():
+    """Test.
+
+    ----.
+
+    Nouns which are not `cacheable` are read for every request.
+
+    Expectation
+    -----------
+
+    **Pass**: The state is read for each of three `GET` requests.
+    """
+
+    noun = LiveNoun()
+    noun.set_state({"led": 1})
+
+    server, _ = asyncio.run(exchange({"led": noun}, [get(b"led")] * 3))
+
+    assert noun.reads == 3
+    assert server.cache.hits == 0
+
+
+def test_register_clears_cache():
+    """Test.
+
+    ----.
+
+    Registering a new noun under the name of an old one forgets the responses
+    cached for the old noun, even at the same state version.
+
+    Expectation
+    -----------
+
+    **Pass**: The state of the new noun is returned.
+    """
+
+    async def run():
+        port = free_port()
+        server = RESTServer(host=HOST, port=port, backlog=32)
+
+        old = CountingNoun()
+        old.set_state({"led": 1})
+        server.register_noun("led", old)
+
+        await server.start()
+
+        try:
+            first = await send(port, [get(b"led")])
+
+            new = CountingNoun()
+            new.set_state({"led": 2})
+            server.register_noun("led", new)
+
+            return first, await send(port, [get(b"led")])
+        finally:
+            await server.stop()
+
+    assert asyncio.run(run()) == ([(200, {"led": 1})], [(200, {"led": 2})])
@@ -0,0 +1,405 @@
+"""Tests of the decoding of request bodies sent with `Transfer-Encoding:
+chunked`, by `read_chunked()` in `urest.http.request` and by the server method
+`RESTServer._read_chunked_body()`. The chunks are fed to an
+`asyncio.StreamReader`, or sent to a server run locally (on CPython), so only
+the standard library is needed.
+
+Run as: `py.test test_chunked.py`
+"""
+
+import asyncio
+import socket
+
+import pytest
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+from urest.http.request import CHUNK_LINE_LIMIT, read_chunked
+
+HOST = "127.0.0.1"
+MAX_CHUNK_SIZE = 64
+MAX_SIZE = 256
+PIECE_SIZE = 16
+
+MALFORMED_SIZES = [
+    b"",
+    b" ",
+    b"xyz",
+    b"0x10",
+    b"-1",
+    b"+5",
+    b"1_0",
+    b"1 0",
+]
+
+
+def chunk(data, extension=b""):
+    """Return `data` framed as a single chunk."""
+
+    return f"{len(data):x}".encode() + extension + b"\r\n" + data + b"\r\n"
+
+
+def read(data, max_chunk_size=MAX_CHUNK_SIZE, max_size=MAX_SIZE):
+    """Read the chunked body `data` with `read_chunked()`, returning the body,
+    the pieces passed to the sink, the length returned, and the data left
+    unread in the stream."""
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+
+        pieces = []
+        length = await read_chunked(
+            reader,
+            pieces.append,
+            max_chunk_size,
+            max_size,
+            PIECE_SIZE,
+        )
+        return (b"".join(pieces), pieces, length, await reader.read())
+
+    return asyncio.run(run())
+
+
+def test_round_trip():
+    """Test.
+
+    ----.
+
+    Bodies split into chunks of various sizes, with chunk extensions and
+    trailer fields, are read back in full.
+
+    Expectation
+    -----------
+
+    **Pass**: The body is passed to the sink in order, in pieces of at most
+    the piece size; the length of the body is returned; and nothing after the
+    body is read from the stream.
+    """
+
+    body = bytes(range(200))
+    data = (
+        chunk(body[:1])
+        + chunk(body[1:64], b";name=value")
+        + chunk(body[64:100])
+        + chunk(body[100:164], b";flag")
+        + chunk(body[164:])
+        + b"0;last\r\nX-Trailer: one\r\nX-Other: two\r\n\r\n"
+        + b"GET /next HTTP/1.1\r\n"
+    )
+
+    received, pieces, length, rest = read(data)
+
+    assert received == body
+    assert length == len(body)
+    assert all(0 < len(piece) <= PIECE_SIZE for piece in pieces)
+    assert rest == b"GET /next HTTP/1.1\r\n"
+
+
+def test_empty_body():
+    """Test.
+
+    ----.
+
+    A body of only the last chunk is empty.
+
+    Expectation
+    -----------
+
+    **Pass**: The length of the body is zero, and the sink is never called.
+    """
+
+    assert read(b"0\r\n\r\n") == (b"", [], 0, b"")
+
+
+@pytest.mark.parametrize("size", MALFORMED_SIZES)
+def test_malformed_size(size):
+    """Test.
+
+    ----.
+
+    Chunk sizes which are not plain hexadecimal numbers are rejected.
+
+    Expectation
+    -----------
+
+    **Pass**: `ValueError` is raised.
+    """
+
+    with pytest.raises(ValueError):
+        read(size + b"\r\n" + b"x" * 16 + b"\r\n0\r\n\r\n")
+
+
+def test_data_longer_than_size():
+    """Test.
+
+    ----.
+
+    Chunks holding more data than their size are rejected.
+
+    Expectation
+    -----------
+
+    **Pass**: `ValueError` is raised.
+    """
+
+    with pytest.raises(ValueError):
+        read(b"2\r\nabc\r\n0\r\n\r\n")
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"1",
+        b"10\r\nshort",
+        b"3\r\nabc",
+        b"3\r\nabc\r\n",
+        b"3\r\nabc\r\n0\r\n",
+        b"3\r\nabc\r\n0\r\nX-Trailer: one",
+    ],
+)
+def test_truncated(data):
+    """Test.
+
+    ----.
+
+    Bodies cut short by the end of the stream are reported as such, wherever
+    they are cut.
+
+    Expectation
+    -----------
+
+    **Pass**: `EOFError` is raised.
+    """
+
+    with pytest.raises(EOFError):
+        read(data)
+
+
+def test_oversize():
+    """Test.
+
+    ----.
+
+    Chunks larger than `max_chunk_size`, and bodies larger than `max_size`,
+    are rejected from the chunk sizes: before the data is read.
+
+    Expectation
+    -----------
+
+    **Pass**: `ValueError` is raised for a chunk one byte over the limit, for
+    a huge chunk size, and for chunks which together pass the body limit.
+    """
+
+    with pytest.raises(ValueError):
+        read(chunk(b"x" * (MAX_CHUNK_SIZE + 1)) + b"0\r\n\r\n")
+
+    with pytest.raises(ValueError):
+        read(b"f" * 64 + b"\r\n")
+
+    with pytest.raises(ValueError):
+        read(chunk(b"x" * MAX_CHUNK_SIZE) * 5 + b"0\r\n\r\n")
+
+    assert read(chunk(b"x" * MAX_CHUNK_SIZE) * 4 + b"0\r\n\r\n")[2] == MAX_SIZE
+
+
+def test_long_lines():
+    """Test.
+
+    ----.
+
+    Size lines and trailer fields longer than `CHUNK_LINE_LIMIT` are
+    rejected.
+
+    Expectation
+    -----------
+
+    **Pass**: `ValueError` is raised.
+    """
+
+    with pytest.raises(ValueError):
+        read(b"1;" + b"x" * CHUNK_LINE_LIMIT + b"\r\na\r\n0\r\n\r\n")
+
+    with pytest.raises(ValueError):
+        read(b"0\r\nX-Trailer: " + b"x" * CHUNK_LINE_LIMIT + b"\r\n\r\n")
+
+
+def test_sink_error():
+    """Test.
+
+    ----.
+
+    A `ValueError` raised by the sink stops the reading of the body.
+
+    Expectation
+    -----------
+
+    **Pass**: The `ValueError` is passed to the caller, and the rest of the
+    body is left in the stream.
+    """
+
+    def sink(data):
+        msg = "Invalid body"
+        raise ValueError(msg)
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(chunk(b"abc") + b"0\r\n\r\n")
+        reader.feed_eof()
+
+        with pytest.raises(ValueError):
+            await read_chunked(reader, sink, MAX_CHUNK_SIZE, MAX_SIZE, PIECE_SIZE)
+
+        return await reader.read()
+
+    assert asyncio.run(run()) == b"\r\n0\r\n\r\n"
+
+
+def read_body(data, **kwargs):
+    """Read the chunked JSON body `data` with the `_read_chunked_body()`
+    method of a server created with `kwargs`, returning the decoded body and
+    whether the body was read in full."""
+
+    server = RESTServer(**kwargs)
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+
+        return await server._read_chunked_body(reader, server.codecs[0])
+
+    return asyncio.run(run())
+
+
+def test_server_body():
+    """Test.
+
+    ----.
+
+    JSON bodies sent in chunks are decoded by the server, whatever the split.
+
+    Expectation
+    -----------
+
+    **Pass**: The decoded body is returned, with the body marked as read in
+    full; and an empty body is decoded as an empty object.
+    """
+
+    body = b'{"led": 1, "name": "green"}'
+    data = b"".join(chunk(body[i : i + 3]) for i in range(0, len(body), 3))
+
+    assert read_body(data + b"0\r\n\r\n") == ({"led": 1, "name": "green"}, True)
+    assert read_body(b"0\r\n\r\n") == ({}, True)
+
+
+def test_server_invalid_body():
+    """Test.
+
+    ----.
+
+    Invalid JSON, bad framing, and oversize bodies are rejected by the server.
+
+    Expectation
+    -----------
+
+    **Pass**: A body found to be incomplete once read in full gives no body,
+    with the body marked as read. JSON found to be invalid as it arrives, bad
+    framing, or a body over `max_body_size`, gives no body with the body
+    marked as not read, so that the connection is closed.
+    """
+
+    assert read_body(chunk(b'{"led": [1]}') + b"0\r\n\r\n") == (None, False)
+    assert read_body(chunk(b'{"led": 1') + b"0\r\n\r\n") == (None, True)
+    assert read_body(b"zz\r\n{}\r\n0\r\n\r\n") == (None, False)
+    assert read_body(
+        chunk(b'{"a": "' + b"x" * 60 + b'"}') + b"0\r\n\r\n", max_body_size=32
+    ) == (
+        None,
+        False,
+    )
+
+
+def test_server_truncated_body():
+    """Test.
+
+    ----.
+
+    Bodies cut short by the client are reported to the server.
+
+    Expectation
+    -----------
+
+    **Pass**: `EOFError` is raised.
+    """
+
+    with pytest.raises(EOFError):
+        read_body(chunk(b'{"led": 1}'))
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+async def disconnect(data):
+    """Start a local server, send it the start of a request in `data` and then
+    close the connection. Returns the data sent back, the connection counts of
+    the server, and any errors reported to the event loop."""
+
+    errors = []
+    asyncio.get_running_loop().set_exception_handler(
+        lambda loop, context: errors.append(context),
+    )
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32)
+    server.register_noun("led", APIBase())
+
+    await server.start()
+
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(data)
+        writer.write_eof()
+
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        await asyncio.sleep(0.1)
+
+        return response, server.connections, errors
+    finally:
+        await server.stop()
+
+
+def test_client_disconnect():
+    """Test.
+
+    ----.
+
+    Clients closing the connection part way through a chunked body are closed
+    quietly by the server.
+
+    Expectation
+    -----------
+
+    **Pass**: The connection is closed without a response, and counted as
+    closed; and no error is reported to the event loop.
+    """
+
+    response, connections, errors = asyncio.run(
+        disconnect(
+            b"PUT /led HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+            + chunk(b'{"led": ')
+            + b"10\r\n1",
+        ),
+    )
+
+    assert response == b""
+    assert (connections.open, connections.closed) == (0, 1)
+    assert errors == []
@@ -0,0 +1,480 @@
+"""Tests of the coalescing of reads by `urest.http.coalesce.SingleFlight`, and
+of writes by `urest.http.coalesce.WriteCoalescer`; and of their use by
+`urest.http.server.RESTServer` to share a single read of a noun between
+concurrent `GET` requests, and to apply only the newest of a burst of `PUT`
+requests. The coalescers are tested directly, and the server is run locally (on
+CPython), so only the standard library is needed.
+
+Run as: `py.test test_coalesce.py`
+"""
+
+import asyncio
+import socket
+
+import pytest
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+from urest.http.coalesce import SingleFlight, WriteCoalescer
+
+HOST = "127.0.0.1"
+HANDLER_DELAY = 0.2
+
+
+class Reader:
+    """A co-routine returning `result` after a moment, counting its calls."""
+
+    def __init__(self, result="state", error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self, *args):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+
+        if self.error is not None:
+            raise self.error
+
+        return (self.result, *args)
+
+
+def run_flights(flights, calls):
+    """Run each of the `calls` (tuples of the key, version and function) on
+    the `flights` at once, returning the results (or exceptions)."""
+
+    async def run():
+        return await asyncio.gather(
+            *(flights.run(key, version, function) for key, version, function in calls),
+            return_exceptions=True,
+        )
+
+    return asyncio.run(run())
+
+
+def test_shared():
+    """Test.
+
+    ----.
+
+    Concurrent calls for the same key and version share a single call.
+
+    Expectation
+    -----------
+
+    **Pass**: The function is called once for three callers, who all get its
+    result; and is called again for another key, and another version.
+    """
+
+    flights = SingleFlight(0)
+    reader = Reader()
+
+    results = run_flights(
+        flights,
+        [(b"led", 1, reader), (b"led", 1, reader), (b"led", 1, reader)],
+    )
+
+    assert results == [("state",)] * 3
+    assert (reader.calls, flights.calls, flights.shared) == (1, 1, 2)
+
+    run_flights(
+        flights,
+        [(b"led", 1, reader), (b"led", 2, reader), (b"pwm", 1, reader)],
+    )
+
+    assert reader.calls == 4
+
+
+@pytest.mark.parametrize(("window", "calls"), [(0, 2), (1000, 1)])
+def test_window(window, calls):
+    """Test.
+
+    ----.
+
+    Finished results are shared with later callers within the `window`, but
+    only at the same version.
+
+    Expectation
+    -----------
+
+    **Pass**: A later call is answered from the finished call with a window of
+    one second, but not with a window of zero; a later call at a new version
+    always makes a new call.
+    """
+
+    flights = SingleFlight(window)
+    reader = Reader()
+
+    run_flights(flights, [(b"led", 1, reader)])
+    run_flights(flights, [(b"led", 1, reader)])
+
+    assert reader.calls == calls
+
+    run_flights(flights, [(b"led", 2, reader)])
+
+    assert reader.calls == calls + 1
+
+
+def test_not_kept():
+    """Test.
+
+    ----.
+
+    Exceptions are raised to every caller sharing the call, but neither
+    exceptions nor results of `None` are kept for later callers; and cleared
+    flights are never shared.
+
+    Expectation
+    -----------
+
+    **Pass**: Both callers of the failing call get its exception, and the next
+    call is made again; as is each call returning `None`, and the call after
+    `clear()`.
+    """
+
+    flights = SingleFlight(1000)
+    failing = Reader(error=KeyError("led"))
+
+    results = run_flights(flights, [(b"led", 1, failing), (b"led", 1, failing)])
+
+    assert all(isinstance(result, KeyError) for result in results)
+
+    run_flights(flights, [(b"led", 1, failing)])
+
+    assert failing.calls == 2
+
+    missing = []
+
+    async def find():
+        missing.append(None)
+        await asyncio.sleep(0.01)
+        return None
+
+    assert run_flights(flights, [(b"x", 1, find), (b"x", 1, find)]) == [None] * 2
+    assert run_flights(flights, [(b"x", 1, find)]) == [None]
+    assert len(missing) == 2
+
+    reader = Reader()
+    run_flights(flights, [(b"led", 1, reader)])
+    flights.clear()
+    run_flights(flights, [(b"led", 1, reader)])
+
+    assert reader.calls == 2
+
+
+def test_cancelled():
+    """Test.
+
+    ----.
+
+    Callers waiting for a call which is cancelled make a call of their own.
+
+    Expectation
+    -----------
+
+    **Pass**: The waiting caller gets the result of a second call.
+    """
+
+    async def run():
+        flights = SingleFlight(0)
+        reader = Reader()
+
+        first = asyncio.create_task(flights.run(b"led", 1, reader))
+        await asyncio.sleep(0)
+
+        second = asyncio.create_task(flights.run(b"led", 1, reader))
+        await asyncio.sleep(0)
+
+        first.cancel()
+
+        return await second, reader.calls
+
+    assert asyncio.run(run()) == (("state",), 2)
+
+
+class SlowNoun(APIBase):
+    """A noun read live, taking `HANDLER_DELAY` seconds for each read, and
+    counting the reads."""
+
+    cacheable = False
+
+    def __init__(self):
+        super().__init__()
+        self._state_attributes = {"led": 1}
+        self.reads = 0
+
+    async def get_state(self):
+        self.reads += 1
+        await asyncio.sleep(HANDLER_DELAY)
+        return super().get_state()
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+async def request(port):
+    """Read the noun on a new connection, returning the body of the
+    response."""
+
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(b"GET /led HTTP/1.1\r\nConnection: close\r\n\r\n")
+    await writer.drain()
+
+    response = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+
+    return response.partition(b"\r\n\r\n")[2]
+
+
+@pytest.mark.parametrize("window", [0, 100])
+def test_server_reads(window):
+    """Test.
+
+    ----.
+
+    Concurrent reads of a noun share a single call of the noun, whatever the
+    `coalesce_window` of the server.
+
+    Expectation
+    -----------
+
+    **Pass**: Three concurrent requests all get the state, which is read
+    once.
+    """
+
+    async def run():
+        port = free_port()
+        server = RESTServer(host=HOST, port=port, backlog=32, coalesce_window=window)
+
+        noun = SlowNoun()
+        server.register_noun("led", noun)
+
+        await server.start()
+
+        try:
+            bodies = await asyncio.gather(*(request(port) for _ in range(3)))
+            return bodies, noun.reads
+        finally:
+            await server.stop()
+
+    assert asyncio.run(run()) == ([b'{"led": 1}'] * 3, 1)
+
+
+class Writer:
+    """A co-routine recording the states written, optionally raising `error`."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.written = []
+
+    async def __call__(self, state):
+        await asyncio.sleep(0.01)
+
+        if self.error is not None:
+            raise self.error
+
+        self.written.append(state)
+
+
+def run_writes(writes, states, delay=0.01):
+    """Put each of the `states` to the `writes`, starting each write `delay`
+    seconds after the last. Returns the results (or exceptions) of the
+    writes."""
+
+    async def run():
+        writer = Writer()
+        tasks = []
+
+        for state in states:
+            tasks.append(asyncio.create_task(writes.put(writer, state)))
+            await asyncio.sleep(delay)
+
+        return await asyncio.gather(*tasks, return_exceptions=True), writer
+
+    return asyncio.run(run())
+
+
+def test_newest_write():
+    """Test.
+
+    ----.
+
+    Only the newest of the writes made within the window is applied.
+
+    Expectation
+    -----------
+
+    **Pass**: Of three writes, only the last is applied and reported as
+    applied; the other two are counted as superseded.
+    """
+
+    writes = WriteCoalescer(200)
+    results, writer = run_writes(writes, [1, 2, 3])
+
+    assert results == [False, False, True]
+    assert writer.written == [3]
+    assert (writes.applied, writes.superseded) == (1, 2)
+
+
+def test_windows():
+    """Test.
+
+    ----.
+
+    Writes made after the window has closed open a new window.
+
+    Expectation
+    -----------
+
+    **Pass**: Two writes made further apart than the window are both
+    applied.
+    """
+
+    writes = WriteCoalescer(20)
+    results, writer = run_writes(writes, [1, 2], delay=0.2)
+
+    assert results == [True, True]
+    assert writer.written == [1, 2]
+
+
+def test_flush():
+    """Test.
+
+    ----.
+
+    Flushing closes the open window at once, and waits for the newest write
+    to be applied.
+
+    Expectation
+    -----------
+
+    **Pass**: The write is applied long before its ten second window closes.
+    """
+
+    async def run():
+        writes = WriteCoalescer(10000)
+        writer = Writer()
+
+        task = asyncio.create_task(writes.put(writer, 1))
+        await asyncio.sleep(0)
+
+        await asyncio.wait_for(writes.flush(), 1)
+
+        return writer.written, await task
+
+    assert asyncio.run(run()) == ([1], True)
+
+
+def test_write_error():
+    """Test.
+
+    ----.
+
+    Exceptions raised by the newest write are raised to every write of the
+    window.
+
+    Expectation
+    -----------
+
+    **Pass**: Both writes raise the `ValueError`, and nothing is applied.
+    """
+
+    async def run():
+        writes = WriteCoalescer(50)
+        writer = Writer(ValueError("led"))
+
+        results = await asyncio.gather(
+            writes.put(writer, 1),
+            writes.put(writer, 2),
+            return_exceptions=True,
+        )
+
+        return results, writes.applied
+
+    results, applied = asyncio.run(run())
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert applied == 0
+
+
+async def put(port, state):
+    """Write the `state` of the noun on a new connection, returning the status
+    code and the `X-Coalesced` header field (if any) of the response."""
+
+    reader, writer = await asyncio.open_connection(HOST, port)
+    body = b'{"led": ' + str(state).encode() + b"}"
+    writer.write(
+        b"PUT /led HTTP/1.1\r\nConnection: close\r\nContent-Length: "
+        + str(len(body)).encode()
+        + b"\r\n\r\n"
+        + body,
+    )
+    await writer.drain()
+
+    response = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+
+    head = response.partition(b"\r\n\r\n")[0].split(b"\r\n")
+    fields = dict(line.split(b": ", 1) for line in head[1:])
+
+    return int(head[0].split()[1]), fields.get(b"X-Coalesced")
+
+
+class CountingNoun(APIBase):
+    """A noun counting the calls to `set_state()`."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def set_state(self, state_attributes):
+        self.writes += 1
+        super().set_state(state_attributes)
+
+
+def test_server_writes():
+    """Test.
+
+    ----.
+
+    Bursts of `PUT` requests for a noun registered with a `write_window` only
+    apply the newest state.
+
+    Expectation
+    -----------
+
+    **Pass**: All three requests are answered with `200`, the first two also
+    with `X-Coalesced: superseded`; the noun is written once, with the state
+    of the last request.
+    """
+
+    async def run():
+        port = free_port()
+        server = RESTServer(host=HOST, port=port, backlog=32)
+
+        noun = CountingNoun()
+        server.register_noun("led", noun, write_window=300)
+
+        await server.start()
+
+        try:
+            tasks = []
+
+            for state in (1, 2, 3):
+                tasks.append(asyncio.create_task(put(port, state)))
+                await asyncio.sleep(0.05)
+
+            return await asyncio.gather(*tasks), noun
+        finally:
+            await server.stop()
+
+    results, noun = asyncio.run(run())
+
+    assert results == [(200, b"superseded"), (200, b"superseded"), (200, None)]
+    assert noun.writes == 1
+    assert noun.get_state() == {"led": 3}
@@ -0,0 +1,204 @@
+"""Tests of the JSON codec, `urest.http.codec.JSONCodec`, with both the native
+JSON library and the pure-Python implementation; and of the
+'`400 Bad Request`' responses of `urest.http.server.RESTServer` to bodies the
+codec cannot decode. The codec is tested directly, and the server is run
+locally (on CPython), so only the standard library is needed.
+
+Run as: `py.test test_codec.py`
+"""
+
+import asyncio
+import json
+import socket
+
+import pytest
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+from urest.http.codec import JSONCodec
+
+HOST = "127.0.0.1"
+
+CODECS = [JSONCodec(json), JSONCodec()]
+
+INVALID_BODIES = [
+    b"",
+    b"{",
+    b'{"led": 1',
+    b'{"led" 1}',
+    b'{"led": 1,}',
+    b'{"led": tru}',
+    b'{"led": "1}',
+    b"[1, 2]",
+    b'"led"',
+    b"1",
+    b'{"led": [1]}',
+    b'{"led": {"a": 1}}',
+    b'{"led": 1} x',
+    b"{" + b'"a": {' * 5000 + b"}" * 5001,
+    b'{"led": "\xff"}',
+]
+
+
+@pytest.mark.parametrize("codec", CODECS, ids=lambda codec: codec.backend)
+def test_encode(codec):
+    """Test.
+
+    ----.
+
+    States are encoded with lowercase keys, `bool` values as integers, and any
+    value other than an `int` or `str` as a string.
+
+    Expectation
+    -----------
+
+    **Pass**: The encoded state decodes to the converted values.
+    """
+
+    encoded = codec.encode(
+        {"LED": True, "level": 3, "name": 'a "b"\n', "ratio": 1.5, "none": None},
+    )
+
+    assert json.loads(encoded) == {
+        "led": 1,
+        "level": 3,
+        "name": 'a "b"\n',
+        "ratio": "1.5",
+        "none": "None",
+    }
+
+
+@pytest.mark.parametrize("codec", CODECS, ids=lambda codec: codec.backend)
+def test_decode(codec):
+    """Test.
+
+    ----.
+
+    Bodies are decoded with `true`, `false` and integers as `int`, `null` as
+    an empty string, and other numbers as strings.
+
+    Expectation
+    -----------
+
+    **Pass**: The decoded body holds the converted values.
+    """
+
+    assert codec.decode(
+        b'{"a": true, "b": false, "c": -12, "d": null, "e": 1.5, "f": "\\u00e9"}',
+    ) == {"a": 1, "b": 0, "c": -12, "d": "", "e": "1.5", "f": "é"}
+
+
+@pytest.mark.parametrize("body", INVALID_BODIES, ids=range(len(INVALID_BODIES)))
+@pytest.mark.parametrize("codec", CODECS, ids=lambda codec: codec.backend)
+def test_invalid(codec, body):
+    """Test.
+
+    ----.
+
+    Bodies which are not a single JSON object of name/value pairs are
+    rejected, whatever the reason.
+
+    Expectation
+    -----------
+
+    **Pass**: `ValueError` is raised.
+    """
+
+    with pytest.raises(ValueError):
+        codec.decode(body)
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+def parse_statuses(data):
+    """Split the `data` returned by the server into a list of the status codes
+    of the responses."""
+
+    statuses = []
+
+    while data:
+        head, _, data = data.partition(b"\r\n\r\n")
+        lines = head.split(b"\r\n")
+        length = 0
+
+        for line in lines[1:]:
+            name, _, value = line.partition(b": ")
+
+            if name.lower() == b"content-length":
+                length = int(value)
+
+        data = data[length:]
+        statuses.append(int(lines[0].split()[1]))
+
+    return statuses
+
+
+def put(body):
+    """Return a `PUT` request for the noun, with the `body`."""
+
+    return (
+        b"PUT /led HTTP/1.1\r\nContent-Length: "
+        + str(len(body)).encode()
+        + b"\r\n\r\n"
+        + body
+    )
+
+
+async def exchange(requests):
+    """Start a local server with a single noun, and send the `requests` on one
+    connection. Returns the status codes of the responses, and the state of the
+    noun once the connection is closed."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32)
+
+    noun = APIBase()
+    noun.set_state({"led": 1})
+    server.register_noun("led", noun)
+
+    await server.start()
+
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(
+            b"".join(requests) + b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n",
+        )
+        await writer.drain()
+
+        data = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+
+        return parse_statuses(data)[:-1], noun.get_state()
+    finally:
+        await server.stop()
+
+
+def test_server_invalid_bodies():
+    """Test.
+
+    ----.
+
+    Requests whose bodies cannot be decoded are answered with '`400 Bad
+    Request`', without calling the noun, and the connection is kept open.
+
+    Expectation
+    -----------
+
+    **Pass**: Each invalid body is answered with `400`, and the valid body
+    sent last with `200`; only the valid body changes the state of the noun.
+    """
+
+    bodies = [body for body in INVALID_BODIES if 0 < len(body) < 1024]
+
+    statuses, state = asyncio.run(
+        exchange([put(body) for body in bodies] + [put(b'{"led": 0}')]),
+    )
+
+    assert statuses == [400] * len(bodies) + [200]
+    assert state == {"led": 0}
@@ -0,0 +1,277 @@
+"""Tests of the compression of `GET` responses by
+`urest.http.server.RESTServer`: the compressed formats of
+`urest.http.compress`, the choice of coding from the `Accept-Encoding` header
+field, and the compressed (and cached) bodies sent by the server. The server is
+run locally (on CPython), so only the standard library is needed.
+
+Run as: `py.test test_compress.py`
+"""
+
+import asyncio
+import gzip
+import json
+import socket
+import zlib
+
+import pytest
+
+import urest.http.server
+from urest.api.base import APIBase
+from urest.http import RESTServer
+from urest.http.compress import CODINGS, compress
+from urest.http.request import negotiate_coding
+
+HOST = "127.0.0.1"
+
+STATE = {f"sensor_{index}": "reading" * 3 for index in range(20)}
+
+
+def test_compress():
+    """Test.
+
+    ----.
+
+    Bodies are compressed in the `gzip` and `zlib` formats.
+
+    Expectation
+    -----------
+
+    **Pass**: Both codings are available on CPython, and the compressed
+    bodies decompress to the original.
+    """
+
+    data = json.dumps(STATE).encode()
+
+    assert CODINGS == ("gzip", "deflate")
+    assert gzip.decompress(compress(data, "gzip")) == data
+    assert zlib.decompress(compress(data, "deflate")) == data
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "coding"),
+    [
+        (None, None),
+        ("", None),
+        ("gzip", "gzip"),
+        ("deflate", "deflate"),
+        ("deflate, gzip", "deflate"),
+        ("GZIP;q=0.5, deflate;q=0.8", "deflate"),
+        ("*", "gzip"),
+        ("br, identity", None),
+        ("gzip;q=0", None),
+        ("gzip;q=x, deflate", "deflate"),
+    ],
+)
+def test_negotiate_coding(accept_encoding, coding):
+    """Test.
+
+    ----.
+
+    The coding with the highest quality is chosen, with ties going to the
+    coding listed first; codings the server cannot send, or with a quality of
+    zero, are never chosen.
+
+    Expectation
+    -----------
+
+    **Pass**: The coding chosen is as expected.
+    """
+
+    assert negotiate_coding(accept_encoding, ("gzip", "deflate")) == coding
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+def parse_responses(data):
+    """Split the `data` returned by the server into a list of the responses,
+    each as a dictionary of the header fields (with lowercase names), holding
+    the body under the name `b"body"`."""
+
+    responses = []
+
+    while data:
+        head, _, data = data.partition(b"\r\n\r\n")
+        fields = {b"status": int(head.split(b" ", 2)[1])}
+
+        for line in head.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b": ")
+            fields[name.lower()] = value
+
+        length = int(fields.get(b"content-length", b"0"))
+        fields[b"body"], data = data[:length], data[length:]
+        responses.append(fields)
+
+    return responses
+
+
+async def send(port, requests):
+    """Send the `requests` to the server on one connection, returning the
+    parsed responses."""
+
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(b"".join(requests) + b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n")
+    await writer.drain()
+
+    data = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+
+    return parse_responses(data)[:-1]
+
+
+async def exchange(*batches, **kwargs):
+    """Start a local server created with `kwargs`, with the nouns `sensors`
+    (holding `STATE`) and `led`, and send each of the `batches` of requests on
+    a new connection. Each batch is a function taking the responses to the
+    earlier batches, and returning the requests to send. Returns the responses
+    to the last batch."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32, **kwargs)
+
+    sensors = APIBase()
+    sensors.set_state(STATE)
+    server.register_noun("sensors", sensors)
+
+    led = APIBase()
+    led.set_state({"led": 1})
+    server.register_noun("led", led)
+
+    await server.start()
+
+    try:
+        responses = []
+
+        for batch in batches:
+            responses = await send(port, batch(responses))
+
+        return responses
+    finally:
+        await server.stop()
+
+
+def get(noun, accept_encoding=None, if_none_match=None):
+    """Return a `GET` request for the `noun`, with the optional header fields."""
+
+    request = b"GET /" + noun + b" HTTP/1.1\r\n"
+
+    if accept_encoding is not None:
+        request += b"Accept-Encoding: " + accept_encoding + b"\r\n"
+
+    if if_none_match is not None:
+        request += b"If-None-Match: " + if_none_match + b"\r\n"
+
+    return request + b"\r\n"
+
+
+def test_server_compress(monkeypatch):
+    """Test.
+
+    ----.
+
+    Large bodies are compressed with the coding accepted by the client, once
+    for each coding and state version; small bodies, and bodies for clients
+    not accepting a coding, are sent as they are.
+
+    Expectation
+    -----------
+
+    **Pass**: The bodies decompress to the state, and carry the
+    `Content-Encoding` and a tag naming the coding; the body is only
+    compressed once for each of the two codings; the other bodies are not
+    compressed, and every response carries `Vary`.
+    """
+
+    calls = []
+
+    def counting_compress(data, coding):
+        calls.append(coding)
+        return compress(data, coding)
+
+    monkeypatch.setattr(urest.http.server, "compress", counting_compress)
+
+    first, again, deflated, plain, small = asyncio.run(
+        exchange(
+            lambda _: [
+                get(b"sensors", b"gzip"),
+                get(b"sensors", b"gzip"),
+                get(b"sensors", b"deflate"),
+                get(b"sensors"),
+                get(b"led", b"gzip"),
+            ],
+        ),
+    )
+
+    assert calls == ["gzip", "deflate"]
+
+    for response in (first, again):
+        assert response[b"content-encoding"] == b"gzip"
+        assert response[b"etag"].endswith(b'-gzip"')
+        assert json.loads(gzip.decompress(response[b"body"])) == STATE
+
+    assert deflated[b"content-encoding"] == b"deflate"
+    assert json.loads(zlib.decompress(deflated[b"body"])) == STATE
+
+    for response in (plain, small):
+        assert b"content-encoding" not in response
+        assert not response[b"etag"].endswith(b'-gzip"')
+
+    assert json.loads(plain[b"body"]) == STATE
+
+    for response in (first, again, deflated, plain, small):
+        assert b"Accept-Encoding" in response[b"vary"]
+
+
+def test_server_not_modified():
+    """Test.
+
+    ----.
+
+    Requests naming the tag of the compressed body are answered with
+    '`304 Not Modified`'.
+
+    Expectation
+    -----------
+
+    **Pass**: The `304` response carries the tag of the compressed body.
+    """
+
+    first, second = asyncio.run(
+        exchange(
+            lambda _: [get(b"sensors", b"gzip")],
+            lambda responses: [
+                get(b"sensors", b"gzip"),
+                get(b"sensors", b"gzip", responses[0][b"etag"]),
+            ],
+        ),
+    )
+
+    assert (second[b"status"], second[b"etag"]) == (304, first[b"etag"])
+
+
+def test_server_compress_off():
+    """Test.
+
+    ----.
+
+    Servers created with `compress_min_size=None` never compress.
+
+    Expectation
+    -----------
+
+    **Pass**: The large body is sent as it is, and `Accept-Encoding` is not
+    named in `Vary`.
+    """
+
+    [response] = asyncio.run(
+        exchange(lambda _: [get(b"sensors", b"gzip")], compress_min_size=None),
+    )
+
+    assert b"content-encoding" not in response
+    assert b"Accept-Encoding" not in response.get(b"vary", b"")
+    assert json.loads(response[b"body"]) == STATE
@@ -0,0 +1,313 @@
+"""Tests of the concurrency policies of `urest.http.concurrency`, and of their
+use by `urest.http.server.RESTServer` to limit the overlap of the calls to a
+noun. The locks are tested directly, and the server is run locally (on
+CPython), so only the standard library is needed.
+
+Run as: `py.test test_concurrency.py`
+"""
+
+import asyncio
+import socket
+
+import pytest
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+from urest.http.concurrency import LockQueueFullError, RWLock
+
+HOST = "127.0.0.1"
+HANDLER_DELAY = 0.2
+
+
+class TrackedNoun(APIBase):
+    """A noun taking `HANDLER_DELAY` seconds for each call, and recording the
+    most calls made to it at once."""
+
+    def __init__(self):
+        super().__init__()
+        self._state_attributes = {"a": 1, "b": 2}
+        self.active = 0
+        self.peak = 0
+
+    async def _track(self):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(HANDLER_DELAY)
+        self.active -= 1
+
+    async def get_state(self):
+        await self._track()
+        return super().get_state()
+
+    async def set_state(self, state_attributes):
+        await self._track()
+        super().set_state(state_attributes)
+
+
+def run_lock(lock, calls):
+    """Start each of the `calls` (pairs of a name, and `True` for a writer) on
+    the `lock` in order, holding the lock for a moment. Returns the names of
+    the calls in the order they acquired the lock."""
+
+    order = []
+
+    async def call(name, write):
+        await lock.acquire(write)
+        order.append(name)
+        await asyncio.sleep(0.01)
+        lock.release(write)
+
+    async def run():
+        tasks = []
+
+        for name, write in calls:
+            tasks.append(asyncio.create_task(call(name, write)))
+            await asyncio.sleep(0)
+
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    return order
+
+
+def test_readers_share():
+    """Test.
+
+    ----.
+
+    Readers hold the lock together, while each writer holds it alone.
+
+    Expectation
+    -----------
+
+    **Pass**: The two readers acquire the lock without waiting, and the
+    writer waits for both.
+    """
+
+    lock = RWLock()
+
+    assert run_lock(lock, [("r1", False), ("r2", False), ("w", True)]) == [
+        "r1",
+        "r2",
+        "w",
+    ]
+    assert (lock.acquired, lock.waited) == (3, 1)
+
+
+def test_fair_order():
+    """Test.
+
+    ----.
+
+    Calls waiting for the lock are admitted in the order they arrived, so a
+    reader arriving after a waiting writer does not pass it.
+
+    Expectation
+    -----------
+
+    **Pass**: The second reader waits for the writer, although the lock is
+    held by a reader when it arrives; and the last two readers then share the
+    lock.
+    """
+
+    lock = RWLock()
+
+    assert run_lock(
+        lock,
+        [("r1", False), ("w", True), ("r2", False), ("r3", False)],
+    ) == ["r1", "w", "r2", "r3"]
+    assert lock.waited == 3
+    assert lock.max_wait_ms > 0
+
+
+def test_serial():
+    """Test.
+
+    ----.
+
+    Serial locks give readers the lock on their own.
+
+    Expectation
+    -----------
+
+    **Pass**: The second reader waits for the first.
+    """
+
+    lock = RWLock(serial=True)
+
+    assert run_lock(lock, [("r1", False), ("r2", False)]) == ["r1", "r2"]
+    assert lock.waited == 1
+
+
+def test_max_waiting():
+    """Test.
+
+    ----.
+
+    Calls beyond `max_waiting` are refused, rather than queued; and calls
+    cancelled while waiting give up their place in the queue.
+
+    Expectation
+    -----------
+
+    **Pass**: The second waiting writer raises `LockQueueFullError`; once the
+    waiting writer is cancelled, the queue is empty and another writer may
+    wait.
+    """
+
+    async def run():
+        lock = RWLock(max_waiting=1)
+        await lock.acquire(True)
+
+        waiting = asyncio.create_task(lock.acquire(True))
+        await asyncio.sleep(0)
+
+        with pytest.raises(LockQueueFullError):
+            await lock.acquire(False)
+
+        assert (lock.waiting, lock.rejected) == (1, 1)
+
+        waiting.cancel()
+        await asyncio.sleep(0)
+
+        assert lock.waiting == 0
+
+        lock.release(True)
+        await lock.acquire(True)
+
+    asyncio.run(run())
+
+
+def test_lock_names():
+    """Test.
+
+    ----.
+
+    Locks are held under the canonical name of the noun, so re-registering a
+    noun under another spelling replaces its lock.
+
+    Expectation
+    -----------
+
+    **Pass**: The lock of `/Bank/LED/` is held as `bank/led`; registering
+    `bank/led` again with the `"serial"` policy replaces it, and with the
+    `"none"` policy removes it.
+    """
+
+    server = RESTServer()
+
+    server.register_noun("/Bank/LED/", APIBase(), concurrency="rw")
+    lock = server.locks["bank/led"]
+
+    server.register_noun("bank/led", APIBase(), concurrency="serial")
+
+    assert list(server.locks) == ["bank/led"]
+    assert server.locks["bank/led"] is not lock
+    assert server.locks["bank/led"].serial
+
+    server.register_noun("BANK/led", APIBase())
+
+    assert server.locks == {}
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+async def request(port, data):
+    """Send the request `data` to the server on its own connection, returning
+    the status code of the response."""
+
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(data)
+    await writer.drain()
+
+    response = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+def get(attribute):
+    """Return a `GET` request for an `attribute` of the noun."""
+
+    return b"GET /led/" + attribute + b" HTTP/1.1\r\nConnection: close\r\n\r\n"
+
+
+PUT = b'PUT /led HTTP/1.1\r\nConnection: close\r\nContent-Length: 10\r\n\r\n{"led": 1}'
+
+
+async def overlap(requests, **kwargs):
+    """Start a server with a single `TrackedNoun`, registered with `kwargs`, and
+    make the `requests` at once. Returns the status codes of the responses, and
+    the most calls made to the noun at once."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32)
+
+    noun = TrackedNoun()
+    server.register_noun("led", noun, **kwargs)
+
+    await server.start()
+
+    try:
+        statuses = await asyncio.gather(*(request(port, data) for data in requests))
+        return statuses, noun.peak
+    finally:
+        await server.stop()
+
+
+@pytest.mark.parametrize(
+    ("concurrency", "requests", "peak"),
+    [
+        ("none", [PUT, PUT], 2),
+        ("rw", [get(b"a"), get(b"b")], 2),
+        ("rw", [PUT, PUT], 1),
+        ("rw", [get(b"a"), PUT], 1),
+        ("serial", [get(b"a"), get(b"b")], 1),
+    ],
+)
+def test_server_policies(concurrency, requests, peak):
+    """Test.
+
+    ----.
+
+    The calls made to a noun by the server only overlap as far as its
+    concurrency policy allows.
+
+    Expectation
+    -----------
+
+    **Pass**: Every request is answered with '`200 OK`', and the most calls
+    made to the noun at once is as allowed by the policy.
+    """
+
+    statuses, most = asyncio.run(overlap(requests, concurrency=concurrency))
+
+    assert statuses == [200] * len(requests)
+    assert most == peak
+
+
+def test_server_queue_full():
+    """Test.
+
+    ----.
+
+    Requests which would wait for a noun whose queue is full are answered at
+    once with '`503 Service Unavailable`'.
+
+    Expectation
+    -----------
+
+    **Pass**: With no calls allowed to wait, one of two writes made at once
+    is answered with `200`, and the other with `503`.
+    """
+
+    statuses, _ = asyncio.run(
+        overlap([PUT, PUT], concurrency="serial", max_waiting=0),
+    )
+
+    assert sorted(statuses) == [200, 503]
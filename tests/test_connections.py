@@ -0,0 +1,143 @@
+"""Tests of the lifecycle of client connections, tracked by the
+`ConnectionManager` of `urest.http.server.RESTServer`. The manager is tested
+directly with stand-in streams, and the server is run locally (on CPython), so
+only the standard library is needed.
+
+Run as: `py.test test_connections.py`
+"""
+
+import asyncio
+import socket
+import time
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+from urest.http.server import ConnectionManager
+
+HOST = "127.0.0.1"
+
+
+class StuckTransport:
+    """A transport recording whether it was aborted."""
+
+    def __init__(self):
+        self.aborted = False
+
+    def abort(self):
+        self.aborted = True
+
+
+class StuckWriter:
+    """A stream whose client never accepts the data left to send."""
+
+    def __init__(self):
+        self.transport = StuckTransport()
+
+    async def drain(self):
+        await asyncio.sleep(60)
+
+
+def test_counters():
+    """Test.
+
+    ----.
+
+    Connections are counted as open until closed, and as draining while
+    the last response is flushed.
+
+    Expectation
+    -----------
+
+    **Pass**: The peak counts both open connections; and once a connection
+    whose client does not accept the last response is closed, it is counted
+    as closed and aborted, with its transport aborted at the deadline.
+    """
+
+    async def run():
+        manager = ConnectionManager()
+        manager.connect()
+        manager.connect()
+
+        writer = StuckWriter()
+        start = time.monotonic()
+        await manager.close(writer, 3, 0.1)
+
+        return manager, writer, time.monotonic() - start
+
+    manager, writer, elapsed = asyncio.run(run())
+
+    assert (manager.open, manager.draining, manager.closed) == (1, 0, 1)
+    assert (manager.aborted, manager.peak, manager.requests) == (1, 2, 3)
+    assert writer.transport.aborted
+    assert elapsed < 1
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+async def serve_clients():
+    """Hold two connections open at once to a local server, and then close both
+    with a final request. Returns the counts of the server once both are
+    closed, and the longest time taken for the server to close a connection
+    after its response."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32)
+    server.register_noun("led", APIBase())
+
+    await server.start()
+
+    async def client():
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(b"GET /led HTTP/1.1\r\n\r\n")
+        await writer.drain()
+
+        await reader.readuntil(b"Connection: keep-alive\r\n\r\n")
+        await asyncio.sleep(0.2)
+
+        writer.write(b"GET /led HTTP/1.1\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+
+        await reader.readuntil(b"Connection: close\r\n\r\n")
+        start = time.monotonic()
+        await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+
+        return time.monotonic() - start
+
+    try:
+        lingers = await asyncio.gather(client(), client())
+        await asyncio.sleep(0.1)
+
+        return server.connections, max(lingers)
+    finally:
+        await server.stop()
+
+
+def test_server_connections():
+    """Test.
+
+    ----.
+
+    The server closes each connection as soon as the last response has been
+    sent, without lingering, and counts the connections and requests served.
+
+    Expectation
+    -----------
+
+    **Pass**: Both connections are counted as closed, and none left open or
+    draining; the peak is two; four requests were served; and each connection
+    was closed within a fraction of a second of its last response.
+    """
+
+    connections, linger = asyncio.run(serve_clients())
+
+    assert (connections.open, connections.draining, connections.closed) == (0, 0, 2)
+    assert (connections.aborted, connections.expired) == (0, 0)
+    assert (connections.peak, connections.requests) == (2, 4)
+    assert linger < 0.5
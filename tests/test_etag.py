@@ -0,0 +1,231 @@
+"""Tests of the conditional `GET` requests answered by
+`urest.http.server.RESTServer`: the `ETag` of each response, and the
+'`304 Not Modified`' responses to requests whose `If-None-Match` header field
+names that tag. The matching of tags is tested directly, and the server is run
+locally (on CPython), so only the standard library is needed.
+
+Run as: `py.test test_etag.py`
+"""
+
+import asyncio
+import socket
+
+import pytest
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+from urest.http.request import etag_matches
+
+HOST = "127.0.0.1"
+
+
+class CountingNoun(APIBase):
+    """A noun counting the calls to `get_state()`."""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def get_state(self):
+        self.reads += 1
+        return super().get_state()
+
+
+class LiveNoun(CountingNoun):
+    """A noun whose state is read live, and so cannot be cached."""
+
+    cacheable = False
+
+
+@pytest.mark.parametrize(
+    ("if_none_match", "matched"),
+    [
+        ('"1-2"', True),
+        ('W/"1-2"', True),
+        ('"0-1", "1-2"', True),
+        ('"0-1",W/"1-2"', True),
+        ("*", True),
+        ('"1-3"', False),
+        ('"1-2-gzip"', False),
+        ("1-2", False),
+        ("", False),
+    ],
+)
+def test_etag_matches(if_none_match, matched):
+    """Test.
+
+    ----.
+
+    Tags are matched with the weak comparison, against each tag in the list,
+    or against any tag for '`*`'.
+
+    Expectation
+    -----------
+
+    **Pass**: The tag `"1-2"` is only matched by lists naming it (weak or
+    not), or by '`*`'.
+    """
+
+    assert etag_matches(if_none_match, '"1-2"') == matched
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+def parse_responses(data):
+    """Split the `data` returned by the server into a list of the responses,
+    each as a dictionary of the header fields (with lowercase names), holding
+    the status code under the name `b"status"` and the body under the name
+    `b"body"`."""
+
+    responses = []
+
+    while data:
+        head, _, data = data.partition(b"\r\n\r\n")
+        lines = head.split(b"\r\n")
+        fields = {b"status": int(lines[0].split()[1])}
+
+        for line in lines[1:]:
+            name, _, value = line.partition(b": ")
+            fields[name.lower()] = value
+
+        length = int(fields.get(b"content-length", b"0"))
+        fields[b"body"], data = data[:length], data[length:]
+        responses.append(fields)
+
+    return responses
+
+
+async def send(port, requests):
+    """Send the `requests` to the server on one connection, returning the
+    parsed responses."""
+
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(b"".join(requests) + b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n")
+    await writer.drain()
+
+    data = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+
+    return parse_responses(data)[:-1]
+
+
+async def exchange(noun, *batches):
+    """Start a local server with the `noun` as `led`, and no coalescing of
+    reads, and send each of the `batches` of requests on a new connection. Each
+    batch is a function taking the responses to the earlier batches, and
+    returning the requests to send. Returns the responses to each batch."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32, coalesce_window=0)
+    server.register_noun("led", noun)
+
+    await server.start()
+
+    try:
+        responses = []
+
+        for batch in batches:
+            responses.append(await send(port, batch(responses)))
+
+        return responses
+    finally:
+        await server.stop()
+
+
+GET = b"GET /led HTTP/1.1\r\n\r\n"
+PUT = b'PUT /led HTTP/1.1\r\nContent-Length: 10\r\n\r\n{"led": 0}'
+
+
+def get_if_none_match(tag):
+    """Return a `GET` request of the noun, naming the `tag` in the
+    `If-None-Match` header field."""
+
+    return b"GET /led HTTP/1.1\r\nIf-None-Match: " + tag + b"\r\n\r\n"
+
+
+def test_not_modified():
+    """Test.
+
+    ----.
+
+    Requests naming the current tag of a cacheable noun are answered with
+    '`304 Not Modified`', without reading the state of the noun; once the
+    state changes, the old tag no longer matches.
+
+    Expectation
+    -----------
+
+    **Pass**: The `304` responses carry the tag, and no body; the state is
+    only read for the first request, and again after the `PUT`, which gives
+    the state a new tag.
+    """
+
+    noun = CountingNoun()
+    noun.set_state({"led": 1})
+
+    [first], [weak, listed, changed, stale] = asyncio.run(
+        exchange(
+            noun,
+            lambda _: [GET],
+            lambda responses: [
+                get_if_none_match(b"W/" + responses[0][0][b"etag"]),
+                get_if_none_match(b'"other", ' + responses[0][0][b"etag"]),
+                PUT,
+                get_if_none_match(responses[0][0][b"etag"]),
+            ],
+        ),
+    )
+
+    tag = first[b"etag"]
+
+    assert first[b"status"] == 200
+    assert tag.startswith(b'"')
+    assert tag.endswith(b'"')
+
+    for response in (weak, listed):
+        assert response[b"status"] == 304
+        assert response[b"etag"] == tag
+        assert response[b"body"] == b""
+
+    assert changed[b"status"] == 200
+    assert stale[b"status"] == 200
+    assert stale[b"etag"] != tag
+    assert stale[b"body"] == b'{"led": 0}'
+    assert noun.reads == 2
+
+
+def test_not_cacheable():
+    """Test.
+
+    ----.
+
+    Nouns which are not cacheable are tagged by their encoded body, so equal
+    states have equal tags, however often the state is read.
+
+    Expectation
+    -----------
+
+    **Pass**: The request naming the tag of the first response is answered
+    with '`304 Not Modified`', after reading the state again.
+    """
+
+    noun = LiveNoun()
+    noun.set_state({"led": 1})
+
+    [[first], [second]] = asyncio.run(
+        exchange(
+            noun,
+            lambda _: [GET],
+            lambda responses: [get_if_none_match(responses[0][0][b"etag"])],
+        ),
+    )
+
+    assert first[b"status"] == 200
+    assert (second[b"status"], second[b"etag"]) == (304, first[b"etag"])
+    assert noun.reads == 2
@@ -0,0 +1,240 @@
+"""Tests of the executor pools of `urest.http.executor`, and of their use by
+`urest.http.server.RESTServer` to call blocking nouns outside of the event
+loop. The pools are tested directly, and the server is run locally (on
+CPython), so only the standard library is needed.
+
+Run as: `py.test test_executor.py`
+"""
+
+import asyncio
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+from urest.http.executor import ExecutorFullError, PoolExecutor
+
+HOST = "127.0.0.1"
+HANDLER_DELAY = 0.3
+
+
+class BlockingNoun(APIBase):
+    """A noun blocking for `HANDLER_DELAY` seconds on each read."""
+
+    def __init__(self):
+        super().__init__()
+        self._state_attributes = {"a": 1, "b": 2}
+
+    def get_attribute(self, attribute):
+        time.sleep(HANDLER_DELAY)
+        return super().get_attribute(attribute)
+
+
+async def worker_thread():
+    """Return the name of the thread running the co-routine."""
+
+    await asyncio.sleep(0)
+    return threading.current_thread().name
+
+
+def test_thread_pool():
+    """Test.
+
+    ----.
+
+    Calls are run in the threads of the pool, with co-routines run to
+    completion in the worker; and are counted until they finish.
+
+    Expectation
+    -----------
+
+    **Pass**: The blocking call and the co-routine both run outside the main
+    thread, and the pool then has no calls pending.
+    """
+
+    async def run():
+        pool = PoolExecutor("thread", 2, 0)
+
+        try:
+            blocking = await pool.run(lambda: threading.current_thread().name)
+            coroutine = await pool.run(worker_thread)
+            await asyncio.sleep(0)
+
+            return blocking, coroutine, pool.pending
+        finally:
+            pool.shutdown()
+
+    blocking, coroutine, pending = asyncio.run(run())
+
+    assert threading.current_thread().name not in (blocking, coroutine)
+    assert pending == 0
+
+
+def test_pool_full():
+    """Test.
+
+    ----.
+
+    Calls beyond the workers and the queue of the pool are refused, and the
+    `finished` callable is called once each worker is done with its call.
+
+    Expectation
+    -----------
+
+    **Pass**: With one worker and one waiting call, the third call raises
+    `ExecutorFullError` and is counted as rejected; both accepted calls finish,
+    and call `finished`.
+    """
+
+    async def run():
+        pool = PoolExecutor("thread", 1, 1)
+        finished = []
+
+        try:
+            first = pool.submit(lambda: finished.append(1), time.sleep, 0.1)
+            second = pool.submit(lambda: finished.append(2), time.sleep, 0.1)
+
+            with pytest.raises(ExecutorFullError):
+                pool.submit(None, time.sleep, 0.1)
+
+            await asyncio.gather(first, second)
+            await asyncio.sleep(0.01)
+
+            return pool.pending, pool.rejected, finished
+        finally:
+            pool.shutdown()
+
+    assert asyncio.run(run()) == (0, 1, [1, 2])
+
+
+def test_process_pool():
+    """Test.
+
+    ----.
+
+    Calls are run in a separate (spawned) process; and pools are only made for
+    known policies.
+
+    Expectation
+    -----------
+
+    **Pass**: The call returns the process ID of the worker, which is not the
+    ID of this process; an unknown policy raises `ValueError`.
+    """
+
+    async def run():
+        pool = PoolExecutor("process", 1, 0)
+
+        try:
+            return await pool.run(os.getpid)
+        finally:
+            pool.shutdown()
+
+    assert asyncio.run(run()) != os.getpid()
+
+    with pytest.raises(ValueError):
+        PoolExecutor("inline", 1, 0)
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+async def request(port, path):
+    """Request the `path` on its own connection, returning the status code and
+    header fields of the response, and the time taken for the response."""
+
+    start = time.monotonic()
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(b"GET " + path + b" HTTP/1.1\r\nConnection: close\r\n\r\n")
+    await writer.drain()
+
+    response = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+
+    head = response.partition(b"\r\n\r\n")[0].split(b"\r\n")
+    fields = dict(line.split(b": ", 1) for line in head[1:])
+
+    return int(head[0].split()[1]), fields, time.monotonic() - start
+
+
+async def serve(paths, **kwargs):
+    """Start a local server created with `kwargs`, with a `BlockingNoun` called
+    in the thread pool and an inline noun, and request each of the `paths` at
+    once. Returns the results of the requests."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32, **kwargs)
+    server.register_noun("sensor", BlockingNoun(), executor="thread")
+
+    led = APIBase()
+    led.set_state({"led": 1})
+    server.register_noun("led", led)
+
+    await server.start()
+
+    try:
+        return await asyncio.gather(*(request(port, path) for path in paths))
+    finally:
+        await server.stop()
+
+
+def test_server_thread():
+    """Test.
+
+    ----.
+
+    Blocking nouns called in the thread pool do not hold up the event loop.
+
+    Expectation
+    -----------
+
+    **Pass**: Both reads of the blocking noun are answered in about the time
+    of one, and the inline noun is answered long before either.
+    """
+
+    (a, _, slow_a), (b, _, slow_b), (led, _, fast) = asyncio.run(
+        serve([b"/sensor/a", b"/sensor/b", b"/led"]),
+    )
+
+    assert (a, b, led) == (200, 200, 200)
+    assert max(slow_a, slow_b) < 2 * HANDLER_DELAY
+    assert fast < HANDLER_DELAY / 2
+
+
+def test_server_pool_full():
+    """Test.
+
+    ----.
+
+    Requests for a noun whose pool is full are answered at once with
+    '`503 Service Unavailable`'.
+
+    Expectation
+    -----------
+
+    **Pass**: With one worker, and no calls allowed to wait, one of the two
+    reads is answered with `200` and the other with `503`, carrying a
+    `Retry-After`; and the unknown execution policy raises `KeyError`.
+    """
+
+    results = asyncio.run(
+        serve([b"/sensor/a", b"/sensor/b"], max_workers=1, max_queued=0),
+    )
+
+    assert sorted(status for status, _, _ in results) == [200, 503]
+
+    for status, fields, _ in results:
+        if status == 503:
+            assert b"Retry-After" in fields
+
+    with pytest.raises(KeyError):
+        RESTServer().register_noun("led", APIBase(), executor="fibre")
@@ -0,0 +1,211 @@
+"""Tests of HTTP/1.1 persistent connections (keep-alive) in
+`urest.http.server.RESTServer`: which requests keep the connection open, and
+the limits placed on connections which are kept open. The server is run
+locally (on CPython), so only the standard library is needed.
+
+Run as: `py.test test_keep_alive.py`
+"""
+
+import asyncio
+import socket
+import time
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+
+HOST = "127.0.0.1"
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+def parse_heads(data):
+    """Split the `data` returned by the server into a list of the heads of the
+    responses, each as a dictionary of the header fields (with lowercase
+    names), holding the status code under the name `b"status"`."""
+
+    heads = []
+
+    while data:
+        head, _, data = data.partition(b"\r\n\r\n")
+        lines = head.split(b"\r\n")
+        fields = {b"status": int(lines[0].split()[1])}
+
+        for line in lines[1:]:
+            name, _, value = line.partition(b": ")
+            fields[name.lower()] = value
+
+        data = data[int(fields.get(b"content-length", b"0")) :]
+        heads.append(fields)
+
+    return heads
+
+
+async def exchange(data, **kwargs):
+    """Start a local server created with `kwargs`, send `data` on one
+    connection, and return the heads of the responses sent before the server
+    closed the connection, with the time taken for the connection to close."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32, **kwargs)
+
+    led = APIBase()
+    led.set_state({"led": 1})
+    server.register_noun("led", led)
+
+    await server.start()
+
+    try:
+        start = time.monotonic()
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(data)
+        await writer.drain()
+
+        response = await asyncio.wait_for(reader.read(), 10)
+        writer.close()
+
+        return parse_heads(response), time.monotonic() - start
+    finally:
+        await server.stop()
+
+
+GET = b"GET /led HTTP/1.1\r\n\r\n"
+GET_CLOSE = b"GET /led HTTP/1.1\r\nConnection: close\r\n\r\n"
+
+
+def test_keep_alive():
+    """Test.
+
+    ----.
+
+    HTTP/1.1 connections are kept open between requests, until the client
+    asks for the connection to be closed.
+
+    Expectation
+    -----------
+
+    **Pass**: Three requests are answered on one connection. The first two
+    responses carry `Connection: keep-alive`, and a `Keep-Alive` field
+    counting down the requests left; the last carries `Connection: close`.
+    """
+
+    heads, _ = asyncio.run(exchange(GET + GET + GET_CLOSE, max_requests=10))
+
+    assert [head[b"status"] for head in heads] == [200, 200, 200]
+    assert [head[b"connection"] for head in heads] == [
+        b"keep-alive",
+        b"keep-alive",
+        b"close",
+    ]
+    assert heads[0][b"keep-alive"] == b"timeout=5, max=9"
+    assert heads[1][b"keep-alive"] == b"timeout=5, max=8"
+
+
+def test_close_ends_connection():
+    """Test.
+
+    ----.
+
+    Requests asking for the connection to be closed are the last on the
+    connection.
+
+    Expectation
+    -----------
+
+    **Pass**: Only the first request is answered.
+    """
+
+    heads, _ = asyncio.run(exchange(GET_CLOSE + GET))
+
+    assert len(heads) == 1
+    assert heads[0][b"connection"] == b"close"
+
+
+def test_http_1_0():
+    """Test.
+
+    ----.
+
+    HTTP/1.0 connections are only kept open if the client asks for it.
+
+    Expectation
+    -----------
+
+    **Pass**: A plain HTTP/1.0 request closes the connection; one sending
+    `Connection: keep-alive` keeps it open for the next request.
+    """
+
+    heads, _ = asyncio.run(exchange(b"GET /led HTTP/1.0\r\n\r\n" + GET))
+
+    assert [head[b"connection"] for head in heads] == [b"close"]
+
+    heads, _ = asyncio.run(
+        exchange(b"GET /led HTTP/1.0\r\nConnection: Keep-Alive\r\n\r\n" + GET_CLOSE),
+    )
+
+    assert [head[b"connection"] for head in heads] == [b"keep-alive", b"close"]
+
+
+def test_max_requests():
+    """Test.
+
+    ----.
+
+    Connections are closed once `max_requests` have been served.
+
+    Expectation
+    -----------
+
+    **Pass**: With a limit of two requests, the second response carries
+    `Connection: close` and the third request is not answered.
+    """
+
+    heads, _ = asyncio.run(exchange(GET * 3, max_requests=2))
+
+    assert [head[b"connection"] for head in heads] == [b"keep-alive", b"close"]
+
+
+def test_keep_alive_disabled():
+    """Test.
+
+    ----.
+
+    Servers created with `keep_alive=False` close the connection after each
+    response.
+
+    Expectation
+    -----------
+
+    **Pass**: Only the first of two requests is answered, with `Connection:
+    close`.
+    """
+
+    heads, _ = asyncio.run(exchange(GET * 2, keep_alive=False))
+
+    assert [head[b"connection"] for head in heads] == [b"close"]
+
+
+def test_keep_alive_timeout():
+    """Test.
+
+    ----.
+
+    Connections left idle after a response are closed once
+    `keep_alive_timeout` has passed.
+
+    Expectation
+    -----------
+
+    **Pass**: The single response is sent, and the server closes the
+    connection after about one second.
+    """
+
+    heads, elapsed = asyncio.run(exchange(GET, keep_alive_timeout=1))
+
+    assert len(heads) == 1
+    assert 0.9 <= elapsed < 3
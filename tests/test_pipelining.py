@@ -0,0 +1,165 @@
+"""Tests of HTTP pipelining by `urest.http.server.RESTServer`: requests sent
+back-to-back on one connection must be answered in the order they were sent,
+even when the later requests are handled first. As for `test_slow_client.py`,
+the server is run locally (on CPython), and only the standard library is
+needed.
+
+Run as: `py.test test_pipelining.py`
+"""
+
+import asyncio
+import json
+import socket
+import time
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+
+HOST = "127.0.0.1"
+SLOW_HANDLER_DELAY = 0.3
+
+
+class SlowNoun(APIBase):
+    """A noun taking `SLOW_HANDLER_DELAY` seconds to read its state."""
+
+    async def get_state(self):
+        await asyncio.sleep(SLOW_HANDLER_DELAY)
+        return super().get_state()
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+def parse_responses(data):
+    """Split the `data` returned by the server into a list of the status codes
+    and (decoded) bodies of the responses, in the order they were sent."""
+
+    responses = []
+
+    while data:
+        head, _, data = data.partition(b"\r\n\r\n")
+        lines = head.split(b"\r\n")
+        fields = dict(line.lower().split(b": ", 1) for line in lines[1:])
+
+        length = int(fields.get(b"content-length", b"0"))
+        body, data = data[:length], data[length:]
+
+        responses.append((int(lines[0].split()[1]), json.loads(body) if body else None))
+
+    return responses
+
+
+async def pipeline(requests, **kwargs):
+    """Start a local server with the slow nouns `slow1` and `slow2`, and the
+    plain noun `fast`, and send the `requests` back-to-back on one connection.
+    Returns the parsed responses, and the time taken for them to arrive."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32, **kwargs)
+
+    for index, noun in ((1, SlowNoun()), (2, SlowNoun()), (0, APIBase())):
+        noun.set_state({"noun": index})
+        server.register_noun("fast" if index == 0 else f"slow{index}", noun)
+
+    await server.start()
+
+    try:
+        start = time.monotonic()
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(b"".join(requests))
+        await writer.drain()
+
+        data = await asyncio.wait_for(reader.read(), 10)
+        writer.close()
+
+        return parse_responses(data), time.monotonic() - start
+    finally:
+        await server.stop()
+
+
+def get(noun, close=False):
+    """Return a `GET` request for the `noun`."""
+
+    connection = b"Connection: close\r\n" if close else b""
+    return b"GET /" + noun + b" HTTP/1.1\r\n" + connection + b"\r\n"
+
+
+def put(noun, state):
+    """Return a `PUT` request setting the `state` of the `noun`."""
+
+    body = json.dumps(state).encode()
+    return (
+        b"PUT /"
+        + noun
+        + b" HTTP/1.1\r\nContent-Length: "
+        + str(len(body)).encode()
+        + b"\r\n\r\n"
+        + body
+    )
+
+
+def test_response_order():
+    """Test.
+
+    ----.
+
+    Responses to pipelined requests are returned in request order, although
+    the slow requests sent first finish after the fast requests sent later.
+
+    Expectation
+    -----------
+
+    **Pass**: Every request is answered with `200 OK`, and each body is the
+    state of the noun requested in that position, including the state set by
+    the pipelined `PUT`.
+    """
+
+    requests = [
+        get(b"slow1"),
+        get(b"fast"),
+        put(b"fast", {"noun": 9}),
+        get(b"fast"),
+        get(b"slow2", close=True),
+    ]
+
+    responses, _ = asyncio.run(pipeline(requests))
+
+    assert responses == [
+        (200, {"noun": 1}),
+        (200, {"noun": 0}),
+        (200, None),
+        (200, {"noun": 9}),
+        (200, {"noun": 2}),
+    ]
+
+
+def test_handlers_overlap():
+    """Test.
+
+    ----.
+
+    The handlers of pipelined requests run at the same time, unless the
+    `pipeline_depth` of the server is one.
+
+    Expectation
+    -----------
+
+    **Pass**: Two pipelined requests for slow nouns are answered in about the
+    time of one with the default depth, and in at least the time of both with
+    a depth of one.
+    """
+
+    requests = [get(b"slow1"), get(b"slow2", close=True)]
+
+    responses, overlapped = asyncio.run(pipeline(requests))
+    assert [status for status, _ in responses] == [200, 200]
+    assert overlapped < 2 * SLOW_HANDLER_DELAY
+
+    responses, serial = asyncio.run(pipeline(requests, pipeline_depth=1))
+    assert [status for status, _ in responses] == [200, 200]
+    assert serial >= 2 * SLOW_HANDLER_DELAY
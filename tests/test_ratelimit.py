@@ -0,0 +1,231 @@
+"""Tests of the limits for each client of `urest.http.ratelimit`, and of their
+use by `urest.http.server.RESTServer` to answer '`429 Too Many Requests`'. The
+limits are tested directly, and the server is run locally (on CPython), so only
+the standard library is needed.
+
+Run as: `py.test test_ratelimit.py`
+"""
+
+import asyncio
+import socket
+import time
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+from urest.http.ratelimit import ClientLimits
+
+HOST = "127.0.0.1"
+GET = b"GET /led HTTP/1.1\r\n\r\n"
+
+
+def test_token_bucket():
+    """Test.
+
+    ----.
+
+    Each client may send `burst` requests at once, and then `rate` requests
+    each second. Clients are limited separately.
+
+    Expectation
+    -----------
+
+    **Pass**: Three requests are allowed and the fourth refused; another is
+    allowed once the bucket has refilled; and a second client is allowed its
+    own burst.
+    """
+
+    limits = ClientLimits(20, 3, None)
+
+    assert [limits.allow("a") for _ in range(4)] == [True, True, True, False]
+    assert limits.throttled == 1
+
+    time.sleep(0.06)
+
+    assert limits.allow("a")
+    assert limits.allow("b")
+    assert ClientLimits(None, 0, None).allow("a")
+
+
+def test_connection_cap():
+    """Test.
+
+    ----.
+
+    Each client may hold at most `max_connections` connections open.
+
+    Expectation
+    -----------
+
+    **Pass**: The third connection is refused, and allowed once one of the
+    first two has closed.
+    """
+
+    limits = ClientLimits(None, 1, 2)
+
+    assert [limits.connect("a") for _ in range(3)] == [True, True, False]
+    assert limits.refused == 1
+
+    limits.disconnect("a")
+
+    assert limits.connect("a")
+
+
+def test_eviction():
+    """Test.
+
+    ----.
+
+    Once the table is full, the client without open connections seen least
+    recently is forgotten; clients holding connections are never forgotten,
+    so their connections are still counted.
+
+    Expectation
+    -----------
+
+    **Pass**: An idle client is forgotten for a new client; while the table is
+    full of clients holding connections, new clients are refused; and the
+    connection cap still holds for clients cycling through new addresses.
+    """
+
+    limits = ClientLimits(None, 1, 1, max_clients=2)
+
+    assert limits.connect("a")
+    assert limits.connect("idle")
+    limits.disconnect("idle")
+
+    assert limits.connect("b")
+    assert limits.evicted == 1
+
+    for address in ("c", "d", "e"):
+        assert not limits.connect(address)
+
+    assert not limits.connect("a")
+    assert limits.evicted == 1
+
+    limits.disconnect("b")
+
+    assert limits.connect("c")
+    assert limits.evicted == 2
+    assert not limits.connect("a")
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+async def start_server(**kwargs):
+    """Start a local test server, with a single noun, returning the server and
+    its port."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32, **kwargs)
+    server.register_noun("led", APIBase())
+
+    await server.start()
+    return server, port
+
+
+async def read_all(reader, writer):
+    """Read the responses sent by the server until it closes the connection."""
+
+    response = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+    return response
+
+
+async def throttle():
+    """Send requests beyond the burst of a client, on one connection and then on
+    a new connection, returning the responses to each."""
+
+    server, port = await start_server(client_rate=0.01, client_burst=2)
+
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(GET + GET + b"GARBAGE\r\n\r\n")
+        first = await read_all(reader, writer)
+
+        # Nothing is sent on the second connection
+        reader, writer = await asyncio.open_connection(HOST, port)
+        second = await read_all(reader, writer)
+
+        return first, second
+    finally:
+        await server.stop()
+
+
+def test_rate_limit():
+    """Test.
+
+    ----.
+
+    Requests beyond the rate of the client are answered with '`429 Too Many
+    Requests`', before their head is parsed, and the connection is closed.
+    The first request on each connection takes its token when the connection
+    is accepted.
+
+    Expectation
+    -----------
+
+    **Pass**: The two requests within the burst are answered with `200 OK`,
+    and the third (which could not be parsed) with `429`; the second
+    connection is answered with `429` without sending anything.
+    """
+
+    first, second = asyncio.run(throttle())
+
+    assert first.count(b"HTTP/1.1 200 OK") == 2
+    assert first.count(b"HTTP/1.1 429 Too Many Requests") == 1
+    assert first.endswith(b"Too Many Requests</p></body></http>")
+    assert second.startswith(b"HTTP/1.1 429 Too Many Requests")
+    assert b"Connection: close\r\n" in second
+
+
+async def hold_connections():
+    """Hold one connection open to a server allowing one connection for each
+    client, and make a second. Returns the responses to the second connection,
+    and to a third made once the first has closed."""
+
+    server, port = await start_server(max_client_connections=1)
+
+    try:
+        _, held = await asyncio.open_connection(HOST, port)
+        await asyncio.sleep(0.1)
+
+        reader, writer = await asyncio.open_connection(HOST, port)
+        refused = await read_all(reader, writer)
+
+        held.close()
+        await asyncio.sleep(0.1)
+
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(b"GET /led HTTP/1.1\r\nConnection: close\r\n\r\n")
+        allowed = await read_all(reader, writer)
+
+        return refused, allowed
+    finally:
+        await server.stop()
+
+
+def test_connection_limit():
+    """Test.
+
+    ----.
+
+    Connections beyond `max_client_connections` for a client are answered
+    with '`429 Too Many Requests`' before any of the request is read.
+
+    Expectation
+    -----------
+
+    **Pass**: The second connection gets a `429`, and a connection made once
+    the first has closed gets `200 OK`.
+    """
+
+    refused, allowed = asyncio.run(hold_connections())
+
+    assert refused.startswith(b"HTTP/1.1 429 Too Many Requests")
+    assert allowed.startswith(b"HTTP/1.1 200 OK")
@@ -0,0 +1,246 @@
+"""Tests of the nouns holding their state already encoded, through
+`APIBase.get_raw()`, whose state is sent by `urest.http.server.RESTServer` as
+it is. The server is run locally (on CPython), so only the standard library is
+needed.
+
+Run as: `py.test test_raw.py`
+"""
+
+import asyncio
+import socket
+from array import array
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+
+HOST = "127.0.0.1"
+
+IMAGE = bytes(range(256)) * 8
+
+
+class RawNoun(APIBase):
+    """A noun holding its state as an encoded `buffer`, counting the calls to
+    `get_state()`."""
+
+    def __init__(self, buffer, content_type="image/jpeg"):
+        super().__init__()
+        self._state_attributes = {"width": 640}
+        self.buffer = buffer
+        self.content_type = content_type
+        self.reads = 0
+
+    def get_raw(self):
+        if self.buffer is None:
+            return None
+
+        return (self.buffer, self.content_type)
+
+    def get_state(self):
+        self.reads += 1
+        return super().get_state()
+
+
+class LiveRawNoun(RawNoun):
+    """A raw noun whose state is read live, and so cannot be cached."""
+
+    cacheable = False
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+def parse_responses(data):
+    """Split the `data` returned by the server into a list of the responses,
+    each as a dictionary of the header fields (with lowercase names), holding
+    the status code under the name `b"status"` and the body under the name
+    `b"body"`."""
+
+    responses = []
+
+    while data:
+        head, _, data = data.partition(b"\r\n\r\n")
+        lines = head.split(b"\r\n")
+        fields = {b"status": int(lines[0].split()[1])}
+
+        for line in lines[1:]:
+            name, _, value = line.partition(b": ")
+            fields[name.lower()] = value
+
+        length = int(fields.get(b"content-length", b"0"))
+        fields[b"body"], data = data[:length], data[length:]
+        responses.append(fields)
+
+    return responses
+
+
+async def send(port, requests):
+    """Send the `requests` to the server on one connection, returning the
+    parsed responses."""
+
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(b"".join(requests) + b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n")
+    await writer.drain()
+
+    data = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+
+    return parse_responses(data)[:-1]
+
+
+async def exchange(noun, *batches):
+    """Start a local server with the `noun` as `camera`, and send each of the
+    `batches` of requests on a new connection. Each batch is a function taking
+    the responses to the earlier batches, and returning the requests to send.
+    Returns the responses to the last batch."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32)
+    server.register_noun("camera", noun)
+
+    await server.start()
+
+    try:
+        responses = []
+
+        for batch in batches:
+            responses = await send(port, batch(responses))
+
+        return responses
+    finally:
+        await server.stop()
+
+
+def get(path=b"/camera", if_none_match=None):
+    """Return a `GET` request for the `path`, accepting compressed bodies."""
+
+    request = b"GET " + path + b" HTTP/1.1\r\nAccept-Encoding: gzip\r\n"
+
+    if if_none_match is not None:
+        request += b"If-None-Match: " + if_none_match + b"\r\n"
+
+    return request + b"\r\n"
+
+
+def test_raw():
+    """Test.
+
+    ----.
+
+    The encoded state is sent as it is, with its own type, without reading
+    the state of the noun; and is never compressed.
+
+    Expectation
+    -----------
+
+    **Pass**: Both bodies are the buffer, sent as `image/jpeg` with a tag
+    for the raw state, and without a `Content-Encoding`; `get_state()` is
+    never called.
+    """
+
+    noun = RawNoun(memoryview(bytearray(IMAGE)))
+    responses = asyncio.run(exchange(noun, lambda _: [get(), get()]))
+
+    for response in responses:
+        assert response[b"status"] == 200
+        assert response[b"body"] == IMAGE
+        assert response[b"content-type"] == b"image/jpeg"
+        assert response[b"etag"].endswith(b'-raw"')
+        assert b"content-encoding" not in response
+
+    assert noun.reads == 0
+
+
+def test_raw_wide_items():
+    """Test.
+
+    ----.
+
+    Views of buffers with items wider than a byte are sent as their bytes.
+
+    Expectation
+    -----------
+
+    **Pass**: The `Content-Length` counts the bytes of the buffer, and the
+    body holds them all.
+    """
+
+    buffer = array("H", range(1000))
+    [response] = asyncio.run(
+        exchange(
+            RawNoun(memoryview(buffer), "application/octet-stream"),
+            lambda _: [get()],
+        ),
+    )
+
+    assert response[b"content-length"] == b"2000"
+    assert response[b"body"] == buffer.tobytes()
+
+
+def test_raw_not_modified():
+    """Test.
+
+    ----.
+
+    Requests naming the tag of the raw state are answered with '`304 Not
+    Modified`', for both cacheable nouns and those read live.
+
+    Expectation
+    -----------
+
+    **Pass**: The second request of each noun is answered with `304`, carrying
+    the tag of the first response.
+    """
+
+    for noun in (RawNoun(IMAGE), LiveRawNoun(IMAGE)):
+        first, second = asyncio.run(
+            exchange(
+                noun,
+                lambda _: [get()],
+                lambda responses: [get(), get(if_none_match=responses[0][b"etag"])],
+            ),
+        )
+
+        assert (second[b"status"], second[b"etag"]) == (304, first[b"etag"])
+        assert second[b"body"] == b""
+
+
+def test_raw_fallback():
+    """Test.
+
+    ----.
+
+    Nouns returning `None` from `get_raw()`, and requests for a single
+    attribute, are answered from the (encoded) state of the noun.
+
+    Expectation
+    -----------
+
+    **Pass**: The state, and attribute, are sent as JSON.
+    """
+
+    responses = asyncio.run(
+        exchange(
+            RawNoun(None),
+            lambda _: [get(), get(b"/camera/width")],
+        ),
+    )
+
+    assert [response[b"content-type"] for response in responses] == [
+        b"application/json",
+        b"application/json",
+    ]
+    assert [response[b"body"] for response in responses] == [
+        b'{"width": 640}',
+        b'{"width": 640}',
+    ]
+
+    [response] = asyncio.run(
+        exchange(RawNoun(IMAGE), lambda _: [get(b"/camera/width")]),
+    )
+
+    assert response[b"body"] == b'{"width": 640}'
@@ -0,0 +1,274 @@
+"""Tests of the reading of request heads by `read_head()` and `HTTPRequest` in
+`urest.http.request`, and of the checks made on the head by
+`urest.http.server.RESTServer`. The heads are fed to an
+`asyncio.StreamReader`, or the server is run locally (on CPython), so only the
+standard library is needed.
+
+Run as: `py.test test_request_head.py`
+"""
+
+import asyncio
+import socket
+
+import pytest
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+from urest.http.request import HTTPRequest, read_head
+
+HOST = "127.0.0.1"
+MAX_HEAD_SIZE = 256
+
+HEAD = (
+    b"PUT /led?level=1 HTTP/1.1\r\n"
+    b"Host: board\r\n"
+    b"content-TYPE:   application/json  \r\n"
+    b"X-Empty:\r\n"
+    b"Accept: one\r\n"
+    b"Accept: two\r\n"
+    b"\r\n"
+)
+
+
+class LineReader:
+    """A stream offering only `readline()`, as on MicroPython."""
+
+    def __init__(self, data):
+        self._reader = asyncio.StreamReader()
+        self._reader.feed_data(data)
+        self._reader.feed_eof()
+
+    async def readline(self):
+        return await self._reader.readline()
+
+    async def read(self, size=-1):
+        return await self._reader.read(size)
+
+
+def read(data, stream=asyncio.StreamReader):
+    """Read a head from `data` with `read_head()`, returning the head and the
+    data left unread."""
+
+    async def run():
+        if stream is LineReader:
+            reader = LineReader(data)
+        else:
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            reader.feed_eof()
+
+        return (await read_head(reader, MAX_HEAD_SIZE), await reader.read())
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("stream", [asyncio.StreamReader, LineReader])
+def test_read_head(stream):
+    """Test.
+
+    ----.
+
+    The head is read up to, and including, the empty line which ends it,
+    whether or not the stream can search for the end of the head.
+
+    Expectation
+    -----------
+
+    **Pass**: The head is returned in full, and the body is left in the
+    stream. Empty lines sent ahead of the request line are skipped by the
+    line-by-line reader, and kept (to be skipped by `HTTPRequest`) otherwise.
+    """
+
+    assert read(HEAD + b"body", stream) == (HEAD, b"body")
+
+    head, rest = read(b"\r\n" + HEAD, stream)
+
+    assert HTTPRequest(head).request_line == b"PUT /led?level=1 HTTP/1.1"
+    assert rest == b""
+
+
+@pytest.mark.parametrize("stream", [asyncio.StreamReader, LineReader])
+def test_head_too_long(stream):
+    """Test.
+
+    ----.
+
+    Heads longer than the limit are rejected.
+
+    Expectation
+    -----------
+
+    **Pass**: `ValueError` is raised.
+    """
+
+    with pytest.raises(ValueError):
+        read(b"GET / HTTP/1.1\r\nX-Long: " + b"x" * MAX_HEAD_SIZE + b"\r\n\r\n", stream)
+
+
+@pytest.mark.parametrize("stream", [asyncio.StreamReader, LineReader])
+def test_head_cut_short(stream):
+    """Test.
+
+    ----.
+
+    Clients closing the connection before the end of the head have sent no
+    request.
+
+    Expectation
+    -----------
+
+    **Pass**: An empty head is returned.
+    """
+
+    assert read(b"GET / HTTP/1.1\r\nHost: board\r\n", stream)[0] == b""
+    assert read(b"", stream)[0] == b""
+
+
+def test_header_fields():
+    """Test.
+
+    ----.
+
+    Header fields are found without regard to the case of their names, and
+    returned without the white space around their values.
+
+    Expectation
+    -----------
+
+    **Pass**: The value of each field is returned; the first value of a
+    repeated field is returned; and missing fields give `None`.
+    """
+
+    request = HTTPRequest(HEAD)
+
+    assert request.method == b"PUT"
+    assert request.version == b"HTTP/1.1"
+    assert request.header(b"host") == "board"
+    assert request.header(b"content-type") == "application/json"
+    assert request.header(b"content-type") == "application/json"
+    assert request.header(b"x-empty") == ""
+    assert request.header(b"accept") == "one"
+    assert request.header(b"content-length") is None
+    assert request.header(b"hos") is None
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+async def exchange(data):
+    """Start a local server, send it `data` on one connection, and return all
+    the data sent back before the connection is closed, together with any
+    errors reported to the event loop."""
+
+    errors = []
+    asyncio.get_running_loop().set_exception_handler(
+        lambda loop, context: errors.append(context),
+    )
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32, max_head_size=MAX_HEAD_SIZE)
+
+    led = APIBase()
+    led.set_state({"led": 1})
+    server.register_noun("led", led)
+
+    await server.start()
+
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(data)
+        await writer.drain()
+
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+
+        return response, errors
+    finally:
+        await server.stop()
+
+
+def test_server_head_too_long():
+    """Test.
+
+    ----.
+
+    Requests with a head longer than `max_head_size` are rejected.
+
+    Expectation
+    -----------
+
+    **Pass**: The response is '`400 Bad Request`', and the connection is
+    closed.
+    """
+
+    response, errors = asyncio.run(
+        exchange(b"GET /led HTTP/1.1\r\nX-Long: " + b"x" * MAX_HEAD_SIZE + b"\r\n\r\n"),
+    )
+
+    assert response.startswith(b"HTTP/1.1 400 Bad Request")
+    assert b"Connection: close\r\n" in response
+    assert errors == []
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-1", b"+10", b"1e1", b"0x0a", b""])
+def test_invalid_content_length(length):
+    """Test.
+
+    ----.
+
+    Requests whose `Content-Length` is not a plain decimal number are
+    rejected, as the end of their body cannot be found.
+
+    Expectation
+    -----------
+
+    **Pass**: The response is '`400 Bad Request`'; the connection is closed
+    without the next request being answered; and no error is reported to the
+    event loop.
+    """
+
+    response, errors = asyncio.run(
+        exchange(
+            b"PUT /led HTTP/1.1\r\nContent-Length: "
+            + length
+            + b'\r\n\r\n{"led": 0}'
+            + b"GET /led HTTP/1.1\r\n\r\n",
+        ),
+    )
+
+    assert response.startswith(b"HTTP/1.1 400 Bad Request")
+    assert b"Connection: close\r\n" in response
+    assert response.count(b"HTTP/1.1") == 1
+    assert errors == []
+
+
+def test_valid_content_length():
+    """Test.
+
+    ----.
+
+    Bodies of the length given are read, and the connection is then used for
+    the next request.
+
+    Expectation
+    -----------
+
+    **Pass**: Both requests are answered with '`200 OK`', the second with the
+    state set by the first.
+    """
+
+    response, errors = asyncio.run(
+        exchange(
+            b'PUT /led HTTP/1.1\r\nContent-Length: 0010\r\n\r\n{"led": 0}'
+            b"GET /led HTTP/1.1\r\nConnection: close\r\n\r\n",
+        ),
+    )
+
+    assert response.count(b"HTTP/1.1 200 OK") == 2
+    assert response.endswith(b'{"led": 0}')
+    assert errors == []
@@ -0,0 +1,130 @@
+"""Tests of the bytes-level parsers of the request line and noun,
+`parse_request_line()` and `parse_noun()` in `urest.http.request`. The parsers
+are called directly, so no server (and only the standard library) is needed.
+
+Run as: `py.test test_request_line.py`
+"""
+
+import pytest
+
+import urest.http.request
+from urest.http.request import HTTPRequest, parse_noun, parse_request_line
+
+VALID_LINES = [
+    (b"GET /led HTTP/1.1", b"GET", b"/led", b"", b"HTTP/1.1"),
+    (b"PUT /led?level=1&x=2 HTTP/1.0", b"PUT", b"/led", b"level=1&x=2", b"HTTP/1.0"),
+    (b"DELETE / HTTP/1.1", b"DELETE", b"/", b"", b"HTTP/1.1"),
+    (b"OPTIONS /a/b?? HTTP/1.1", b"OPTIONS", b"/a/b", b"?", b"HTTP/1.1"),
+    (b"GET /a b HTTP/1.1", b"GET", b"/a b", b"", b"HTTP/1.1"),
+]
+
+INVALID_LINES = [
+    b"",
+    b"GET",
+    b"GET /led",
+    b" GET /led HTTP/1.1",
+    b"CONNECTS /led HTTP/1.1",
+]
+
+NOUNS = [
+    (b"/led", b"led"),
+    (b"/Green_LED0/", b"green_led0"),
+    (b"/", b""),
+    (b"/Bank1/Led3", b"bank1/led3"),
+    (b"//", b""),
+    (b"led", None),
+    (b"", None),
+    (b"/led-1", None),
+    (b"/led.json", None),
+    (b"/l%20ed", None),
+    (b"/caf\xc3\xa9", None),
+    (b"/led\x00", None),
+]
+
+
+@pytest.mark.parametrize(("line", "method", "path", "query", "version"), VALID_LINES)
+def test_request_line(line, method, path, query, version):
+    """Test.
+
+    ----.
+
+    Request lines are split into the method, path, query and version.
+
+    Expectation
+    -----------
+
+    **Pass**: The boundaries found give each part of the line, both directly
+    and through `HTTPRequest`.
+    """
+
+    method_end, path_end, target_end = parse_request_line(line)
+
+    assert line[:method_end] == method
+    assert line[method_end + 1 : path_end] == path
+    assert line[path_end + 1 : target_end] == query
+    assert line[target_end + 1 :] == version
+
+    request = HTTPRequest(line + b"\r\n\r\n")
+
+    assert request.method == method
+    assert bytes(request.path) == path
+    assert bytes(request.query) == query
+    assert request.version == version
+
+
+@pytest.mark.parametrize("line", INVALID_LINES)
+def test_invalid_request_line(line):
+    """Test.
+
+    ----.
+
+    Request lines without a method, target and version, or with a method
+    longer than any known method, are rejected.
+
+    Expectation
+    -----------
+
+    **Pass**: `ValueError` is raised.
+    """
+
+    with pytest.raises(ValueError):
+        parse_request_line(line)
+
+
+@pytest.mark.parametrize("translate", [True, False])
+@pytest.mark.parametrize(("path", "noun"), NOUNS)
+def test_noun(monkeypatch, translate, path, noun):
+    """Test.
+
+    ----.
+
+    Paths are converted to lowercase nouns, without the leading and any
+    trailing '`/`', whether or not `bytes.translate()` is available.
+
+    Expectation
+    -----------
+
+    **Pass**: The lowercase noun is returned for paths of letters, digits,
+    '`_`' and '`/`'; and `None` for any other path.
+    """
+
+    monkeypatch.setattr(urest.http.request, "_HAS_TRANSLATE", translate)
+    line = b"GET " + path + b" HTTP/1.1"
+
+    assert parse_noun(line, 4, 4 + len(path)) == noun
+
+
+def test_request_noun():
+    """Test.
+
+    ----.
+
+    The noun of a request ignores the query, and the case of the path.
+
+    Expectation
+    -----------
+
+    **Pass**: The noun of `GET /LED?level=1` is `led`.
+    """
+
+    assert HTTPRequest(b"GET /LED?level=1 HTTP/1.1\r\n\r\n").noun() == b"led"
@@ -0,0 +1,236 @@
+"""Tests of the responses assembled by `urest.http.response.HTTPResponse`: the
+head of each response, and the writes used to hand the response to the
+transport. Responses are sent to a stand-in stream recording each write, so
+only the standard library is needed.
+
+Run as: `py.test test_response.py`
+"""
+
+import asyncio
+from array import array
+
+import pytest
+
+from urest.http.response import BODY_INLINE_LIMIT, HTTPResponse, HTTPStatus
+
+
+class RecordingWriter:
+    """A stream recording a copy of each write, and the number of drains."""
+
+    def __init__(self):
+        self.writes = []
+        self.drains = 0
+
+    def write(self, data):
+        self.writes.append(bytes(data))
+
+    async def drain(self):
+        self.drains += 1
+
+
+def send(response):
+    """Send the `response` to a `RecordingWriter`, returning the writer."""
+
+    writer = RecordingWriter()
+    asyncio.run(response.send(writer))
+    return writer
+
+
+def parse(data):
+    """Split a single response into the status line, the header fields (as a
+    dictionary) and the body."""
+
+    head, _, body = data.partition(b"\r\n\r\n")
+    lines = head.split(b"\r\n")
+
+    return lines[0], dict(line.split(b": ", 1) for line in lines[1:]), body
+
+
+def test_single_write():
+    """Test.
+
+    ----.
+
+    Responses with small bodies are sent in a single write, and drained once.
+
+    Expectation
+    -----------
+
+    **Pass**: One write holds the status line, the header fields (including
+    those given by the caller) and the body.
+    """
+
+    writer = send(
+        HTTPResponse(
+            body='{"led": 1}',
+            mimetype="application/json",
+            close=False,
+            header={"ETag": '"1"'},
+        ),
+    )
+
+    assert (len(writer.writes), writer.drains) == (1, 1)
+
+    status, fields, body = parse(writer.writes[0])
+
+    assert status == b"HTTP/1.1 200 OK"
+    assert fields == {
+        b"Content-Length": b"10",
+        b"Content-Type": b"application/json",
+        b"ETag": b'"1"',
+        b"Connection": b"keep-alive",
+    }
+    assert body == b'{"led": 1}'
+
+
+def test_large_body():
+    """Test.
+
+    ----.
+
+    Bodies larger than `BODY_INLINE_LIMIT` are written after the head, rather
+    than copied into it.
+
+    Expectation
+    -----------
+
+    **Pass**: The head and body are sent in two writes, with one drain; the
+    head gives the length of the body and closes the connection.
+    """
+
+    body = b"x" * (BODY_INLINE_LIMIT + 1)
+    writer = send(HTTPResponse(body=body))
+
+    assert (len(writer.writes), writer.drains) == (2, 1)
+    assert writer.writes[1] == body
+
+    status, fields, rest = parse(writer.writes[0])
+
+    assert status == b"HTTP/1.1 200 OK"
+    assert fields[b"Content-Length"] == str(len(body)).encode()
+    assert fields[b"Content-Type"] == b"text/html"
+    assert fields[b"Connection"] == b"close"
+    assert rest == b""
+
+
+@pytest.mark.parametrize(
+    ("body", "length"),
+    [
+        ("café", 5),
+        (b"\x00\x01\x02", 3),
+        (memoryview(b"abcd")[1:], 3),
+        (memoryview(array("H", [1, 2, 3])), 6),
+        ("", 0),
+    ],
+)
+def test_content_length(body, length):
+    """Test.
+
+    ----.
+
+    The `Content-Length` counts the bytes of the body, not the characters or
+    items.
+
+    Expectation
+    -----------
+
+    **Pass**: The length sent is the number of bytes following the head.
+    """
+
+    _, fields, sent = parse(b"".join(send(HTTPResponse(body=body)).writes))
+
+    assert fields[b"Content-Length"] == str(length).encode()
+    assert len(sent) == length
+
+
+@pytest.mark.parametrize("status", list(HTTPStatus))
+def test_status_lines(status):
+    """Test.
+
+    ----.
+
+    Each status is sent with its own status line.
+
+    Expectation
+    -----------
+
+    **Pass**: The status line gives the code of the status.
+    """
+
+    status_line, _, _ = parse(send(HTTPResponse(status=status)).writes[0])
+
+    assert status_line.startswith(b"HTTP/1.1 " + str(int(status)).encode() + b" ")
+
+
+def test_not_modified():
+    """Test.
+
+    ----.
+
+    '`304 Not Modified`' responses never carry a body.
+
+    Expectation
+    -----------
+
+    **Pass**: The response has no body, and no `Content-Length` or
+    `Content-Type`, although a body was given.
+    """
+
+    _, fields, body = parse(
+        send(
+            HTTPResponse(body="ignored", status=HTTPStatus.NOT_MODIFIED),
+        ).writes[0],
+    )
+
+    assert fields == {b"Connection": b"close"}
+    assert body == b""
+
+
+def test_long_head():
+    """Test.
+
+    ----.
+
+    Heads longer than the initial head buffer are sent in full.
+
+    Expectation
+    -----------
+
+    **Pass**: A header field of 1000 bytes is sent intact, and the response
+    sent next is not affected.
+    """
+
+    value = "v" * 1000
+    _, fields, _ = parse(send(HTTPResponse(header={"X-Long": value})).writes[0])
+
+    assert fields[b"X-Long"] == value.encode()
+
+    _, fields, body = parse(send(HTTPResponse(body="ok")).writes[0])
+
+    assert b"X-Long" not in fields
+    assert body == b"ok"
+
+
+def test_freeze():
+    """Test.
+
+    ----.
+
+    Frozen responses are encoded once, and sent as they were when frozen.
+
+    Expectation
+    -----------
+
+    **Pass**: Each send writes the same bytes, ignoring later changes; and
+    responses with a streamed body raise `ValueError` when frozen.
+    """
+
+    response = HTTPResponse(body="Not Found", status=HTTPStatus.NOT_FOUND).freeze()
+    first = send(response).writes
+    response.body = "changed"
+
+    assert send(response).writes == first
+    assert parse(first[0])[2] == b"Not Found"
+
+    with pytest.raises(ValueError):
+        HTTPResponse(body=iter([b"a"])).freeze()
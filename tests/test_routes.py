@@ -0,0 +1,241 @@
+"""Tests of the routing of nouns by `urest.http.route.RouteTable`, and of the
+pre-built '`404 Not Found`' and '`405 Method Not Allowed`' responses of
+`urest.http.server.RESTServer`. The table is tested directly, and the server is
+run locally (on CPython), so only the standard library is needed.
+
+Run as: `py.test test_routes.py`
+"""
+
+import asyncio
+import socket
+
+import pytest
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+from urest.http.route import RouteTable
+
+HOST = "127.0.0.1"
+
+
+def build_table():
+    """Return a table holding the root noun, `led` and `bank1/led3`, with the
+    handler of each noun."""
+
+    table = RouteTable()
+    handlers = {noun: APIBase() for noun in ("", "led", "bank1/led3")}
+
+    for noun, handler in handlers.items():
+        table.add(noun, handler)
+
+    return table, handlers
+
+
+def test_find():
+    """Test.
+
+    ----.
+
+    Nouns are found by their canonical name, level by level.
+
+    Expectation
+    -----------
+
+    **Pass**: Each registered noun is found with its handler; the levels
+    above a hierarchical noun, and unknown nouns, are not found.
+    """
+
+    table, handlers = build_table()
+
+    for noun, handler in handlers.items():
+        route = table.find(noun.encode())
+
+        assert route.noun == noun.encode()
+        assert route.handler is handler
+
+    assert table.find(b"bank1") is None
+    assert table.find(b"bank1/led4") is None
+    assert table.find(b"switch") is None
+
+
+@pytest.mark.parametrize(
+    ("noun", "expected", "attribute"),
+    [
+        (b"led", "led", None),
+        (b"led/brightness", "led", b"brightness"),
+        (b"bank1/led3", "bank1/led3", None),
+        (b"bank1/led3/level", "bank1/led3", b"level"),
+        (b"", "", None),
+        (b"brightness", None, None),
+        (b"led/brightness/max", None, None),
+        (b"bank1", None, None),
+        (b"bank1/level", None, None),
+    ],
+)
+def test_match(noun, expected, attribute):
+    """Test.
+
+    ----.
+
+    The last level of a noun which is not in the table names an attribute of
+    the noun above it, but only if that is a registered noun other than the
+    root.
+
+    Expectation
+    -----------
+
+    **Pass**: The route and attribute found are as expected.
+    """
+
+    table, handlers = build_table()
+    route, found = table.match(noun)
+
+    if expected is None:
+        assert route is None
+    else:
+        assert route.handler is handlers[expected]
+
+    assert found == attribute
+
+
+def test_add():
+    """Test.
+
+    ----.
+
+    Nouns are added under their canonical name, replacing any noun with the
+    same canonical name; nouns with characters not allowed in a noun are
+    refused.
+
+    Expectation
+    -----------
+
+    **Pass**: `/Bank1/LED3/` is added as `bank1/led3`, and replaced by
+    `bank1/led3`; `led-1`, `led.json` and `a//b` raise `KeyError`.
+    """
+
+    table = RouteTable()
+
+    assert table.add("/Bank1/LED3/", APIBase()).noun == b"bank1/led3"
+
+    handler = APIBase()
+    table.add("bank1/led3", handler)
+
+    assert table.find(b"bank1/led3").handler is handler
+
+    for noun in ("led-1", "led.json", "a//b"):
+        with pytest.raises(KeyError):
+            table.add(noun, APIBase())
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+def parse_heads(data):
+    """Split the `data` returned by the server into a list of the heads of the
+    responses, each as a dictionary of the header fields (with lowercase
+    names), holding the status code under the name `b"status"`."""
+
+    heads = []
+
+    while data:
+        head, _, data = data.partition(b"\r\n\r\n")
+        lines = head.split(b"\r\n")
+        fields = {b"status": int(lines[0].split()[1])}
+
+        for line in lines[1:]:
+            name, _, value = line.partition(b": ")
+            fields[name.lower()] = value
+
+        data = data[int(fields.get(b"content-length", b"0")) :]
+        heads.append(fields)
+
+    return heads
+
+
+async def exchange(requests):
+    """Start a local server with the nouns `led` and `bank1/led3`, and send the
+    `requests` on one connection. Returns the heads of the responses."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32)
+
+    for noun in ("led", "bank1/led3"):
+        handler = APIBase()
+        handler.set_state({"level": 1})
+        server.register_noun(noun, handler)
+
+    await server.start()
+
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(
+            b"".join(requests) + b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n",
+        )
+        await writer.drain()
+
+        data = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+
+        return parse_heads(data)[:-1]
+    finally:
+        await server.stop()
+
+
+def request(verb, path):
+    """Return a request for the `path` with the `verb`."""
+
+    return verb + b" " + path + b" HTTP/1.1\r\n\r\n"
+
+
+def test_server_routes():
+    """Test.
+
+    ----.
+
+    Requests are routed to nouns and their attributes; requests for unknown
+    nouns are answered with '`404 Not Found`', and requests with verbs not
+    allowed for the target with '`405 Method Not Allowed`', keeping the
+    connection open.
+
+    Expectation
+    -----------
+
+    **Pass**: The status codes are as expected; the `405` responses carry the
+    verbs allowed in the `Allow` field; and every response carries
+    `Connection: keep-alive`.
+    """
+
+    heads = asyncio.run(
+        exchange(
+            [
+                request(b"GET", b"/LED"),
+                request(b"GET", b"/bank1/led3/"),
+                request(b"GET", b"/bank1/led3/level"),
+                request(b"GET", b"/switch"),
+                request(b"GET", b"/bank1"),
+                request(b"GET", b"/led-1"),
+                request(b"PATCH", b"/led"),
+                request(b"DELETE", b"/led/level"),
+            ],
+        ),
+    )
+
+    assert [head[b"status"] for head in heads] == [
+        200,
+        200,
+        200,
+        404,
+        404,
+        404,
+        405,
+        405,
+    ]
+    assert heads[6][b"allow"] == b"GET, PUT, POST, DELETE"
+    assert heads[7][b"allow"] == b"GET, PUT"
+    assert all(head[b"connection"] == b"keep-alive" for head in heads)
@@ -0,0 +1,227 @@
+"""Tests of the deadlines of `urest.http.server.RESTServer`, which cut off
+clients sending their requests too slowly. Unlike the other test scripts, the
+server is run locally (on CPython), and only the standard library is needed.
+
+Run as: `py.test test_slow_client.py`
+"""
+
+import asyncio
+import socket
+import time
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+
+HOST = "127.0.0.1"
+TRICKLE_CLIENTS = 8
+TRICKLE_INTERVAL = 0.2
+SLOW_HANDLER_DELAY = 2.5
+
+
+class SlowNoun(APIBase):
+    """A noun taking `SLOW_HANDLER_DELAY` seconds to read its state."""
+
+    async def get_state(self):
+        await asyncio.sleep(SLOW_HANDLER_DELAY)
+        return {"led": 1}
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+async def start_server(noun=None, **kwargs):
+    """Start a local test server, with short deadlines and a single noun,
+    returning the server and its port."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32, **kwargs)
+
+    if noun is None:
+        noun = APIBase()
+        noun.set_state({"led": 1})
+
+    server.register_noun("led", noun)
+
+    await server.start()
+    return server, port
+
+
+async def trickle(port, data):
+    """Send `data` to the server a byte at a time, returning the time taken
+    for the server to close the connection."""
+
+    start = time.monotonic()
+    reader, writer = await asyncio.open_connection(HOST, port)
+
+    try:
+        for byte in data:
+            writer.write(bytes((byte,)))
+            await writer.drain()
+            await asyncio.sleep(TRICKLE_INTERVAL)
+
+            if reader.at_eof():
+                break
+
+        await asyncio.wait_for(reader.read(), 10)
+    except (ConnectionError, asyncio.TimeoutError):
+        pass
+    finally:
+        writer.close()
+
+    return time.monotonic() - start
+
+
+async def fetch(port):
+    """Make a normal request of the server, returning the response."""
+
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(b"GET /led HTTP/1.1\r\nConnection: close\r\n\r\n")
+    await writer.drain()
+
+    response = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+    return response
+
+
+async def check_slow_clients(data, **kwargs):
+    """Open `TRICKLE_CLIENTS` connections sending `data` a byte at a time,
+    and check normal clients are served while they are held open. Returns the
+    times taken for the trickling connections to be closed."""
+
+    server, port = await start_server(**kwargs)
+
+    try:
+        slow = [
+            asyncio.create_task(trickle(port, data)) for _ in range(TRICKLE_CLIENTS)
+        ]
+        await asyncio.sleep(0.1)
+
+        for _ in range(5):
+            response = await fetch(port)
+            assert response.startswith(b"HTTP/1.1 200 OK")
+
+        durations = await asyncio.gather(*slow)
+
+        assert server.connections.expired == TRICKLE_CLIENTS
+        return durations
+    finally:
+        await server.stop()
+
+
+def test_slow_head():
+    """Test.
+
+    ----.
+
+    Clients sending the head of a request a byte at a time are cut off once
+    the `read_timeout` for the whole head has passed, while other clients are
+    still served.
+
+    Expectation
+    -----------
+
+    **Pass**: Normal requests are answered with `200 OK`, and every trickling
+    connection is closed, and counted as expired, within about `read_timeout`
+    seconds.
+    """
+
+    data = b"GET /led HTTP/1.1\r\nHost: " + b"x" * 64 + b"\r\n\r\n"
+    durations = asyncio.run(check_slow_clients(data, read_timeout=1))
+
+    assert max(durations) < 3
+
+
+def test_slow_body():
+    """Test.
+
+    ----.
+
+    Clients sending the body of a request a byte at a time are cut off once
+    the `body_timeout` has passed.
+
+    Expectation
+    -----------
+
+    **Pass**: Normal requests are answered with `200 OK`, and every trickling
+    connection is closed, and counted as expired, within about
+    `body_timeout` seconds of the head being sent.
+    """
+
+    body = b'{"led": "' + b"1" * 64 + b'"}'
+    head = (
+        b"PUT /led HTTP/1.1\r\nContent-Length: " + str(len(body)).encode() + b"\r\n\r\n"
+    )
+    durations = asyncio.run(check_slow_clients(head + body, body_timeout=1))
+
+    assert max(durations) < (len(head) * TRICKLE_INTERVAL) + 3
+
+
+def test_slow_exchange():
+    """Test.
+
+    ----.
+
+    Clients which stay within the deadlines for the head and the body, but
+    take too long over the request as a whole, are cut off once the
+    `exchange_timeout` has passed.
+
+    Expectation
+    -----------
+
+    **Pass**: Normal requests are answered with `200 OK`, and every trickling
+    connection is closed, and counted as expired, within about
+    `exchange_timeout` seconds.
+    """
+
+    data = b"GET /led HTTP/1.1\r\nHost: " + b"x" * 64 + b"\r\n\r\n"
+    durations = asyncio.run(
+        check_slow_clients(data, read_timeout=30, exchange_timeout=1),
+    )
+
+    assert max(durations) < 3
+
+
+async def check_slow_handler():
+    """Make a keep-alive request of a noun slower than the `keep_alive_timeout`,
+    returning the response, and the number of connections cut off."""
+
+    server, port = await start_server(SlowNoun(), keep_alive_timeout=1)
+
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(b"GET /led HTTP/1.1\r\n\r\n")
+        await writer.drain()
+
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 10)
+        writer.close()
+        await asyncio.sleep(0.1)
+
+        return head, server.connections.expired
+    finally:
+        await server.stop()
+
+
+def test_slow_handler():
+    """Test.
+
+    ----.
+
+    Handlers taking longer than the `keep_alive_timeout` are not cut off: the
+    connection is only idle once the responses to its requests have been sent.
+
+    Expectation
+    -----------
+
+    **Pass**: The request is answered with `200 OK`, and no connection is
+    counted as expired.
+    """
+
+    head, expired = asyncio.run(check_slow_handler())
+
+    assert head.startswith(b"HTTP/1.1 200 OK")
+    assert expired == 0
@@ -0,0 +1,287 @@
+"""Tests of the `JSONStreamDecoder` of `urest.http.codec`, which decodes the
+bodies of requests from the network client as they arrive. The decoder is fed
+directly, or sent to a server run locally (on CPython), so only the standard
+library is needed.
+
+Run as: `py.test test_stream_decoder.py`
+"""
+
+import asyncio
+import json
+import socket
+
+import pytest
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+from urest.http.codec import JSON, MAX_NUMBER_LENGTH, JSONCodec, JSONStreamDecoder
+
+HOST = "127.0.0.1"
+
+STATES = [
+    {},
+    {"led": 1},
+    {"led": 0, "name": "green_led0", "rate": -15},
+    {"text": 'quote " and backslash \\ and tab \t', "unicode": "température ✓"},
+    {"big": 12345678901234567890, "empty": ""},
+]
+
+INVALID_BODIES = [
+    b"",
+    b"[]",
+    b'{"a": 1',
+    b'{"a" 1}',
+    b'{"a": 1,}',
+    b'{"a": 1}}',
+    b'{"a": 1} x',
+    b"{a: 1}",
+    b'{"a": tru}',
+    b'{"a": nothing}',
+    b'{"a": [1, 2]}',
+    b'{"a": {"b": 1}}',
+    b'{"a": 1 "b": 2}',
+    b'{"a": "unterminated}',
+    b'{"a": "bad escape \\q"}',
+    b'{"a": "\xff"}',
+]
+
+
+def decode(body, piece_size=None, **limits):
+    """Feed the `body` to a new decoder in pieces of `piece_size` bytes (or
+    all at once), and return the decoded body."""
+
+    decoder = JSONStreamDecoder(**limits)
+
+    if piece_size is None:
+        decoder.feed(body)
+    else:
+        for start in range(0, len(body), piece_size):
+            decoder.feed(body[start : start + piece_size])
+
+    return decoder.close()
+
+
+@pytest.mark.parametrize("state", STATES)
+@pytest.mark.parametrize("piece_size", [None, 1, 2, 3, 7])
+def test_round_trip(state, piece_size):
+    """Test.
+
+    ----.
+
+    States encoded by the JSON codecs are decoded to the same state, however
+    the body is split into pieces: including inside escapes and multi-byte
+    characters.
+
+    Expectation
+    -----------
+
+    **Pass**: The decoded body equals the original state, and the body decoded
+    by `JSONCodec.decode()`.
+    """
+
+    for codec in (JSON, JSONCodec(None)):
+        body = codec.encode(state)
+
+        assert decode(body, piece_size) == state
+        assert decode(body, piece_size) == codec.decode(body)
+
+
+def test_conversions():
+    """Test.
+
+    ----.
+
+    Literals and numbers sent by the client are converted to the types passed
+    to the nouns.
+
+    Expectation
+    -----------
+
+    **Pass**: `true` and `false` become `1` and `0`, `null` becomes an empty
+    string, and other numbers become strings; as for `JSONCodec.decode()`.
+    """
+
+    body = b' { "t" : true , "f":false, "n": null, "x": 1.5e3, "i": -0 } '
+
+    assert decode(body, 1) == {"t": 1, "f": 0, "n": "", "x": "1500.0", "i": 0}
+    assert decode(body, 1) == JSON.decode(body)
+
+
+@pytest.mark.parametrize("body", INVALID_BODIES)
+def test_invalid(body):
+    """Test.
+
+    ----.
+
+    Bodies which are not a single, flat, JSON object of name/value pairs are
+    rejected.
+
+    Expectation
+    -----------
+
+    **Pass**: Feeding, or closing, the decoder raises `ValueError`, however
+    the body is split into pieces.
+    """
+
+    for piece_size in (None, 1):
+        with pytest.raises(ValueError):
+            decode(body, piece_size)
+
+
+def test_nested_rejected_early():
+    """Test.
+
+    ----.
+
+    Deeply nested input is rejected at the first nested bracket, without the
+    rest of the input being read.
+
+    Expectation
+    -----------
+
+    **Pass**: `ValueError` is raised by the piece holding the first nested
+    bracket, or by the first byte fed if it is not an opening brace.
+    """
+
+    decoder = JSONStreamDecoder()
+    decoder.feed(b'{"a": ')
+
+    with pytest.raises(ValueError):
+        decoder.feed(b"[" * 1000)
+
+    decoder = JSONStreamDecoder()
+
+    with pytest.raises(ValueError):
+        decoder.feed(b"[" * 1000)
+
+
+def test_max_size():
+    """Test.
+
+    ----.
+
+    Bodies longer than `max_size` are rejected as soon as the limit is passed.
+
+    Expectation
+    -----------
+
+    **Pass**: A body of exactly `max_size` bytes is decoded, and a body one
+    byte longer raises `ValueError` while it is fed.
+    """
+
+    body = json.dumps({"a": "x" * 50}).encode()
+
+    assert decode(body, 1, max_size=len(body)) == {"a": "x" * 50}
+
+    with pytest.raises(ValueError):
+        decode(body, 1, max_size=len(body) - 1)
+
+
+def test_max_keys():
+    """Test.
+
+    ----.
+
+    Bodies with more than `max_keys` distinct keys are rejected, while
+    repeated keys are not counted twice.
+
+    Expectation
+    -----------
+
+    **Pass**: `ValueError` is raised at the first key beyond the limit; and a
+    repeated key keeps the last value.
+    """
+
+    assert decode(b'{"a": 1, "b": 2, "a": 3}', max_keys=2) == {"a": 3, "b": 2}
+
+    with pytest.raises(ValueError):
+        decode(b'{"a": 1, "b": 2, "c": 3}', max_keys=2)
+
+
+def test_long_number():
+    """Test.
+
+    ----.
+
+    Numbers longer than `MAX_NUMBER_LENGTH` are rejected, rather than being
+    buffered.
+
+    Expectation
+    -----------
+
+    **Pass**: A number of `MAX_NUMBER_LENGTH` digits is decoded, and a longer
+    number raises `ValueError`.
+    """
+
+    digits = b"1" * MAX_NUMBER_LENGTH
+
+    assert decode(b'{"a": ' + digits + b"}", 1) == {"a": int(digits)}
+
+    with pytest.raises(ValueError):
+        decode(b'{"a": ' + digits + b"1}", 1)
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+async def disconnect(data):
+    """Start a local server, send it the start of a request in `data` and then
+    close the connection. Returns the data sent back, the connection counts of
+    the server, and any errors reported to the event loop."""
+
+    errors = []
+    asyncio.get_running_loop().set_exception_handler(
+        lambda loop, context: errors.append(context),
+    )
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32)
+    server.register_noun("led", APIBase())
+
+    await server.start()
+
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(data)
+        writer.write_eof()
+
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        await asyncio.sleep(0.1)
+
+        return response, server.connections, errors
+    finally:
+        await server.stop()
+
+
+@pytest.mark.parametrize("size", [20, 2000])
+def test_client_disconnect(size):
+    """Test.
+
+    ----.
+
+    Clients closing the connection part way through the body of a request,
+    whether the body is read in full or decoded as it arrives, are closed
+    quietly by the server.
+
+    Expectation
+    -----------
+
+    **Pass**: The connection is closed without a response, and counted as
+    closed; and no error is reported to the event loop.
+    """
+
+    head = b"PUT /led HTTP/1.1\r\nContent-Length: " + str(size).encode() + b"\r\n\r\n"
+
+    response, connections, errors = asyncio.run(
+        disconnect(head + b'{"led": "' + b"x" * (size // 2)),
+    )
+
+    assert response == b""
+    assert (connections.open, connections.closed) == (0, 1)
+    assert errors == []
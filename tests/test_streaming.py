@@ -0,0 +1,227 @@
+"""Tests of the streaming of large states by `urest.http.server.RESTServer`:
+the estimate of the encoded size of a state, `estimate_size()`, the encoder
+returning a state in chunks, `JSONStreamEncoder`, and the chunked responses
+sent for states larger than `stream_state_size`. The encoder is tested
+directly, and the server is run locally (on CPython), so only the standard
+library is needed.
+
+Run as: `py.test test_streaming.py`
+"""
+
+import asyncio
+import json
+import socket
+
+import pytest
+
+from urest.api.base import APIBase
+from urest.http import RESTServer
+from urest.http.codec import JSON, JSONCodec, estimate_size
+
+HOST = "127.0.0.1"
+
+LARGE_STATE = {f"sensor_{index}": "x" * 40 for index in range(200)}
+
+
+@pytest.mark.parametrize(
+    "state",
+    [
+        {"led": 1},
+        {"led": True, "level": -300, "name": "green", "ratio": 1.5},
+        LARGE_STATE,
+    ],
+)
+def test_estimate_size(state):
+    """Test.
+
+    ----.
+
+    The size of (non-empty) states without escapes is estimated exactly, and
+    the estimate stops once past the limit.
+
+    Expectation
+    -----------
+
+    **Pass**: The estimate is the length of the encoded state, with a high
+    limit; and passes, without reaching, the length with a low limit.
+    """
+
+    length = len(JSON.encode(state))
+
+    assert estimate_size(state, 1 << 20) == length
+
+    if length > 100:
+        assert 100 < estimate_size(state, 100) < length
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 512, 1 << 20])
+@pytest.mark.parametrize(
+    "codec",
+    [JSON, JSONCodec()],
+    ids=lambda codec: codec.backend,
+)
+def test_stream_encoder(codec, chunk_size):
+    """Test.
+
+    ----.
+
+    States encoded in chunks match the state encoded in full.
+
+    Expectation
+    -----------
+
+    **Pass**: No chunk is larger than `chunk_size`, or empty; and the chunks
+    join to the same bytes as `encode()`.
+    """
+
+    state = dict(LARGE_STATE, led=True, name='a "b"', ratio=1.5)
+    chunks = list(codec.encode_stream(state, chunk_size))
+
+    assert all(0 < len(chunk) <= chunk_size for chunk in chunks)
+    assert b"".join(chunks) == codec.encode(state)
+
+
+def test_stream_encoder_copy():
+    """Test.
+
+    ----.
+
+    Changes to the state while it is being encoded do not affect the chunks.
+
+    Expectation
+    -----------
+
+    **Pass**: The chunks hold the state as it was when the encoder was
+    created; and a `chunk_size` of zero raises `ValueError`.
+    """
+
+    state = {"a": 1, "b": 2}
+    encoder = JSON.encode_stream(state, 4)
+    first = next(encoder)
+
+    state["c"] = 3
+    del state["b"]
+
+    assert json.loads(first + b"".join(encoder)) == {"a": 1, "b": 2}
+
+    with pytest.raises(ValueError):
+        JSON.encode_stream(state, 0)
+
+
+def free_port():
+    """Return a local TCP port which is free for the test server."""
+
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        return probe.getsockname()[1]
+
+
+def parse_response(data):
+    """Split a single response into a dictionary of the header fields (with
+    lowercase names), and the body; joining the chunks of chunked bodies."""
+
+    head, _, data = data.partition(b"\r\n\r\n")
+    fields = {}
+
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b": ")
+        fields[name.lower()] = value
+
+    if fields.get(b"transfer-encoding") != b"chunked":
+        return fields, data
+
+    body = b""
+
+    while True:
+        size, _, data = data.partition(b"\r\n")
+        size = int(size, 16)
+
+        if size == 0:
+            assert data == b"\r\n"
+            return fields, body
+
+        assert data[size : size + 2] == b"\r\n"
+        body, data = body + data[:size], data[size + 2 :]
+
+
+async def fetch(state, version, **kwargs):
+    """Start a local server created with `kwargs`, holding a noun with the
+    `state`, and request the state with the HTTP `version`. Returns the header
+    fields and the body of the response."""
+
+    port = free_port()
+    server = RESTServer(host=HOST, port=port, backlog=32, **kwargs)
+
+    noun = APIBase()
+    noun.set_state(state)
+    server.register_noun("sensors", noun)
+
+    await server.start()
+
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(b"GET /sensors " + version + b"\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+
+        data = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+
+        return parse_response(data)
+    finally:
+        await server.stop()
+
+
+def test_server_stream():
+    """Test.
+
+    ----.
+
+    States larger than `stream_state_size` are sent to HTTP/1.1 clients in
+    chunks, and smaller states with a known length.
+
+    Expectation
+    -----------
+
+    **Pass**: The large state is sent with `Transfer-Encoding: chunked` and
+    an `ETag`, and no `Content-Length`; the small state with a
+    `Content-Length`. Both bodies hold the state.
+    """
+
+    fields, body = asyncio.run(fetch(LARGE_STATE, b"HTTP/1.1"))
+
+    assert fields[b"transfer-encoding"] == b"chunked"
+    assert b"content-length" not in fields
+    assert b"etag" in fields
+    assert json.loads(body) == LARGE_STATE
+
+    fields, body = asyncio.run(fetch({"led": 1}, b"HTTP/1.1"))
+
+    assert fields[b"content-length"] == str(len(body)).encode()
+    assert json.loads(body) == {"led": 1}
+
+
+def test_server_stream_limits():
+    """Test.
+
+    ----.
+
+    States are only sent in chunks to clients which understand chunks, and
+    only when larger than `stream_state_size`.
+
+    Expectation
+    -----------
+
+    **Pass**: The large state is sent to HTTP/1.0 clients, and to HTTP/1.1
+    clients of a server with a higher `stream_state_size`, with a
+    `Content-Length`.
+    """
+
+    for version, kwargs in [
+        (b"HTTP/1.0", {}),
+        (b"HTTP/1.1", {"stream_state_size": 1 << 16}),
+    ]:
+        fields, body = asyncio.run(fetch(LARGE_STATE, version, **kwargs))
+
+        assert b"transfer-encoding" not in fields
+        assert fields[b"content-length"] == str(len(body)).encode()
+        assert json.loads(body) == LARGE_STATE
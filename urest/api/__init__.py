@@ -76,6 +76,36 @@ GET /LED HTTP 1.1
 
 will **also** route to the same noun with the canonical name `led`.
 
+Nouns may also be hierarchical, with each level of the noun separated by a
+'`/`' in the same way as the path of the URI. For instance
+
+```python
+app.register_noun('bank1/led3', SimpleLED(28))
+```
+
+will be routed from the request
+
+```
+GET /bank1/led3 HTTP 1.1
+```
+
+Requests for nouns which have not been registered are answered with the HTTP
+response '`404 Not Found`'.
+
+A single attribute of a noun can also be read, or written, by adding the name
+of the attribute to the noun. For instance
+
+```
+GET /bank1/led3/brightness HTTP 1.1
+```
+
+returns only the `brightness` of the noun `bank1/led3`, through the
+[`APIBase.get_attribute()`][urest.api.base.APIBase.get_attribute] method.
+Similarly a `PUT` request to the same URI, with a body of the form
+`{"brightness": 50}`, calls the
+[`APIBase.set_attribute()`][urest.api.base.APIBase.set_attribute] method. Only
+`GET` and `PUT` are allowed for single attributes.
+
 !!! Note
     All nouns are checked by [`RESTServer`][urest.http.server.RESTServer], and
     nouns will not be properly routed unless [`APIBase`][urest.api.base.APIBase]
@@ -40,9 +40,9 @@
 
 # Import the typing support
 try:
-    from typing import Union
+    from typing import Coroutine, Optional, Union  # noqa: UP035
 except ImportError:
-    from urest.typing import Union  # type: ignore
+    from urest.typing import Coroutine, Optional, Union  # type: ignore
 
 
 class APIBase:
@@ -92,6 +92,18 @@ class APIBase:
         not_ be passed onto sub-classes of `APIBase`. In this case an error
         will be returned to the client, and the methods of `APIBase` _will
         not_ be called with the partial data.
+
+    !!! note "Co-routine Methods"
+        Sub-classes which need to wait for slow hardware (for instance an I2C
+        sensor, or a UART device) may define `get_state`, `set_state`,
+        `update_state`, `delete_state`, `get_attribute`, `set_attribute` or
+        `get_raw` with `async def`. The [`RESTServer`]
+        [urest.http.server.RESTServer] awaits the co-routines returned by
+        these methods, so that other clients are served in the meantime, up to
+        the `timeout` given when the noun was registered (see
+        [`RESTServer.register_noun()`]
+        [urest.http.server.RESTServer.register_noun]). Requests which take
+        longer are answered with '`504 Gateway Timeout`'.
     """
 
     ##
@@ -101,6 +113,16 @@ class APIBase:
     _state_attributes: dict[str, Union[str, int]]
     """The current state and attributes of the resource."""
 
+    _state_version: int = 0
+    """Incremented by `touch` on each change of the state of the resource."""
+
+    cacheable: bool = True
+    """When `True` the [`RESTServer`][urest.http.server.RESTServer] may answer
+    repeated `GET` requests from the encoded response cached for the current
+    `state_version`, without calling `get_state`. Sub-classes whose state
+    changes without a call to `touch` (for instance by reading live hardware
+    in `get_state`) must set this to `False`."""
+
     ##
     ## Constructor
     ##
@@ -108,10 +130,162 @@ class APIBase:
     def __init__(self) -> None:
         self._state_attributes = {"": 0}
 
+    ##
+    ## Getters and Setters
+    ##
+
+    @property
+    def state_version(self) -> int:
+        """A counter which changes each time the state of the resource changes,
+        used to find stale entries in the response cache of the
+        [`RESTServer`][urest.http.server.RESTServer]."""
+
+        return self._state_version
+
+    ##
+    ## Functions
+    ##
+
+    def touch(self) -> None:
+        """Record a change in the state of the resource, by moving on the
+        `state_version`.
+
+        The default state manipulation methods call this method, so each
+        change through them moves the `state_version` on once. After each
+        request which changes the state of the resource the
+        [`RESTServer`][urest.http.server.RESTServer] only calls this method if
+        the `state_version` has not already moved: for instance if a sub-class
+        overrides the state manipulation methods without calling `touch`, or
+        the methods ran in another process. Sub-classes which change their
+        state at any other time (for instance from a background task) should
+        call this method once the change is complete.
+        """
+
+        self._state_version += 1
+
+    ##
+    ## Attribute Access Methods
+    ##
+
+    def get_attribute(self, key: str) -> Optional[Union[str, int]]:
+        """Return the value of the single attribute `key` of the resource, or
+        `None` if the resource has no such attribute. Used by the
+        [`RESTServer`][urest.http.server.RESTServer] to answer requests of the
+        form `GET /noun/key`.
+
+        By default this method looks up the `key` in the state returned by
+        `get_state`, ignoring the case of the keys. Sub-classes whose state is
+        expensive to read in full (for instance a sensor with many fields) are
+        expected to override this method, reading only the attribute requested.
+
+        Parameters
+        ----------
+
+        key: str
+            The (lowercase) name of the attribute requested by the client.
+
+        Returns
+        -------
+
+        Optional[Union[str, int]]
+            The value of the attribute, or `None` if the attribute is not
+            part of the state of the resource.
+
+        """
+
+        state = self.get_state()
+
+        # Nouns with a co-routine `get_state` get a co-routine here too
+        if hasattr(state, "send"):
+            return self._get_attribute_async(state, key)
+
+        return self._find_attribute(state, key)
+
+    async def _get_attribute_async(
+        self,
+        state: Coroutine,
+        key: str,
+    ) -> Optional[Union[str, int]]:
+        """Await the `state` from a co-routine `get_state`, and return the value
+        of the attribute `key`."""
+
+        return self._find_attribute(await state, key)
+
+    def _find_attribute(
+        self,
+        state: dict[str, Union[str, int]],
+        key: str,
+    ) -> Optional[Union[str, int]]:
+        """Return the value of the attribute `key` in the `state`, ignoring the
+        case of the keys, or `None` if not found."""
+
+        if key in state:
+            return state[key]
+
+        for state_key in state:
+            if state_key.lower() == key:
+                return state[state_key]
+
+        return None
+
+    def set_attribute(self, key: str, value: Union[str, int]) -> Optional[Coroutine]:
+        """Set the value of the single attribute `key` of the resource. Used by
+        the [`RESTServer`][urest.http.server.RESTServer] to handle requests of
+        the form `PUT /noun/key`.
+
+        By default this method passes the attribute to `update_state`, and
+        returns the co-routine returned by `update_state` (if any).
+        Sub-classes may override this method to avoid building the partial
+        state for a single attribute.
+
+        Parameters
+        ----------
+
+        key: str
+            The (lowercase) name of the attribute to set.
+        value: Union[str, int]
+            The new value of the attribute, as sent by the client.
+
+        Returns
+        -------
+
+        Optional[Coroutine]
+            The co-routine returned by `update_state`, if any.
+
+        """
+
+        return self.update_state({key: value})
+
     ##
     ## State Manipulation Methods
     ##
 
+    def get_raw(self) -> Optional[tuple[Union[bytes, bytearray, memoryview], str]]:
+        """Return the state of the resource already encoded, together with the
+        MIME type of the encoding; or `None` (the default) if the state should
+        be read through `get_state` and encoded by the
+        [`RESTServer`][urest.http.server.RESTServer].
+
+        Sub-classes which already hold their state as encoded bytes (for
+        instance an image from a camera, or a block of JSON from a
+        co-processor) may override this method to have the buffer sent to the
+        client for a `GET` request of the noun as it is: without being encoded,
+        compressed or cached. Buffers larger than [`BODY_INLINE_LIMIT`]
+        [urest.http.response.BODY_INLINE_LIMIT] are also handed to the network
+        without being copied, and so must not be changed until the next call of
+        this method.
+
+        Returns
+        -------
+
+        Optional[tuple[Union[bytes, bytearray, memoryview], str]]
+            The encoded state and its MIME type (e.g. `"image/jpeg"`), or
+            `None`.
+
+        """
+
+        return None
+
     def get_state(self) -> dict[str, Union[str, int]]:
         """Return the state of the resource, as defined by the sub-classes. By
         default this method will return the contents of the private
@@ -153,6 +327,8 @@ class APIBase:
         else:
             self._state_attributes = {"": 0}
 
+        self.touch()
+
     def update_state(
         self,
         state_attributes: dict[str, Union[str, int]],
@@ -185,6 +361,8 @@ class APIBase:
         else:
             self._state_attributes = {"": 0}
 
+        self.touch()
+
     def delete_state(self) -> None:
         """Remove the internal state of the resource, essentially 'resetting'
         or re-initialising the object.
@@ -196,3 +374,5 @@ class APIBase:
         """
 
         self._state_attributes = {"": 0}
+
+        self.touch()
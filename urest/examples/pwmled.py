@@ -124,6 +124,7 @@ class PWMLED(APIBase):
             await asyncio.sleep_ms(1000)  # type: ignore
 
         self._state_attributes["current"] = 1
+        self.touch()
 
         # Set the duty cycle to maximum before we leave,
         # and release the GPIO lock
@@ -152,6 +153,7 @@ class PWMLED(APIBase):
             await asyncio.sleep_ms(1000)  # type: ignore
 
         self._state_attributes["current"] = 0
+        self.touch()
 
         # Set the duty cycle to 0 before we leave,
         # and release the GPIO lock
@@ -74,8 +74,13 @@ class SimpleLED(APIBase):
     equivalent to `0` for `led` will result in the output being set `off`
     ('`low`'): any other integer value will be interpreted as `1` and set the
     input `on` ('`high`').
+
+    As the state is read directly from the GPIO pin, the class is not
+    `cacheable`: every `GET` request will read the current value of the pin.
     """
 
+    cacheable = False
+
     def __init__(self, pin: Pin) -> None:
         self._gpio = Pin(pin, Pin.OUT)
         self._gpio.off()
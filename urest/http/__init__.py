@@ -216,5 +216,6 @@ This version is written for MicroPython 3.4, and has been tested on:
 """
 
 ### Expose the `http` module interface
+from .request import HTTPRequest
 from .response import HTTPResponse
 from .server import RESTServer
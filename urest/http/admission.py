@@ -0,0 +1,228 @@
+# This module, and all included code, is made available under the terms of the MIT
+# Licence
+#
+# Copyright (c) 2022-2023 David Love
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+# the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""Limits the number of requests the server works on at once, so that a burst
+of clients degrades the service gracefully rather than exhausting the memory
+of the board.
+
+Each request is admitted by the [`AdmissionControl`]
+[urest.http.admission.AdmissionControl] of the [`RESTServer`]
+[urest.http.server.RESTServer] as soon as its head has been read, and holds a
+[`Ticket`][urest.http.admission.Ticket] until the handler of its noun has
+finished. Requests which would take the server past its limit are answered at
+once with a pre-built '`503 Service Unavailable`', carrying a `Retry-After`
+header field, and the connection is closed without reading the body.
+
+Requests are admitted in one of two lanes. Reads (`GET`) may use every slot up
+to the limit; writes (`PUT`, `POST` and `DELETE`) may not use the last
+`priority_slots` slots, which are held back so that health checks and polls
+are still answered under a burst of bulk writes.
+
+The limit may also be _adaptive_. Each request records how long its handler
+took, and how long it waited to be run after being read (which grows with the
+lag of the event loop). While both stay below a target, the limit grows by
+about one slot for each `limit` requests, up to `max_inflight`; once either
+passes the target, the limit is cut by a quarter (additive increase,
+multiplicative decrease). The limit is cut at most once in each period of the
+target, so that one slow burst does not collapse it; and never below one slot
+more than the `priority_slots`, so that writes are always admitted when the
+server is idle.
+"""
+
+# Import the typing support
+try:
+    from typing import Optional
+except ImportError:
+    from urest.typing import Optional  # type: ignore
+
+# Import the millisecond timers, falling back to the fake version on CPython
+try:
+    from time import ticks_diff, ticks_ms  # type: ignore
+except ImportError:
+    from urest.ticks import ticks_diff, ticks_ms
+
+###
+### Constants
+###
+
+READ_LANE = 0
+"""The lane of requests which read the state of a noun."""
+
+WRITE_LANE = 1
+"""The lane of requests which change the state of a noun."""
+
+_DECREASE = 0.75
+
+###
+### Classes
+###
+
+
+class Ticket:
+    """The admission of a single request, held from the time the head of the
+    request was read until its handler has finished. Releasing a ticket more
+    than once has no further effect.
+
+    Attributes
+    ----------
+
+    lane: integer
+        The lane the request was admitted in.
+    admitted: integer
+        The time (from `ticks_ms()`) the request was admitted.
+    ready: integer
+        The time (from `ticks_ms()`) the request was ready for its handler,
+        i.e. once the body had been read.
+
+    """
+
+    def __init__(self, control: "AdmissionControl", lane: int) -> None:
+        self.lane = lane
+        self.admitted = ticks_ms()
+        self.ready = self.admitted
+        self._control = control
+
+    def release(self, started: Optional[int] = None) -> None:
+        """Give up the slot held by the request. If the handler of the request
+        ran, `started` is the time (from `ticks_ms()`) it started."""
+
+        if self._control is not None:
+            self._control.release(self, started)
+            self._control = None
+
+
+class AdmissionControl:
+    """Admit requests up to a limit on the number in flight, holding back
+    `priority_slots` of the slots for reads, and (if `target_ms` is not
+    `None`) adapting the limit to the latency of the handlers.
+
+    Attributes
+    ----------
+
+    max_inflight: integer
+        The most requests which are ever admitted at once.
+    priority_slots: integer
+        The number of slots which only reads may use.
+    target_ms: Optional[integer]
+        The handler latency (and wait to be run), in milliseconds, above which
+        the limit is cut; or `None` for a fixed limit.
+    limit: float
+        The current limit on the requests in flight.
+    inflight: integer
+        The number of requests admitted, and not yet released.
+    admitted: integer
+        The number of requests admitted.
+    shed: integer
+        The number of requests refused.
+
+    Raises
+    ------
+
+    ValueError:
+        If `max_inflight` is not greater than `priority_slots`, leaving no
+        slots for writes.
+
+    """
+
+    ##
+    ## Attributes
+    ##
+
+    max_inflight: int
+    priority_slots: int
+    target_ms: Optional[int]
+    limit: float
+    inflight: int
+    admitted: int
+    shed: int
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(
+        self,
+        max_inflight: int,
+        priority_slots: int = 1,
+        target_ms: Optional[int] = None,
+    ) -> None:
+        # Writes may only use the slots beyond the `priority_slots`, so at
+        # least one must be left for them
+        if max_inflight <= priority_slots:
+            msg = "The max_inflight must be greater than the priority_slots"
+            raise ValueError(msg)
+
+        self.max_inflight = max_inflight
+        self.priority_slots = priority_slots
+        self.target_ms = target_ms
+        self.limit = max_inflight
+        self.inflight = 0
+        self.admitted = 0
+        self.shed = 0
+        self._floor = priority_slots + 1
+        self._last_cut = ticks_ms()
+
+    ##
+    ## Functions
+    ##
+
+    def admit(self, method: bytes) -> Optional[Ticket]:
+        """Admit the request with the given `method`, returning its
+        [`Ticket`][urest.http.admission.Ticket]; or `None` if the request
+        should be refused."""
+
+        lane = READ_LANE if method == b"GET" else WRITE_LANE
+        limit = int(self.limit)
+
+        if lane == WRITE_LANE:
+            limit -= self.priority_slots
+
+        if self.inflight >= limit:
+            self.shed += 1
+            return None
+
+        self.inflight += 1
+        self.admitted += 1
+        return Ticket(self, lane)
+
+    def release(self, ticket: Ticket, started: Optional[int]) -> None:
+        """Release the slot held by the `ticket`, adapting the limit to the time
+        the handler `started` and finished (if the handler ran). Called by
+        [`Ticket.release()`][urest.http.admission.Ticket.release]."""
+
+        self.inflight -= 1
+
+        if self.target_ms is None or started is None:
+            return
+
+        delay = max(
+            ticks_diff(ticks_ms(), started),
+            ticks_diff(started, ticket.ready),
+        )
+
+        if delay > self.target_ms:
+            now = ticks_ms()
+
+            if ticks_diff(now, self._last_cut) > self.target_ms:
+                self.limit = max(self._floor, self.limit * _DECREASE)
+                self._last_cut = now
+        else:
+            self.limit = min(self.max_inflight, self.limit + 1 / self.limit)
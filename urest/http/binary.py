@@ -0,0 +1,670 @@
+# This module, and all included code, is made available under the terms of the MIT
+# Licence
+#
+# Copyright (c) 2022-2023 David Love
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+# the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""Compact binary encodings of the state of the nouns, as an alternative to
+the JSON of [`urest.http.codec`][urest.http.codec] for clients which ask for
+them.
+
+Two encodings are provided, each as a small pure-Python codec with the same
+interface as [`JSONCodec`][urest.http.codec.JSONCodec]:
+
+* [`CBOR`][urest.http.binary.CBOR]: the Concise Binary Object Representation
+  of RFC 8949, sent as `application/cbor`.
+* [`MSGPACK`][urest.http.binary.MSGPACK]: the
+  [MessagePack](https://msgpack.org) format, sent as `application/msgpack`
+  (or accepted as `application/x-msgpack`).
+
+The [`RESTServer`][urest.http.server.RESTServer] chooses the encoding of each
+response from the `Accept` header field of the request, and the decoding of
+each request body from its `Content-Type`. JSON remains the default in both
+cases. Both encodings follow the same rules as the JSON codecs for the
+conversion of the state of the nouns (see [`urest.http.codec`]
+[urest.http.codec]): the state is sent as a single map, with text keys and
+integer or text values. Integers which cannot be held in 64 bits are sent as
+text. Bodies from the client may also hold booleans, `null` (or `undefined`)
+and floating point values, which are converted as for JSON. Byte strings,
+arrays, maps, tags and extension types are rejected as values; as are
+indefinite-length items, other than the top-level map of a CBOR body.
+
+Standards
+---------
+
+  * For CBOR see: https://www.rfc-editor.org/rfc/rfc8949
+  * For MessagePack see: https://github.com/msgpack/msgpack/blob/master/spec.md
+"""
+
+# Import the binary packing library, which is `ustruct` on older MicroPython
+# releases
+try:
+    import struct
+except ImportError:
+    import ustruct as struct  # type: ignore
+
+# Import const support, falling back to the fake version on Python/CPython
+try:
+    from micropython import const
+except ImportError:
+    from urest.const import const  # type: ignore
+
+# Import the typing support
+try:
+    from typing import Union
+except ImportError:
+    from urest.typing import Union  # type: ignore
+
+from .codec import (
+    MAX_BODY_KEYS,
+    MAX_BODY_SIZE,
+    BufferedDecoder,
+    normalise_body,
+    normalise_state,
+)
+
+###
+### Constants
+###
+
+_UINT64_LIMIT = 1 << 64
+_INT64_LIMIT = 1 << 63
+
+# CBOR major types (RFC 8949, Section 3.1)
+_CBOR_UNSIGNED = const(0)
+_CBOR_NEGATIVE = const(1)
+_CBOR_TEXT = const(3)
+_CBOR_MAP = const(5)
+_CBOR_SIMPLE = const(7)
+
+# Arguments below this limit are held in the initial byte of a CBOR item
+_CBOR_DIRECT_LIMIT = const(24)
+_CBOR_INFO_MASK = const(0x1F)
+_CBOR_INDEFINITE = const(31)
+_CBOR_BREAK = const(0xFF)
+_CBOR_HALF_FLOAT = const(25)
+
+# The additional information, and packing, of the CBOR arguments too large to
+# be held in the initial byte; by the (exclusive) upper limit of the argument
+_CBOR_ARGUMENTS = (
+    (0x100, 24, ">B"),
+    (0x10000, 25, ">H"),
+    (0x100000000, 26, ">I"),
+    (_UINT64_LIMIT, 27, ">Q"),
+)
+
+# Sizes of the argument following the initial byte of a CBOR item, from the
+# additional information in the initial byte
+_CBOR_ARGUMENT_SIZES = {24: 1, 25: 2, 26: 4, 27: 8}
+
+# The CBOR simple values (RFC 8949, Section 3.3), and the packing of the
+# (single and double precision) floats, by the additional information
+_CBOR_SIMPLE_VALUES = {20: False, 21: True, 22: None, 23: None}
+_CBOR_FLOATS = {26: (">f", 4), 27: (">d", 8)}
+
+# Limits of the MessagePack items held (mostly) in the initial byte
+_MSGPACK_FIXINT_LIMIT = const(0x80)
+_MSGPACK_NEGATIVE_FIXINT = const(0xE0)
+_MSGPACK_NEGATIVE_FIXINT_LIMIT = const(-0x20)
+_MSGPACK_FIXMAP = const(0x80)
+_MSGPACK_FIXMAP_LIMIT = const(0x10)
+_MSGPACK_FIXMAP_MASK = const(0xF0)
+_MSGPACK_FIXSTR = const(0xA0)
+_MSGPACK_FIXSTR_LIMIT = const(0x20)
+_MSGPACK_FIXSTR_MASK = const(0xE0)
+
+# The initial byte, and packing, of the longer MessagePack items; by the
+# (exclusive) upper limit of the length or value. Negative integers are given
+# by the (inclusive) lower limit of the value
+_MSGPACK_MAP_HEADS = ((0x10000, 0xDE, ">H"), (0x100000000, 0xDF, ">I"))
+_MSGPACK_STRING_HEADS = (
+    (0x100, 0xD9, ">B"),
+    (0x10000, 0xDA, ">H"),
+    (0x100000000, 0xDB, ">I"),
+)
+_MSGPACK_UNSIGNED_HEADS = (
+    (0x100, 0xCC, ">B"),
+    (0x10000, 0xCD, ">H"),
+    (0x100000000, 0xCE, ">I"),
+    (_UINT64_LIMIT, 0xCF, ">Q"),
+)
+_MSGPACK_NEGATIVE_HEADS = (
+    (-0x80, 0xD0, ">b"),
+    (-0x8000, 0xD1, ">h"),
+    (-0x80000000, 0xD2, ">i"),
+    (-_INT64_LIMIT, 0xD3, ">q"),
+)
+
+# The packing of the MessagePack maps, numbers and strings, indexed by the
+# initial byte of the item
+_MSGPACK_MAPS = {0xDE: (">H", 2), 0xDF: (">I", 4)}
+_MSGPACK_NUMBERS = {
+    0xCA: (">f", 4),
+    0xCB: (">d", 8),
+    0xCC: (">B", 1),
+    0xCD: (">H", 2),
+    0xCE: (">I", 4),
+    0xCF: (">Q", 8),
+    0xD0: (">b", 1),
+    0xD1: (">h", 2),
+    0xD2: (">i", 4),
+    0xD3: (">q", 8),
+}
+_MSGPACK_STRINGS = {0xD9: (">B", 1), 0xDA: (">H", 2), 0xDB: (">I", 4)}
+
+# The MessagePack `nil`, `false` and `true` values
+_MSGPACK_CONSTANTS = {0xC0: None, 0xC2: False, 0xC3: True}
+
+###
+### Functions
+###
+
+
+def _unpack(
+    data: bytes,
+    position: int,
+    fmt: str,
+    size: int,
+) -> tuple[Union[int, float], int]:
+    """Return the value packed in the format `fmt` at `position` in the `data`,
+    and the position following the value."""
+
+    end = position + size
+
+    if end > len(data):
+        msg = "The body of the request is incomplete"
+        raise ValueError(msg)
+
+    return (struct.unpack_from(fmt, data, position)[0], end)
+
+
+def _text(data: bytes, position: int, length: int) -> tuple[str, int]:
+    """Return the UTF-8 string of `length` bytes at `position` in the `data`,
+    and the position following the string."""
+
+    end = position + length
+
+    if end > len(data):
+        msg = "The body of the request is incomplete"
+        raise ValueError(msg)
+
+    return (bytes(data[position:end]).decode(), end)
+
+
+def _half_float(bits: int) -> float:
+    """Return the value of an IEEE 754 half-precision float, which can't be
+    unpacked by `struct` on all platforms."""
+
+    exponent = (bits >> 10) & 0x1F
+    mantissa = bits & 0x3FF
+
+    if exponent == 0:
+        value = mantissa * 2.0**-24
+    elif exponent == 0x1F:  # noqa: PLR2004
+        value = float("nan") if mantissa else float("inf")
+    else:
+        value = (mantissa + 1024) * 2.0 ** (exponent - 25)
+
+    return -value if bits & 0x8000 else value
+
+
+def _append_head(out: bytearray, heads: tuple, value: int) -> None:
+    """Append to `out` the initial byte, and packed `value`, of the first entry
+    in `heads` whose limit is above the `value`."""
+
+    for limit, initial, fmt in heads:
+        if value < limit:
+            out.append(initial)
+            out.extend(struct.pack(fmt, value))
+            return
+
+
+###
+### Classes
+###
+
+
+class CBORCodec:
+    """Encode, and decode, the state of the nouns as CBOR maps (RFC 8949).
+
+    Attributes
+    ----------
+
+    name: str
+        The short name of the encoding.
+    backend: str
+        The name of the library used by the codec: always `"python"`.
+    content_type: str
+        The MIME type of the encoded data.
+    media_types: tuple[str, ...]
+        The MIME types accepted for the encoded data.
+
+    """
+
+    ##
+    ## Attributes
+    ##
+
+    name: str = "cbor"
+    backend: str = "python"
+    content_type: str = "application/cbor"
+    media_types: tuple = ("application/cbor",)
+
+    ##
+    ## Functions
+    ##
+
+    def encode(self, state: dict) -> bytes:
+        """Return the `state` of a noun encoded as a CBOR map.
+
+        Parameters
+        ----------
+
+        state: dict
+            The state, or part of the state, of a noun.
+
+        Returns
+        -------
+
+        bytes
+            The encoded state.
+
+        """
+
+        state = normalise_state(state)
+        out = bytearray()
+
+        self._head(out, _CBOR_MAP, len(state))
+
+        for key in state:
+            self._text(out, key)
+            value = state[key]
+
+            if isinstance(value, str) or not -_UINT64_LIMIT <= value < _UINT64_LIMIT:
+                self._text(out, str(value))
+            elif value >= 0:
+                self._head(out, _CBOR_UNSIGNED, value)
+            else:
+                self._head(out, _CBOR_NEGATIVE, -1 - value)
+
+        return bytes(out)
+
+    def decode(self, data: bytes) -> dict[str, Union[str, int]]:
+        """Return the body of a request, decoded from a CBOR map.
+
+        Parameters
+        ----------
+
+        data: bytes
+            The raw body of the request.
+
+        Raises
+        ------
+
+        ValueError
+            If the `data` is not a single CBOR map, or cannot be converted to
+            the types passed to the nouns.
+
+        Returns
+        -------
+
+        dict[str, Union[str, int]]
+            The name/value pairs of the body.
+
+        """
+
+        if len(data) == 0 or data[0] >> 5 != _CBOR_MAP:
+            msg = "The body of the request is not a CBOR map"
+            raise ValueError(msg)
+
+        body = {}
+        info = data[0] & _CBOR_INFO_MASK
+
+        # Maps of a known size hold a count of the pairs that follow ...
+        if info != _CBOR_INDEFINITE:
+            count, position = self._argument(data, 1, info)
+
+            for _ in range(count):
+                position = self._pair(data, position, body)
+
+        # ... otherwise the pairs end with a 'break'
+        else:
+            position = 1
+
+            while True:
+                if position >= len(data):
+                    msg = "The body of the request is incomplete"
+                    raise ValueError(msg)
+
+                if data[position] == _CBOR_BREAK:
+                    position += 1
+                    break
+
+                position = self._pair(data, position, body)
+
+        if position != len(data):
+            msg = "The body of the request has data after the CBOR map"
+            raise ValueError(msg)
+
+        return normalise_body(body)
+
+    def stream_decoder(
+        self,
+        max_size: int = MAX_BODY_SIZE,
+        max_keys: int = MAX_BODY_KEYS,
+    ) -> BufferedDecoder:
+        """Return a decoder to which the body of a request can be fed as it
+        arrives. See [`BufferedDecoder`][urest.http.codec.BufferedDecoder]."""
+
+        return BufferedDecoder(self, max_size, max_keys)
+
+    def _head(self, out: bytearray, major: int, argument: int) -> None:
+        """Append the initial byte of an item of the `major` type to `out`,
+        followed by the `argument` in the fewest bytes possible."""
+
+        major <<= 5
+
+        if argument < _CBOR_DIRECT_LIMIT:
+            out.append(major | argument)
+            return
+
+        for limit, info, fmt in _CBOR_ARGUMENTS:
+            if argument < limit:
+                out.append(major | info)
+                out.extend(struct.pack(fmt, argument))
+                return
+
+    def _text(self, out: bytearray, text: str) -> None:
+        """Append `text` to `out` as a CBOR text string."""
+
+        encoded = text.encode()
+        self._head(out, _CBOR_TEXT, len(encoded))
+        out.extend(encoded)
+
+    def _argument(self, data: bytes, position: int, info: int) -> tuple[int, int]:
+        """Return the argument of the item whose initial byte has the additional
+        information `info`, and the position following the argument."""
+
+        if info < _CBOR_DIRECT_LIMIT:
+            return (info, position)
+
+        if info not in _CBOR_ARGUMENT_SIZES:
+            msg = "The body of the request holds an unsupported CBOR item"
+            raise ValueError(msg)
+
+        end = position + _CBOR_ARGUMENT_SIZES[info]
+
+        if end > len(data):
+            msg = "The body of the request is incomplete"
+            raise ValueError(msg)
+
+        return (int.from_bytes(data[position:end], "big"), end)
+
+    def _pair(self, data: bytes, position: int, body: dict) -> int:
+        """Decode the key and value at `position` in the `data` into `body`,
+        returning the position following the value."""
+
+        key, position = self._item(data, position)
+
+        # All invalid bodies raise `ValueError`, as for the JSON codecs
+        if not isinstance(key, str):
+            msg = "The keys of the body must be strings"
+            raise ValueError(msg)  # noqa: TRY004
+
+        body[key], position = self._item(data, position)
+        return position
+
+    def _item(self, data: bytes, position: int) -> tuple[object, int]:
+        """Return the (scalar) item at `position` in the `data`, and the
+        position following the item."""
+
+        if position >= len(data):
+            msg = "The body of the request is incomplete"
+            raise ValueError(msg)
+
+        major = data[position] >> 5
+        info = data[position] & _CBOR_INFO_MASK
+        position += 1
+
+        # Simple values and floats ...
+        if major == _CBOR_SIMPLE:
+            if info in _CBOR_SIMPLE_VALUES:
+                return (_CBOR_SIMPLE_VALUES[info], position)
+
+            if info == _CBOR_HALF_FLOAT:
+                bits, position = _unpack(data, position, ">H", 2)
+                return (_half_float(bits), position)
+
+            if info in _CBOR_FLOATS:
+                fmt, size = _CBOR_FLOATS[info]
+                return _unpack(data, position, fmt, size)
+
+        # ... integers and text
+        elif major in (_CBOR_UNSIGNED, _CBOR_NEGATIVE, _CBOR_TEXT):
+            argument, position = self._argument(data, position, info)
+
+            if major == _CBOR_TEXT:
+                return _text(data, position, argument)
+
+            return (argument if major == _CBOR_UNSIGNED else -1 - argument, position)
+
+        msg = "The body of the request holds an unsupported CBOR item"
+        raise ValueError(msg)
+
+
+class MessagePackCodec:
+    """Encode, and decode, the state of the nouns as MessagePack maps.
+
+    Attributes
+    ----------
+
+    name: str
+        The short name of the encoding.
+    backend: str
+        The name of the library used by the codec: always `"python"`.
+    content_type: str
+        The MIME type of the encoded data.
+    media_types: tuple[str, ...]
+        The MIME types accepted for the encoded data.
+
+    """
+
+    ##
+    ## Attributes
+    ##
+
+    name: str = "msgpack"
+    backend: str = "python"
+    content_type: str = "application/msgpack"
+    media_types: tuple = ("application/msgpack", "application/x-msgpack")
+
+    ##
+    ## Functions
+    ##
+
+    def encode(self, state: dict) -> bytes:
+        """Return the `state` of a noun encoded as a MessagePack map.
+
+        Parameters
+        ----------
+
+        state: dict
+            The state, or part of the state, of a noun.
+
+        Returns
+        -------
+
+        bytes
+            The encoded state.
+
+        """
+
+        state = normalise_state(state)
+        out = bytearray()
+
+        if len(state) < _MSGPACK_FIXMAP_LIMIT:
+            out.append(_MSGPACK_FIXMAP | len(state))
+        else:
+            _append_head(out, _MSGPACK_MAP_HEADS, len(state))
+
+        for key in state:
+            self._text(out, key)
+            value = state[key]
+
+            if isinstance(value, str) or not -_INT64_LIMIT <= value < _UINT64_LIMIT:
+                self._text(out, str(value))
+            else:
+                self._integer(out, value)
+
+        return bytes(out)
+
+    def decode(self, data: bytes) -> dict[str, Union[str, int]]:
+        """Return the body of a request, decoded from a MessagePack map.
+
+        Parameters
+        ----------
+
+        data: bytes
+            The raw body of the request.
+
+        Raises
+        ------
+
+        ValueError
+            If the `data` is not a single MessagePack map, or cannot be
+            converted to the types passed to the nouns.
+
+        Returns
+        -------
+
+        dict[str, Union[str, int]]
+            The name/value pairs of the body.
+
+        """
+
+        if len(data) > 0 and data[0] & _MSGPACK_FIXMAP_MASK == _MSGPACK_FIXMAP:
+            count, position = (data[0] & ~_MSGPACK_FIXMAP_MASK, 1)
+        elif len(data) > 0 and data[0] in _MSGPACK_MAPS:
+            fmt, size = _MSGPACK_MAPS[data[0]]
+            count, position = _unpack(data, 1, fmt, size)
+        else:
+            msg = "The body of the request is not a MessagePack map"
+            raise ValueError(msg)
+
+        body = {}
+
+        for _ in range(count):
+            key, position = self._item(data, position)
+
+            # All invalid bodies raise `ValueError`, as for the JSON codecs
+            if not isinstance(key, str):
+                msg = "The keys of the body must be strings"
+                raise ValueError(msg)  # noqa: TRY004
+
+            body[key], position = self._item(data, position)
+
+        if position != len(data):
+            msg = "The body of the request has data after the MessagePack map"
+            raise ValueError(msg)
+
+        return normalise_body(body)
+
+    def stream_decoder(
+        self,
+        max_size: int = MAX_BODY_SIZE,
+        max_keys: int = MAX_BODY_KEYS,
+    ) -> BufferedDecoder:
+        """Return a decoder to which the body of a request can be fed as it
+        arrives. See [`BufferedDecoder`][urest.http.codec.BufferedDecoder]."""
+
+        return BufferedDecoder(self, max_size, max_keys)
+
+    def _integer(self, out: bytearray, value: int) -> None:
+        """Append the integer `value` to `out`, in the fewest bytes possible."""
+
+        if _MSGPACK_NEGATIVE_FIXINT_LIMIT <= value < _MSGPACK_FIXINT_LIMIT:
+            out.append(value & 0xFF)
+        elif value >= 0:
+            _append_head(out, _MSGPACK_UNSIGNED_HEADS, value)
+        else:
+            for limit, initial, fmt in _MSGPACK_NEGATIVE_HEADS:
+                if value >= limit:
+                    out.append(initial)
+                    out.extend(struct.pack(fmt, value))
+                    return
+
+    def _text(self, out: bytearray, text: str) -> None:
+        """Append `text` to `out` as a MessagePack string."""
+
+        encoded = text.encode()
+
+        if len(encoded) < _MSGPACK_FIXSTR_LIMIT:
+            out.append(_MSGPACK_FIXSTR | len(encoded))
+        else:
+            _append_head(out, _MSGPACK_STRING_HEADS, len(encoded))
+
+        out.extend(encoded)
+
+    def _item(self, data: bytes, position: int) -> tuple[object, int]:
+        """Return the (scalar) item at `position` in the `data`, and the
+        position following the item."""
+
+        if position >= len(data):
+            msg = "The body of the request is incomplete"
+            raise ValueError(msg)
+
+        initial = data[position]
+        position += 1
+
+        # Integers held in the initial byte ...
+        if initial < _MSGPACK_FIXINT_LIMIT:
+            return (initial, position)
+
+        if initial >= _MSGPACK_NEGATIVE_FIXINT:
+            return (initial - 0x100, position)
+
+        # ... short strings ...
+        if initial & _MSGPACK_FIXSTR_MASK == _MSGPACK_FIXSTR:
+            return _text(data, position, initial & ~_MSGPACK_FIXSTR_MASK)
+
+        # ... constants, numbers and longer strings
+        if initial in _MSGPACK_CONSTANTS:
+            return (_MSGPACK_CONSTANTS[initial], position)
+
+        if initial in _MSGPACK_NUMBERS:
+            fmt, size = _MSGPACK_NUMBERS[initial]
+            return _unpack(data, position, fmt, size)
+
+        if initial in _MSGPACK_STRINGS:
+            fmt, size = _MSGPACK_STRINGS[initial]
+            length, position = _unpack(data, position, fmt, size)
+            return _text(data, position, length)
+
+        msg = "The body of the request holds an unsupported MessagePack item"
+        raise ValueError(msg)
+
+
+###
+### Codecs
+###
+
+CBOR = CBORCodec()
+"""The CBOR codec."""
+
+MSGPACK = MessagePackCodec()
+"""The MessagePack codec."""
@@ -0,0 +1,137 @@
+# This module, and all included code, is made available under the terms of the MIT
+# Licence
+#
+# Copyright (c) 2022-2023 David Love
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+# the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""Caches the encoded responses to `GET` requests, so that repeated polls of a
+noun whose state has not changed are answered without calling the noun, or
+encoding its state again.
+
+Each entry in the [`ResponseCache`][urest.http.cache.ResponseCache] is
+tagged with the [`state_version`][urest.api.base.APIBase.state_version] of
+the noun at the time the response was encoded. Any change to the state of the
+noun moves the version on, and so the entry is simply found to be stale on the
+next request: nothing needs to be removed from the cache when the state of a
+noun changes.
+
+Nouns whose state changes without the knowledge of the server, for instance
+by reading live hardware in
+[`APIBase.get_state()`][urest.api.base.APIBase.get_state], should set
+[`APIBase.cacheable`][urest.api.base.APIBase.cacheable] to `False`.
+"""
+
+# Import the typing support
+try:
+    from typing import Optional
+except ImportError:
+    from urest.typing import Optional  # type: ignore
+
+###
+### Classes
+###
+
+
+class ResponseCache:
+    """Hold the encoded body of the last response to a `GET` request for each
+    noun (or attribute of a noun), together with the state version of the noun
+    when the body was encoded.
+
+    Attributes
+    ----------
+
+    hits: integer
+        The number of requests answered from the cache.
+    misses: integer
+        The number of requests for which the body had to be encoded, because
+        there was no entry in the cache, or the entry was stale.
+
+    """
+
+    ##
+    ## Attributes
+    ##
+
+    hits: int
+    misses: int
+    _entries: dict[bytes, tuple[int, bytes]]
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+
+    ##
+    ## Functions
+    ##
+
+    def get(self, key: bytes, version: int) -> Optional[bytes]:
+        """Return the cached body for `key`, if it was encoded at the state
+        `version`. Otherwise return `None`, and count the request as a miss.
+
+        Parameters
+        ----------
+
+        key: bytes
+            The canonical name of the noun, or of the attribute of the noun.
+        version: integer
+            The current state version of the noun.
+
+        Returns
+        -------
+
+        Optional[bytes]
+            The encoded body, or `None` if the body must be encoded again.
+
+        """
+
+        entry = self._entries.get(key)
+
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        return None
+
+    def put(self, key: bytes, version: int, body: bytes) -> None:
+        """Store the encoded `body` for `key`, replacing any existing entry.
+
+        Parameters
+        ----------
+
+        key: bytes
+            The canonical name of the noun, or of the attribute of the noun.
+        version: integer
+            The state version of the noun when the `body` was encoded.
+        body: bytes
+            The encoded body of the response.
+
+        """
+
+        self._entries[key] = (version, body)
+
+    def clear(self) -> None:
+        """Remove all the entries from the cache, leaving the counters
+        unchanged."""
+
+        self._entries = {}
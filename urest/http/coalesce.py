@@ -0,0 +1,341 @@
+# This module, and all included code, is made available under the terms of the MIT
+# Licence
+#
+# Copyright (c) 2022-2023 David Love
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+# the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""Coalesces concurrent reads of the same noun, so that the handler of the
+noun is called once for a whole burst of `GET` requests.
+
+When many clients poll a noun at about the same time (for instance a set of
+dashboards reading `/temp`), the first request to miss the
+[`ResponseCache`][urest.http.cache.ResponseCache] reads the state of the noun
+on behalf of all the others. Requests which arrive while that read is still in
+flight wait for it, and share its result. The result is then also shared with
+requests arriving within a short _window_ after the read finished: which
+matters for nouns that are not `cacheable`, and so would otherwise read their
+hardware again for every request. Results are only shared between requests
+which see the same [`state_version`][urest.api.base.APIBase.state_version]
+of the noun, so a read never returns the state from before a write.
+
+The window is the `coalesce_window` parameter of the [`RESTServer`]
+[urest.http.server.RESTServer]. A window of `0` still shares the reads in
+flight, but never re-uses a finished read.
+
+Writes may also be coalesced, for nouns registered with a `write_window` (see
+[`RESTServer.register_noun()`][urest.http.server.RESTServer.register_noun]).
+The first `PUT` to such a noun opens a window, and the `PUT` requests which
+arrive within the window replace its state: only the newest state is then
+applied to the noun, once the window closes. This suits nouns which are set
+far more often than their hardware can follow, such as a PWM output driven by
+a slider. Every request of the window is answered once the newest state has
+been applied; the requests whose state was replaced are also told so with the
+header field `X-Coalesced: superseded`. Other writes to the noun (`POST`,
+`DELETE`, or a `PUT` of a single attribute) first close any open window, so
+that the writes are applied in the order they arrived. Reads are never
+delayed, and so see the state from before the window until it closes.
+"""
+
+import asyncio
+
+# Import the typing support
+try:
+    from typing import Callable  # noqa: UP035
+except ImportError:
+    from urest.typing import Callable  # type: ignore
+
+# Import the millisecond timers, falling back to the fake version on CPython
+try:
+    from time import ticks_diff, ticks_ms  # type: ignore
+except ImportError:
+    from urest.ticks import ticks_diff, ticks_ms
+
+###
+### Classes
+###
+
+
+class _Flight:
+    """A single call of [`SingleFlight.run()`][urest.http.coalesce.SingleFlight.run],
+    in flight or recently finished."""
+
+    def __init__(self, version: int) -> None:
+        self.version = version
+        self.done = asyncio.Event()
+        self.result = None
+        self.error = None
+        self.completed = False
+        self.finished = 0
+
+
+class _Batch:
+    """The writes made within a single window of a [`WriteCoalescer`]
+    [urest.http.coalesce.WriteCoalescer], holding the newest write."""
+
+    def __init__(self, function: Callable, args: tuple) -> None:
+        self.function = function
+        self.args = args
+        self.count = 1
+        self.wake = asyncio.Event()
+        self.done = asyncio.Event()
+        self.error = None
+        self.completed = False
+
+
+class SingleFlight:
+    """Share the result of a co-routine between all the callers asking for
+    the same `key` and `version` while it runs, and for `window` milliseconds
+    after it has finished.
+
+    Attributes
+    ----------
+
+    window: integer
+        The time (in milliseconds) for which a finished result is shared.
+    calls: integer
+        The number of times a co-routine has been run.
+    shared: integer
+        The number of callers given the result of a co-routine run for
+        another caller.
+
+    """
+
+    ##
+    ## Attributes
+    ##
+
+    window: int
+    calls: int
+    shared: int
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.calls = 0
+        self.shared = 0
+        self._flights = {}
+
+    ##
+    ## Functions
+    ##
+
+    async def run(
+        self,
+        key: bytes,
+        version: int,
+        function: Callable,
+        *args: object,
+    ) -> object:
+        """Return the result of the co-routine `function(*args)`, from a call
+        already in flight (or finished within the `window`) for the same `key`
+        and `version` if there is one, or otherwise from a new call.
+
+        Exceptions raised by the co-routine are raised to every caller sharing
+        the call: but are never shared with later callers. Nor are results of
+        `None`, so that callers asking for keys which do not exist cannot fill
+        the table of finished calls.
+        """
+
+        flight = self._flights.get(key)
+
+        if flight is not None and flight.version == version:
+            if not flight.done.is_set():
+                self.shared += 1
+                await flight.done.wait()
+
+                if flight.error is not None:
+                    raise flight.error
+
+                # If the call was cancelled, make another
+                if not flight.completed:
+                    return await self.run(key, version, function, *args)
+
+                return flight.result
+
+            if ticks_diff(ticks_ms(), flight.finished) < self.window:
+                self.shared += 1
+                return flight.result
+
+        # Start a new flight for the key, replacing any stale flight, and
+        # forgetting the flights of other keys whose window has passed
+        self._expire()
+
+        flight = _Flight(version)
+        self._flights[key] = flight
+        self.calls += 1
+
+        try:
+            flight.result = await function(*args)
+            flight.completed = True
+        except Exception as error:
+            flight.error = error
+            raise
+        finally:
+            flight.finished = ticks_ms()
+            flight.done.set()
+
+            # Only completed results are kept, and only if they can be shared
+            if not (
+                flight.completed and flight.result is not None and self.window > 0
+            ) and (self._flights.get(key) is flight):
+                del self._flights[key]
+
+        return flight.result
+
+    def clear(self) -> None:
+        """Forget all the flights, so that later callers always make a new
+        call. Callers already waiting for a flight still share its result."""
+
+        self._flights = {}
+
+    def _expire(self) -> None:
+        """Remove the finished flights whose `window` has passed."""
+
+        now = ticks_ms()
+        stale = [
+            key
+            for key, flight in self._flights.items()
+            if flight.done.is_set() and ticks_diff(now, flight.finished) >= self.window
+        ]
+
+        for key in stale:
+            del self._flights[key]
+
+
+class WriteCoalescer:
+    """Apply only the newest of the writes made to a noun within `window`
+    milliseconds of the first. Each window is applied in turn, so that a slow
+    write never overlaps the next.
+
+    Attributes
+    ----------
+
+    window: integer
+        The time (in milliseconds) for which writes are collected.
+    applied: integer
+        The number of writes applied to the noun.
+    superseded: integer
+        The number of writes replaced by a newer write before being applied.
+
+    """
+
+    ##
+    ## Attributes
+    ##
+
+    window: int
+    applied: int
+    superseded: int
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.applied = 0
+        self.superseded = 0
+        self._batch = None
+        self._lock = asyncio.Lock()
+
+    ##
+    ## Functions
+    ##
+
+    async def put(self, function: Callable, *args: object) -> bool:
+        """Make the write `function(*args)` (a co-routine) once the current
+        window closes, unless a newer write replaces it first.
+
+        Returns
+        -------
+
+        bool
+            `True` if this write was applied, or `False` if it was replaced by
+            a newer write. Exceptions raised by the newest write are raised to
+            every caller of the window.
+
+        """
+
+        batch = self._batch
+
+        # Replace the newest write of the open window ...
+        if batch is not None:
+            batch.function = function
+            batch.args = args
+            batch.count += 1
+            self.superseded += 1
+            ticket = batch.count
+
+            await batch.done.wait()
+
+            if batch.error is not None:
+                raise batch.error
+
+            # If the window was cancelled, the newest write opens another
+            if not batch.completed and ticket == batch.count:
+                self.superseded -= 1
+                return await self.put(batch.function, *batch.args)
+
+            return ticket == batch.count
+
+        # ... or open a new window, and apply the newest write when it closes
+        batch = _Batch(function, args)
+        self._batch = batch
+
+        try:
+            try:
+                await asyncio.wait_for(batch.wake.wait(), self.window / 1000)
+            except asyncio.TimeoutError:
+                # The window has closed without being flushed
+                batch.wake.set()
+
+            async with self._lock:
+                if self._batch is batch:
+                    self._batch = None
+
+                await batch.function(*batch.args)
+
+            batch.completed = True
+            self.applied += 1
+        except Exception as error:
+            batch.error = error
+            raise
+        finally:
+            if self._batch is batch:
+                self._batch = None
+
+            batch.done.set()
+
+        return batch.count == 1
+
+    async def flush(self) -> None:
+        """Close the open window (if any), and wait until all the writes
+        collected so far have been applied."""
+
+        batch = self._batch
+
+        if batch is not None:
+            batch.wake.set()
+            await batch.done.wait()
+
+        # Wait for any window already being applied
+        async with self._lock:
+            pass
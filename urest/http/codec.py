@@ -0,0 +1,1106 @@
+# This module, and all included code, is made available under the terms of the MIT
+# Licence
+#
+# Copyright (c) 2022-2023 David Love
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+# the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""Encodes the state of the nouns sent to the network clients, and decodes the
+bodies of the requests sent by those clients.
+
+The state of each noun is a flat dictionary of type `dict[str, Union[str,
+int]]` (see [`APIBase`][urest.api.base.APIBase]), and is exchanged with the
+clients as a single JSON object. A JSON library is chosen when this module is
+imported, in order of preference:
+
+1. The `json` library: C-accelerated on CPython, and native on MicroPython
+   since v1.20.
+2. The `ujson` library of older MicroPython releases.
+3. A (slow) pure-Python implementation, for platforms with neither library.
+
+The libraries are preferred as they decode every body, and encode all but the
+smallest states, faster than the pure-Python implementation. They are not
+always the fastest choice, though: on CPython the fixed cost of each call of
+`json.dumps()` makes the pure-Python encoder faster (by well under a
+microsecond) for states of one or two keys. As the choice is made once, for
+every state, the library is still used for those (see `tests/bench_codec.py`).
+
+The chosen library is available as the [`JSON`][urest.http.codec.JSON]
+codec, and its name as [`JSON.backend`][urest.http.codec.JSONCodec]. All the
+codecs share the same interface of `encode()` and `decode()`, and the same
+rules for converting the state of the nouns to (and from) the types seen by
+the clients:
+
+* Keys sent to the client are converted to lowercase.
+* `bool` values are sent as the integers `1` and `0`.
+* `int` and `str` values are sent as they are: any other value is sent as a
+  string.
+* Values from the client which are `true`, `false` or integers are passed to
+  the nouns as `int`; `null` is passed as an empty string; and any other
+  number (e.g. `1.5`) is passed as a string.
+* Bodies from the client which are not a single JSON object of name/value
+  pairs, or which contain arrays or objects as values, raise a `ValueError`.
+  The [`RESTServer`][urest.http.server.RESTServer] answers these requests with
+  '`400 Bad Request`'.
+
+Compact binary encodings, following the same rules, are provided by
+[`urest.http.binary`][urest.http.binary].
+"""
+
+# Import const support, falling back to the fake version on Python/CPython
+try:
+    from micropython import const
+except ImportError:
+    from urest.const import const  # type: ignore
+
+# Import the typing support
+try:
+    from typing import Callable, Optional, Union  # noqa: UP035
+except ImportError:
+    from urest.typing import Callable, Optional, Union  # type: ignore
+
+# Import the JSON library, preferring the native libraries
+try:
+    import json as _json_library
+except ImportError:
+    try:
+        import ujson as _json_library  # type: ignore
+    except ImportError:
+        _json_library = None
+
+###
+### Constants
+###
+
+MAX_BODY_SIZE = const(16384)
+"""Default limit on the size (in bytes) of the body decoded by a
+[`JSONStreamDecoder`][urest.http.codec.JSONStreamDecoder]."""
+
+MAX_BODY_KEYS = const(64)
+"""Default limit on the number of keys in the body decoded by a
+[`JSONStreamDecoder`][urest.http.codec.JSONStreamDecoder]."""
+
+MAX_NUMBER_LENGTH = const(32)
+"""Limit on the length of a single number in the body decoded by a
+[`JSONStreamDecoder`][urest.http.codec.JSONStreamDecoder]."""
+
+STREAM_CHUNK_SIZE = const(512)
+"""Default limit on the size (in bytes) of each chunk returned by a
+[`JSONStreamEncoder`][urest.http.codec.JSONStreamEncoder]."""
+
+###
+### Functions
+###
+
+
+def normalise_state(state: dict) -> dict[str, Union[str, int]]:
+    """Return a copy of the `state` of a noun, converted to the keys and types
+    sent to the client (see the [module documentation][urest.http.codec]).
+
+    Parameters
+    ----------
+
+    state: dict
+        The state, or part of the state, of a noun.
+
+    Returns
+    -------
+
+    dict[str, Union[str, int]]
+        The state with lowercase keys, and only `str` or `int` values.
+
+    """
+
+    normalised = {}
+
+    for key in state:
+        value = state[key]
+
+        if isinstance(value, bool):
+            value = int(value)
+        elif not isinstance(value, (int, str)):
+            value = str(value)
+
+        normalised[str(key).lower()] = value
+
+    return normalised
+
+
+def normalise_body(body: object) -> dict[str, Union[str, int]]:
+    """Check, and convert, the decoded `body` of a request to the types passed
+    to the nouns (see the [module documentation][urest.http.codec]).
+
+    Parameters
+    ----------
+
+    body: object
+        The decoded body of the request.
+
+    Raises
+    ------
+
+    ValueError
+        If the `body` is not a dictionary, or holds values which are lists or
+        dictionaries.
+
+    Returns
+    -------
+
+    dict[str, Union[str, int]]
+        The body with only `str` or `int` values.
+
+    """
+
+    # All invalid bodies raise `ValueError`, whatever the reason, so that the
+    # server only has one exception to handle
+    if not isinstance(body, dict):
+        msg = "The body of the request must be a single JSON object"
+        raise ValueError(msg)  # noqa: TRY004
+
+    for key in body:
+        value = body[key]
+
+        if isinstance(value, bool):
+            body[key] = int(value)
+        elif value is None:
+            body[key] = ""
+        elif isinstance(value, (dict, list)):
+            msg = f"Invalid value for '{key}' in the body of the request"
+            raise ValueError(msg)
+        elif not isinstance(value, (int, str)):
+            body[key] = str(value)
+
+    return body
+
+
+def estimate_size(state: dict, limit: int) -> int:
+    """Return roughly the length, in bytes, of the `state` encoded as a JSON
+    object, without encoding it. The estimate ignores escapes, and counts
+    characters rather than bytes, so may be a little low. Once the estimate
+    passes `limit` the rest of the state is not counted.
+
+    Parameters
+    ----------
+
+    state: dict
+        The state, or part of the state, of a noun.
+    limit: integer
+        The size (in bytes) beyond which the estimate need not be exact.
+
+    Returns
+    -------
+
+    integer
+        The estimated length of the encoded state, which is greater than
+        `limit` if the encoded state is likely to be longer.
+
+    """
+
+    # Each field needs two quotes around the key, a separator of ': ', and a
+    # separator of ', ' from the next field: the braces around the object take
+    # the place of the separator missing from the last field
+    size = 0
+
+    for key in state:
+        value = state[key]
+
+        if isinstance(value, bool):
+            size += len(key) + 7
+        elif isinstance(value, int):
+            size += len(key) + 6 + len(str(value))
+        else:
+            size += len(key) + 8 + len(value if isinstance(value, str) else str(value))
+
+        if size > limit:
+            break
+
+    return size
+
+
+###
+### Pure-Python JSON
+###
+
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+"""Mapping of the JSON escape characters to the characters they represent."""
+
+_WHITESPACE = " \t\r\n"
+"""The whitespace allowed between JSON tokens."""
+
+
+def _python_dumps(state: dict[str, Union[str, int]]) -> str:
+    """Encode the (normalised) `state` as a JSON object."""
+
+    fields = []
+
+    for key in state:
+        value = state[key]
+
+        if isinstance(value, int):
+            fields.append(f"{_python_quote(key)}: {value}")
+        else:
+            fields.append(f"{_python_quote(key)}: {_python_quote(value)}")
+
+    return "{" + ", ".join(fields) + "}"
+
+
+def _python_quote(text: str) -> str:
+    """Return `text` as a quoted JSON string."""
+
+    # Most strings need no escapes at all
+    if text == "" or (min(text) >= " " and '"' not in text and "\\" not in text):
+        return '"' + text + '"'
+
+    quoted = ['"']
+
+    for char in text:
+        if char in ('"', "\\"):
+            quoted.append("\\" + char)
+        elif char < " ":
+            quoted.append(f"\\u{ord(char):04x}")
+        else:
+            quoted.append(char)
+
+    quoted.append('"')
+    return "".join(quoted)
+
+
+class _PythonDecoder:
+    """A minimal recursive-descent JSON parser, holding the text being parsed
+    and the position of the next character."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.position = 0
+
+    def error(self, reason: str) -> ValueError:
+        """Return the exception for an error at the current position."""
+        return ValueError(f"Invalid JSON: {reason} at {self.position}")
+
+    def skip(self) -> str:
+        """Skip any whitespace, and return the next character (or '' at the end
+        of the text)."""
+
+        text = self.text
+        position = self.position
+
+        while position < len(text) and text[position] in _WHITESPACE:
+            position += 1
+
+        self.position = position
+        return text[position : position + 1]
+
+    def document(self) -> object:
+        """Parse the whole text as a single JSON value."""
+
+        value = self.value()
+
+        if self.skip() != "":
+            msg = "unexpected data"
+            raise self.error(msg)
+
+        return value
+
+    def value(self) -> object:
+        """Parse the JSON value at the current position."""
+
+        char = self.skip()
+
+        if char == "{":
+            return self.object()
+
+        if char == "[":
+            return self.array()
+
+        if char == '"':
+            return self.string()
+
+        for literal, value in (("true", True), ("false", False), ("null", None)):
+            if self.text.startswith(literal, self.position):
+                self.position += len(literal)
+                return value
+
+        if char != "" and char in "-0123456789":
+            return self.number()
+
+        msg = "unexpected character"
+        raise self.error(msg)
+
+    def object(self) -> dict:
+        """Parse the JSON object starting at the current position."""
+
+        result = {}
+        self.position += 1
+
+        if self.skip() == "}":
+            self.position += 1
+            return result
+
+        while True:
+            if self.skip() != '"':
+                msg = "expected a name"
+                raise self.error(msg)
+
+            key = self.string()
+
+            if self.skip() != ":":
+                msg = "expected ':'"
+                raise self.error(msg)
+
+            self.position += 1
+            result[key] = self.value()
+
+            char = self.skip()
+            self.position += 1
+
+            if char == "}":
+                return result
+
+            if char != ",":
+                msg = "expected ',' or '}'"
+                raise self.error(msg)
+
+    def array(self) -> list:
+        """Parse the JSON array starting at the current position."""
+
+        result = []
+        self.position += 1
+
+        if self.skip() == "]":
+            self.position += 1
+            return result
+
+        while True:
+            result.append(self.value())
+
+            char = self.skip()
+            self.position += 1
+
+            if char == "]":
+                return result
+
+            if char != ",":
+                msg = "expected ',' or ']'"
+                raise self.error(msg)
+
+    def string(self) -> str:
+        """Parse the JSON string starting at the current position."""
+
+        text = self.text
+        position = self.position + 1
+        start = position
+        parts = []
+
+        while True:
+            end = text.find('"', position)
+            escape = text.find("\\", position, end)
+
+            if end == -1:
+                msg = "unterminated string"
+                raise self.error(msg)
+
+            if escape == -1:
+                parts.append(text[start:end])
+                self.position = end + 1
+                return "".join(parts)
+
+            parts.append(text[start:escape])
+            code = text[escape + 1 : escape + 2]
+
+            if code == "u":
+                parts.append(chr(int(text[escape + 2 : escape + 6], 16)))
+                position = escape + 6
+            elif code in _ESCAPES:
+                parts.append(_ESCAPES[code])
+                position = escape + 2
+            else:
+                self.position = escape
+
+                msg = "invalid escape"
+                raise self.error(msg)
+
+            start = position
+
+    def number(self) -> Union[int, float]:
+        """Parse the JSON number starting at the current position."""
+
+        text = self.text
+        start = self.position
+        position = start
+
+        while position < len(text) and text[position] in "+-0123456789.eE":
+            position += 1
+
+        self.position = position
+        token = text[start:position]
+
+        if "." in token or "e" in token or "E" in token:
+            return float(token)
+
+        return int(token)
+
+
+###
+### Classes
+###
+
+
+class JSONCodec:
+    """Encode, and decode, the state of the nouns as JSON objects, through the
+    JSON library given when the codec is created.
+
+    Attributes
+    ----------
+
+    name: str
+        The short name of the encoding.
+    backend: str
+        The name of the JSON library used by the codec, or `"python"` for the
+        pure-Python implementation.
+    content_type: str
+        The MIME type of the encoded data.
+    media_types: tuple[str, ...]
+        The MIME types accepted for the encoded data.
+
+    """
+
+    ##
+    ## Attributes
+    ##
+
+    name: str = "json"
+    backend: str
+    content_type: str = "application/json"
+    media_types: tuple = ("application/json",)
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(self, library: Optional[object] = None) -> None:
+        """Create a codec using the `loads` and `dumps` functions of the JSON
+        `library`: or, if no `library` is given, the pure-Python implementation
+        from this module.
+
+        Parameters
+        ----------
+
+        library: Optional[object]
+            The JSON library (e.g. `json` or `ujson`) to use.
+
+        """
+
+        if library is None:
+            self.backend = "python"
+            self._loads = None
+            self._dumps = _python_dumps
+            self._quote = _python_quote
+        else:
+            self.backend = library.__name__  # type: ignore
+            self._loads = library.loads  # type: ignore
+            self._dumps = library.dumps  # type: ignore
+            self._quote = library.dumps  # type: ignore
+
+    ##
+    ## Functions
+    ##
+
+    def encode(self, state: dict) -> bytes:
+        """Return the `state` of a noun encoded as a JSON object.
+
+        Parameters
+        ----------
+
+        state: dict
+            The state, or part of the state, of a noun.
+
+        Returns
+        -------
+
+        bytes
+            The encoded state, in UTF-8.
+
+        """
+
+        return self._dumps(normalise_state(state)).encode()
+
+    def encode_stream(
+        self,
+        state: dict,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> "JSONStreamEncoder":
+        """Return the `state` of a noun encoded as a JSON object, as an
+        iterator of chunks no larger than `chunk_size` bytes.
+
+        Parameters
+        ----------
+
+        state: dict
+            The state, or part of the state, of a noun.
+        chunk_size: int
+            The largest size (in bytes) of each chunk.
+
+        Returns
+        -------
+
+        JSONStreamEncoder
+            The iterator over the chunks of the encoded state.
+
+        """
+
+        return JSONStreamEncoder(state, self._quote, chunk_size)
+
+    def stream_decoder(
+        self,
+        max_size: int = MAX_BODY_SIZE,
+        max_keys: int = MAX_BODY_KEYS,
+    ) -> "JSONStreamDecoder":
+        """Return a decoder to which the body of a request can be fed as it
+        arrives. See [`JSONStreamDecoder`][urest.http.codec.JSONStreamDecoder]."""
+
+        return JSONStreamDecoder(max_size, max_keys)
+
+    def decode(self, data: bytes) -> dict[str, Union[str, int]]:
+        """Return the body of a request, decoded from a JSON object.
+
+        Parameters
+        ----------
+
+        data: bytes
+            The raw body of the request, in UTF-8.
+
+        Raises
+        ------
+
+        ValueError
+            If the `data` is not a valid JSON object, or cannot be converted to
+            the types passed to the nouns.
+
+        Returns
+        -------
+
+        dict[str, Union[str, int]]
+            The name/value pairs of the body.
+
+        """
+
+        text = data.decode("utf8")
+
+        # Very deeply nested bodies exhaust the stack of the parsers, raising
+        # `RecursionError` on CPython (or `RuntimeError` on MicroPython)
+        try:
+            if self._loads is None:
+                return normalise_body(_PythonDecoder(text).document())
+
+            return normalise_body(self._loads(text))
+        except RuntimeError:
+            msg = "The body of the request is nested too deeply"
+            raise ValueError(msg) from None
+
+
+# States of the `JSONStreamDecoder`
+
+_EXPECT_OBJECT = const(0)
+_EXPECT_FIRST_KEY = const(1)
+_EXPECT_KEY = const(2)
+_IN_KEY = const(3)
+_EXPECT_COLON = const(4)
+_EXPECT_VALUE = const(5)
+_IN_STRING = const(6)
+_IN_NUMBER = const(7)
+_IN_LITERAL = const(8)
+_EXPECT_SEPARATOR = const(9)
+_DONE = const(10)
+
+_ASCII_QUOTE = const(34)
+_ASCII_COMMA = const(44)
+_ASCII_COLON = const(58)
+_ASCII_OPEN_BRACE = const(123)
+_ASCII_CLOSE_BRACE = const(125)
+
+_STREAM_WHITESPACE = b" \t\r\n"
+_NUMBER_START = b"-0123456789"
+_NUMBER_BYTES = b"+-0123456789.eE"
+_LITERAL_BYTES = b"abcdefghijklmnopqrstuvwxyz"
+_LITERALS = {b"true": 1, b"false": 0, b"null": ""}
+
+
+class JSONStreamDecoder:
+    """Decode the body of a request as it arrives from the network client,
+    without holding the whole body in memory.
+
+    The body is passed to the decoder in pieces of any size through `feed()`:
+    each name/value pair is added to the result as soon as the value is
+    complete, and only the token currently being read is buffered. Once the
+    whole body has been fed, `close()` returns the decoded name/value pairs.
+
+    As for the [`JSONCodec`][urest.http.codec.JSONCodec], only a single,
+    flat, JSON object is accepted; and the values are converted to the types
+    passed to the nouns (see the [module documentation][urest.http.codec]).
+    Input is checked byte by byte, and so is rejected as soon as it becomes
+    invalid: for instance at the opening bracket of a nested object or array,
+    or at the first key beyond the `max_keys` limit.
+
+    Attributes
+    ----------
+
+    max_size: integer
+        The largest body (in bytes) accepted by the decoder.
+    max_keys: integer
+        The largest number of distinct keys accepted by the decoder.
+    size: integer
+        The number of bytes fed to the decoder so far.
+
+    """
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(
+        self,
+        max_size: int = MAX_BODY_SIZE,
+        max_keys: int = MAX_BODY_KEYS,
+    ) -> None:
+        """Create a decoder for a single body.
+
+        Parameters
+        ----------
+
+        max_size: integer
+            The largest body (in bytes) accepted by the decoder.
+        max_keys: integer
+            The largest number of distinct keys accepted by the decoder.
+
+        """
+
+        self.max_size = max_size
+        self.max_keys = max_keys
+        self.size = 0
+
+        self._state = _EXPECT_OBJECT
+        self._token = bytearray()
+        self._escape = False
+        self._key = ""
+        self._result: dict[str, Union[str, int]] = {}
+
+    ##
+    ## Functions
+    ##
+
+    def feed(self, data: bytes) -> None:
+        """Decode the next piece of the body.
+
+        Parameters
+        ----------
+
+        data: bytes
+            The next bytes of the body, in UTF-8. Pieces may be split at any
+            point, including inside a token or a multi-byte character.
+
+        Raises
+        ------
+
+        ValueError
+            As soon as the body is found to be invalid, or to exceed the limits
+            of the decoder.
+
+        """
+
+        self.size += len(data)
+
+        if self.size > self.max_size:
+            msg = "The body of the request is too large"
+            raise ValueError(msg)
+
+        position = 0
+        end = len(data)
+
+        while position < end:
+            state = self._state
+
+            # Strings and words (numbers and literals) may span several pieces,
+            # and are scanned as a whole ...
+            if state in (_IN_KEY, _IN_STRING):
+                position = self._scan_string(data, position)
+                continue
+
+            if state == _IN_NUMBER:
+                position = self._scan_word(data, position, _NUMBER_BYTES)
+                continue
+
+            if state == _IN_LITERAL:
+                position = self._scan_word(data, position, _LITERAL_BYTES)
+                continue
+
+            # ... otherwise look at the next structural character
+            byte = data[position]
+            position += 1
+
+            if byte in _STREAM_WHITESPACE:
+                continue
+
+            self._state = self._next_state(state, byte)
+
+    def close(self) -> dict[str, Union[str, int]]:
+        """Finish decoding the body, and return the decoded name/value pairs.
+
+        Raises
+        ------
+
+        ValueError
+            If the body fed to the decoder is not a complete JSON object.
+
+        Returns
+        -------
+
+        dict[str, Union[str, int]]
+            The name/value pairs of the body.
+
+        """
+
+        if self._state != _DONE:
+            msg = "The body of the request is incomplete"
+            raise ValueError(msg)
+
+        return self._result
+
+    def _next_state(self, state: int, byte: int) -> int:  # noqa: PLR0911
+        """Return the state following the structural character `byte`."""
+
+        if state == _EXPECT_VALUE:
+            if byte == _ASCII_QUOTE:
+                return _IN_STRING
+
+            if byte in _NUMBER_START:
+                self._token.append(byte)
+                return _IN_NUMBER
+
+            if byte in _LITERAL_BYTES:
+                self._token.append(byte)
+                return _IN_LITERAL
+
+        elif state == _EXPECT_SEPARATOR:
+            if byte == _ASCII_COMMA:
+                return _EXPECT_KEY
+
+            if byte == _ASCII_CLOSE_BRACE:
+                return _DONE
+
+        elif state in (_EXPECT_KEY, _EXPECT_FIRST_KEY):
+            if byte == _ASCII_QUOTE:
+                return _IN_KEY
+
+            if byte == _ASCII_CLOSE_BRACE and state == _EXPECT_FIRST_KEY:
+                return _DONE
+
+        elif state == _EXPECT_COLON:
+            if byte == _ASCII_COLON:
+                return _EXPECT_VALUE
+
+        elif state == _EXPECT_OBJECT:
+            if byte == _ASCII_OPEN_BRACE:
+                return _EXPECT_FIRST_KEY
+
+        msg = f"Invalid JSON: unexpected '{chr(byte)}' at {self.size}"
+        raise ValueError(msg)
+
+    def _scan_string(self, data: bytes, position: int) -> int:
+        """Add the characters of the string at `position` to the current token,
+        returning the position following the characters used."""
+
+        # The previous piece ended with a '\', so the next character is escaped
+        if self._escape:
+            self._token.append(data[position])
+            self._escape = False
+            return position + 1
+
+        quote = data.find(b'"', position)
+        escape = data.find(b"\\", position, len(data) if quote == -1 else quote)
+
+        if escape != -1:
+            self._token.extend(data[position : escape + 1])
+            self._escape = True
+            return escape + 1
+
+        if quote == -1:
+            self._token.extend(data[position:])
+            return len(data)
+
+        self._token.extend(data[position:quote])
+
+        text = self._token.decode("utf8")
+        self._token = bytearray()
+
+        if "\\" in text:
+            text = _PythonDecoder('"' + text + '"').string()
+
+        if self._state == _IN_KEY:
+            if len(self._result) >= self.max_keys and text not in self._result:
+                msg = "The body of the request has too many keys"
+                raise ValueError(msg)
+
+            self._key = text
+            self._state = _EXPECT_COLON
+        else:
+            self._result[self._key] = text
+            self._state = _EXPECT_SEPARATOR
+
+        return quote + 1
+
+    def _scan_word(self, data: bytes, position: int, allowed: bytes) -> int:
+        """Add the characters of the number or literal at `position` to the
+        current token, returning the position following the characters used."""
+
+        start = position
+        end = len(data)
+
+        while position < end and data[position] in allowed:
+            position += 1
+
+        self._token.extend(data[start:position])
+
+        if len(self._token) > MAX_NUMBER_LENGTH:
+            msg = "Invalid JSON: value too long"
+            raise ValueError(msg)
+
+        # The word continues into the next piece
+        if position == end:
+            return position
+
+        word = bytes(self._token)
+        self._token = bytearray()
+
+        if self._state == _IN_LITERAL:
+            if word not in _LITERALS:
+                msg = f"Invalid JSON: unknown literal at {self.size}"
+                raise ValueError(msg)
+
+            self._result[self._key] = _LITERALS[word]
+
+        elif b"." in word or b"e" in word or b"E" in word:
+            self._result[self._key] = str(float(word))
+
+        else:
+            self._result[self._key] = int(word)
+
+        self._state = _EXPECT_SEPARATOR
+        return position
+
+
+class JSONStreamEncoder:
+    """Encode the state of a noun as a JSON object, one field at a time,
+    returning the encoded object as a sequence of chunks of (at most)
+    `chunk_size` bytes.
+
+    Unlike [`JSONCodec.encode()`][urest.http.codec.JSONCodec.encode], the
+    complete encoded state is never held in memory: only the fields needed to
+    fill the next chunk. The encoder walks a (shallow) copy of the state, so
+    that changes to the state of the noun while the chunks are sent do not
+    break the iteration. Normally created through
+    [`JSONCodec.encode_stream()`][urest.http.codec.JSONCodec.encode_stream].
+
+    Examples
+    --------
+
+        for chunk in JSON.encode_stream({"led": 1, "name": "x"}, 8):
+            writer.write(chunk)
+
+    """
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(
+        self,
+        state: dict,
+        quote: Callable[[str], str],
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> None:
+        """Create an encoder for the `state` of a noun.
+
+        Parameters
+        ----------
+
+        state: dict
+            The state, or part of the state, of a noun.
+        quote: Callable[[str], str]
+            The function used to encode each string as a JSON string.
+        chunk_size: int
+            The largest size (in bytes) of each chunk.
+
+        """
+
+        if chunk_size < 1:
+            msg = "The chunk size must be at least one byte"
+            raise ValueError(msg)
+
+        self._state = dict(state)
+        self._keys = iter(self._state)
+        self._quote = quote
+        self._chunk_size = chunk_size
+        self._pending = b"{"
+        self._first = True
+        self._done = False
+
+    ##
+    ## Functions
+    ##
+
+    def __iter__(self) -> "JSONStreamEncoder":
+        return self
+
+    def __next__(self) -> bytes:
+        # Encode fields until there is enough for a full chunk, or the state
+        # has been walked
+        while len(self._pending) < self._chunk_size and not self._done:
+            try:
+                key = next(self._keys)
+            except StopIteration:
+                self._pending += b"}"
+                self._done = True
+                break
+
+            self._pending += self._field(key, self._state[key])
+
+        if not self._pending:
+            raise StopIteration
+
+        chunk = self._pending[: self._chunk_size]
+        self._pending = self._pending[self._chunk_size :]
+        return chunk
+
+    def _field(self, key: object, value: object) -> bytes:
+        """Return the encoded `key` and `value` of a single field, following
+        the conversions of [`normalise_state()`][urest.http.codec.normalise_state]."""
+
+        if isinstance(value, bool):
+            value = int(value)
+        elif not isinstance(value, (int, str)):
+            value = str(value)
+
+        if isinstance(value, int):
+            encoded = f"{self._quote(str(key).lower())}: {value}"
+        else:
+            encoded = f"{self._quote(str(key).lower())}: {self._quote(value)}"
+
+        if self._first:
+            self._first = False
+            return encoded.encode()
+
+        return b", " + encoded.encode()
+
+
+class BufferedDecoder:
+    """Collect the body of a request as it arrives, and decode the whole body
+    with a `codec` when it is complete.
+
+    Provides the same interface as [`JSONStreamDecoder`]
+    [urest.http.codec.JSONStreamDecoder], for codecs which can't decode a body
+    in pieces (e.g. the binary codecs of [`urest.http.binary`]
+    [urest.http.binary]). The body is held in memory as a whole, but never more
+    than `max_size` bytes of it.
+
+    """
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(
+        self,
+        codec: object,
+        max_size: int = MAX_BODY_SIZE,
+        max_keys: int = MAX_BODY_KEYS,
+    ) -> None:
+        """Create a decoder for a single request body.
+
+        Parameters
+        ----------
+
+        codec: object
+            The codec used to decode the body, once complete.
+        max_size: int
+            The maximum size, in bytes, of the body.
+        max_keys: int
+            The maximum number of keys in the body.
+
+        """
+
+        self._codec = codec
+        self._max_size = max_size
+        self._max_keys = max_keys
+        self._buffer = bytearray()
+
+    ##
+    ## Functions
+    ##
+
+    def feed(self, data: bytes) -> None:
+        """Add the next piece of the body.
+
+        Raises
+        ------
+
+        ValueError
+            If the body is longer than `max_size` bytes.
+
+        """
+
+        if len(self._buffer) + len(data) > self._max_size:
+            msg = "The body of the request is too large"
+            raise ValueError(msg)
+
+        self._buffer.extend(data)
+
+    def close(self) -> dict[str, Union[str, int]]:
+        """Decode, and return, the complete body.
+
+        Raises
+        ------
+
+        ValueError
+            If the body is invalid, or has more than `max_keys` keys.
+
+        """
+
+        body = self._codec.decode(self._buffer)  # type: ignore
+
+        if len(body) > self._max_keys:
+            msg = "The body of the request has too many keys"
+            raise ValueError(msg)
+
+        return body
+
+
+###
+### Codecs
+###
+
+JSON = JSONCodec(_json_library)
+"""The JSON codec used by the [`RESTServer`][urest.http.server.RESTServer],
+using the JSON library chosen when the module is imported."""
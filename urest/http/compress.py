@@ -0,0 +1,143 @@
+# This module, and all included code, is made available under the terms of the MIT
+# Licence
+#
+# Copyright (c) 2022-2023 David Love
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+# the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""Compresses the encoded responses to `GET` requests, for clients which
+accept a `Content-Encoding` of `gzip` or `deflate` (RFC 7230, Section 4.2).
+
+Compression uses the `zlib` library on CPython, and the `deflate` library on
+MicroPython (v1.21, or later, built with compression support). If neither
+library can compress, [`CODINGS`][urest.http.compress.CODINGS] is empty and
+responses are always sent uncompressed.
+
+The [`RESTServer`][urest.http.server.RESTServer] only compresses bodies of
+at least `compress_min_size` bytes, as the headers of the compressed formats
+make small bodies larger, not smaller. The compressed bodies of `cacheable`
+nouns are held in the [`ResponseCache`][urest.http.cache.ResponseCache],
+alongside the encoded body, so that repeated polls of an unchanged noun are
+not compressed again.
+"""
+
+# Import the in-memory streams, which are `uio` on older MicroPython releases
+try:
+    import io
+except ImportError:
+    import uio as io  # type: ignore
+
+# Import const support, falling back to the fake version on Python/CPython
+try:
+    from micropython import const
+except ImportError:
+    from urest.const import const  # type: ignore
+
+# Import the compression library: `zlib` on CPython, or `deflate` on
+# MicroPython. Note that MicroPython may provide a `zlib` which can only
+# decompress
+try:
+    import zlib as _zlib
+
+    if not hasattr(_zlib, "compressobj"):
+        _zlib = None
+except ImportError:
+    _zlib = None
+
+try:
+    import deflate as _deflate  # type: ignore
+except ImportError:
+    _deflate = None
+
+###
+### Constants
+###
+
+COMPRESSION_LEVEL = const(9)
+"""The `zlib` compression level. As each compressed body is cached, the best
+(and slowest) compression is used."""
+
+_GZIP_WBITS = const(31)
+_ZLIB_WBITS = const(15)
+
+###
+### Functions
+###
+
+
+def compress(data: bytes, coding: str) -> bytes:
+    """Return the `data` compressed with the content `coding`.
+
+    Parameters
+    ----------
+
+    data: bytes
+        The encoded body of the response.
+    coding: str
+        Either `"gzip"`, or `"deflate"` (i.e. the `zlib` format, as required by
+        RFC 7230, Section 4.2.2).
+
+    Returns
+    -------
+
+    bytes
+        The compressed body.
+
+    """
+
+    if _zlib is not None:
+        compressor = _zlib.compressobj(
+            COMPRESSION_LEVEL,
+            _zlib.DEFLATED,
+            _GZIP_WBITS if coding == "gzip" else _ZLIB_WBITS,
+        )
+        return compressor.compress(data) + compressor.flush()
+
+    stream = io.BytesIO()
+    compressor = _deflate.DeflateIO(
+        stream,
+        _deflate.GZIP if coding == "gzip" else _deflate.ZLIB,
+    )
+    compressor.write(data)
+    compressor.close()
+
+    return stream.getvalue()
+
+
+def _codings() -> tuple:
+    """Return the content codings which can be sent on this platform."""
+
+    if _zlib is None and _deflate is None:
+        return ()
+
+    # MicroPython builds without compression support raise on the first
+    # write
+    try:
+        compress(b"", "gzip")
+    except (OSError, NotImplementedError):
+        return ()
+
+    return ("gzip", "deflate")
+
+
+###
+### Codings
+###
+
+CODINGS = _codings()
+"""The content codings supported on this platform, in order of preference:
+`("gzip", "deflate")`, or an empty tuple if compression is not available."""
@@ -0,0 +1,237 @@
+# This module, and all included code, is made available under the terms of the MIT
+# Licence
+#
+# Copyright (c) 2022-2023 David Love
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+# the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""Controls how the requests for a single noun may overlap, once the methods
+of nouns may wait (as co-routines), or run in an executor pool.
+
+Each noun is registered with
+[`RESTServer.register_noun()`][urest.http.server.RESTServer.register_noun]
+under one of three concurrency policies
+
+1. `"none"`: the default. Calls to the methods of the noun may overlap freely,
+   and the noun must guard its own state if needed.
+2. `"rw"`: reads (`GET`) may overlap each other, but every write (`PUT`,
+   `POST` or `DELETE`) runs on its own. Suits nouns which are read far more
+   often than they are written.
+3. `"serial"`: every call to the methods of the noun runs on its own.
+
+Both `"rw"` and `"serial"` are implemented by a [`RWLock`]
+[urest.http.concurrency.RWLock] for the noun. Waiting calls are admitted in
+the order they arrived, so a steady stream of reads never starves a write.
+The number of waiting calls may be limited: calls beyond the limit raise
+[`LockQueueFullError`][urest.http.concurrency.LockQueueFullError], which the
+server answers with '`503 Service Unavailable`'. Each lock also records how
+often, and for how long, calls had to wait.
+"""
+
+import asyncio
+
+# Import the typing support
+try:
+    from typing import Optional
+except ImportError:
+    from urest.typing import Optional  # type: ignore
+
+# Import the millisecond timers, falling back to the fake version on CPython
+try:
+    from time import ticks_diff, ticks_ms  # type: ignore
+except ImportError:
+    from urest.ticks import ticks_diff, ticks_ms
+
+###
+### Constants
+###
+
+POLICIES = ("none", "rw", "serial")
+"""The concurrency policies which nouns may be registered with."""
+
+##
+## Exceptions
+##
+
+
+class LockQueueFullError(Exception):
+    """Service Unavailable. Thrown by [`RWLock.acquire()`]
+    [urest.http.concurrency.RWLock.acquire] when the lock is held, and the
+    queue of calls waiting for the lock is also full.
+
+    This exception should be notified to the client as the HTTP response
+    '`503 Service Unavailable`', and the client should retry the request
+    later.
+    """
+
+    pass
+
+
+###
+### Classes
+###
+
+
+class RWLock:
+    """Allow any number of readers, or a single writer, to hold the lock at
+    once; or, if `serial`, a single reader or writer. Calls which cannot hold
+    the lock at once wait in a single queue, in the order they arrived.
+
+    Attributes
+    ----------
+
+    serial: bool
+        If `True`, readers are also given the lock on their own.
+    max_waiting: Optional[integer]
+        The number of calls which may wait for the lock, or `None` for no
+        limit.
+    acquired: integer
+        The number of times the lock has been held.
+    waited: integer
+        The number of times a call had to wait for the lock.
+    wait_ms: integer
+        The total time (in milliseconds) calls have waited for the lock.
+    max_wait_ms: integer
+        The longest time (in milliseconds) a call has waited for the lock.
+    rejected: integer
+        The number of calls refused because the queue was full.
+
+    """
+
+    ##
+    ## Attributes
+    ##
+
+    serial: bool
+    max_waiting: Optional[int]
+    acquired: int
+    waited: int
+    wait_ms: int
+    max_wait_ms: int
+    rejected: int
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(self, serial: bool = False, max_waiting: Optional[int] = None) -> None:
+        self.serial = serial
+        self.max_waiting = max_waiting
+        self.acquired = 0
+        self.waited = 0
+        self.wait_ms = 0
+        self.max_wait_ms = 0
+        self.rejected = 0
+        self._readers = 0
+        self._writing = False
+        self._queue = []
+
+    ##
+    ## Getters and Setters
+    ##
+
+    @property
+    def waiting(self) -> int:
+        """The number of calls waiting for the lock."""
+
+        return len(self._queue)
+
+    ##
+    ## Functions
+    ##
+
+    async def acquire(self, write: bool) -> None:
+        """Wait until the lock can be held by a writer (if `write` is `True`),
+        or a reader, and then hold it.
+
+        Raises
+        ------
+
+        LockQueueFullError
+            If the call would have to wait, but `max_waiting` calls are already
+            waiting.
+
+        """
+
+        write = write or self.serial
+
+        if not self._queue and self._admits(write):
+            self._hold(write)
+            return
+
+        if self.max_waiting is not None and len(self._queue) >= self.max_waiting:
+            self.rejected += 1
+            msg = f"{len(self._queue)} calls are already waiting for the lock"
+            raise LockQueueFullError(msg)
+
+        waiter = (asyncio.Event(), write)
+        self._queue.append(waiter)
+        start = ticks_ms()
+
+        try:
+            await waiter[0].wait()
+        except asyncio.CancelledError:
+            # Give up the place in the queue, or the lock if it has just been
+            # handed over
+            if waiter[0].is_set():
+                self.release(write)
+            else:
+                self._queue.remove(waiter)
+                self._wake()
+
+            raise
+
+        waited = ticks_diff(ticks_ms(), start)
+        self.waited += 1
+        self.wait_ms += waited
+        self.max_wait_ms = max(waited, self.max_wait_ms)
+
+    def release(self, write: bool) -> None:
+        """Give up the lock held by a writer (if `write` is `True`), or by a
+        reader, handing it over to the calls waiting in the queue."""
+
+        if write or self.serial:
+            self._writing = False
+        else:
+            self._readers -= 1
+
+        self._wake()
+
+    def _admits(self, write: bool) -> bool:
+        """Return `True` if a writer (or reader) could hold the lock now."""
+
+        if write:
+            return not self._writing and self._readers == 0
+
+        return not self._writing
+
+    def _hold(self, write: bool) -> None:
+        self.acquired += 1
+
+        if write:
+            self._writing = True
+        else:
+            self._readers += 1
+
+    def _wake(self) -> None:
+        """Hand the lock over to the calls at the head of the queue: either a
+        single writer, or all the readers before the next writer."""
+
+        while self._queue and self._admits(self._queue[0][1]):
+            event, write = self._queue.pop(0)
+            self._hold(write)
+            event.set()
@@ -0,0 +1,274 @@
+# This module, and all included code, is made available under the terms of the MIT
+# Licence
+#
+# Copyright (c) 2022-2023 David Love
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+# the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""Runs the methods of nouns which block (for instance on a serial port, an
+SQLite database, or a vendor library) outside of the event loop, so that one
+slow noun does not stall every other connection to the server.
+
+Each noun is registered with
+[`RESTServer.register_noun()`][urest.http.server.RESTServer.register_noun]
+under one of three execution policies
+
+1. `"inline"`: the default. The methods of the noun are called directly in the
+   event loop, which is the fastest choice for nouns which never block.
+2. `"thread"`: the methods of the noun are called in a pool of threads, shared
+   by all the nouns with this policy.
+3. `"process"`: the methods of the noun are called in a pool of processes,
+   shared by all the nouns with this policy. The handler is copied (pickled)
+   into the worker process for each call: so the handler must be picklable,
+   its class importable by the worker, and any change the method makes to the
+   attributes of the handler is lost.
+   This policy suits nouns whose state is held outside of the server (e.g. in a
+   file, a database, or a device), and whose methods are bound by the CPU.
+
+Methods defined with `async def` may also be run in either pool. The
+co-routine is then run to completion in the worker, in an event loop of its
+own, rather than in the event loop of the server.
+
+Each [`PoolExecutor`][urest.http.executor.PoolExecutor] has a bounded number of
+workers, and a bounded number of calls waiting for a worker. Calls beyond both
+limits raise [`ExecutorFullError`][urest.http.executor.ExecutorFullError], which the
+server answers with '`503 Service Unavailable`' rather than letting the queue
+grow without limit.
+
+The pools need the `concurrent.futures` library, which MicroPython does not
+provide. On MicroPython [`POLICIES`][urest.http.executor.POLICIES] only holds
+`"inline"`, and nouns registered with any other policy are called inline.
+"""
+
+import asyncio
+
+# Import the executor pools, which are not available on MicroPython
+try:
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+except ImportError:
+    ProcessPoolExecutor = None
+    ThreadPoolExecutor = None
+
+# Import the typing support
+try:
+    from typing import Callable, Optional  # noqa: UP035
+except ImportError:
+    from urest.typing import Callable, Optional  # type: ignore
+
+###
+### Constants
+###
+
+_POOLS = {
+    name: pool
+    for name, pool in (("thread", ThreadPoolExecutor), ("process", ProcessPoolExecutor))
+    if pool is not None
+}
+
+POLICIES = ("inline", *_POOLS)
+"""The execution policies available on this platform: `("inline", "thread",
+"process")` on CPython, or `("inline",)` on MicroPython."""
+
+##
+## Exceptions
+##
+
+
+class ExecutorFullError(Exception):
+    """Service Unavailable. Thrown by [`PoolExecutor.run()`]
+    [urest.http.executor.PoolExecutor.run] when every worker of the pool is
+    busy, and the queue of calls waiting for a worker is also full.
+
+    This exception should be notified to the client as the HTTP response
+    '`503 Service Unavailable`', and the client should retry the request
+    later.
+    """
+
+    pass
+
+
+###
+### Functions
+###
+
+
+def _complete(function: Callable, *args: object) -> object:
+    """Call `function` with `args` in a worker of the pool, running the
+    co-routine it returns (if any) to completion in an event loop of the
+    worker."""
+
+    result = function(*args)
+
+    if hasattr(result, "send"):
+        return asyncio.run(result)
+
+    return result
+
+
+###
+### Classes
+###
+
+
+class PoolExecutor:
+    """Call the methods of nouns in a pool of threads, or of processes, with
+    a bounded number of workers and a bounded queue of waiting calls. The pool
+    itself is only started by the first call.
+
+    Attributes
+    ----------
+
+    policy: str
+        The execution policy of the pool: `"thread"` or `"process"`.
+    max_workers: integer
+        The number of workers in the pool.
+    max_queued: integer
+        The number of calls which may wait for a free worker.
+    pending: integer
+        The number of calls running, or waiting for a worker.
+    rejected: integer
+        The number of calls refused because the pool and queue were full.
+
+    """
+
+    ##
+    ## Attributes
+    ##
+
+    policy: str
+    max_workers: int
+    max_queued: int
+    pending: int
+    rejected: int
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(self, policy: str, max_workers: int, max_queued: int) -> None:
+        if policy not in _POOLS:
+            msg = f"No executor pool for the policy '{policy}'"
+            raise ValueError(msg)
+
+        self.policy = policy
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.pending = 0
+        self.rejected = 0
+        self._pool = None
+
+    ##
+    ## Functions
+    ##
+
+    async def run(self, function: Callable, *args: object) -> object:
+        """Call `function` with `args` in the pool, and return the result once
+        the call has finished.
+
+        Calls which are abandoned by the caller (e.g. on a timeout) are
+        cancelled if they have not yet started; otherwise they keep their
+        worker until the `function` returns.
+
+        Raises
+        ------
+
+        ExecutorFullError
+            If `max_workers` calls are running, and `max_queued` more are
+            waiting for a worker.
+
+        """
+
+        return await self.submit(None, function, *args)
+
+    def submit(
+        self,
+        finished: Optional[Callable],
+        function: Callable,
+        *args: object,
+    ) -> asyncio.Future:
+        """Start the call of `function` with `args` in the pool, returning a
+        future for the result. Unlike [`PoolExecutor.run()`]
+        [urest.http.executor.PoolExecutor.run], the `finished` callable (if not
+        `None`) is called in the event loop once the worker has finished with
+        the call: even if the future has been cancelled by then.
+
+        Raises
+        ------
+
+        ExecutorFullError
+            If `max_workers` calls are running, and `max_queued` more are
+            waiting for a worker.
+
+        """
+
+        if self.pending >= self.max_workers + self.max_queued:
+            self.rejected += 1
+            msg = f"All {self.max_workers} workers are busy, and {self.max_queued} calls are waiting"
+            raise ExecutorFullError(msg)
+
+        if self._pool is None:
+            self._pool = self._start()
+
+        # Count the call until the worker has finished with it: not just until
+        # the caller stops waiting
+        loop = asyncio.get_event_loop()
+        future = self._pool.submit(_complete, function, *args)
+        self.pending += 1
+        future.add_done_callback(lambda _: self._done(loop, finished))
+
+        return asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        """Stop the workers of the pool, once they have finished the calls
+        already started. Calls still waiting are cancelled."""
+
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _start(self) -> object:
+        """Start the pool of workers. Worker processes are spawned, rather
+        than forked, so that they do not hold copies of the sockets of the
+        server (which would keep client connections open after the server has
+        closed them)."""
+
+        if self.policy == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def _done(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        finished: Optional[Callable],
+    ) -> None:
+        """Count the end of a call, from the worker thread (or the event loop,
+        for calls cancelled before they started)."""
+
+        # The event loop may already have been closed
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(self._finished, finished)
+
+    def _finished(self, finished: Optional[Callable]) -> None:
+        self.pending -= 1
+
+        if finished is not None:
+            finished()
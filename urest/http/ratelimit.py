@@ -0,0 +1,230 @@
+# This module, and all included code, is made available under the terms of the MIT
+# Licence
+#
+# Copyright (c) 2022-2023 David Love
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+# the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""Limits the share of the server any one client can take, by the rate of its
+requests and by the number of its open connections.
+
+Clients are told apart by the IP address of their connections (from the
+`peername` of the connection). For each client the [`ClientLimits`]
+[urest.http.ratelimit.ClientLimits] of the [`RESTServer`]
+[urest.http.server.RESTServer] holds
+
+1. A _token bucket_ of requests. The bucket holds up to `burst` tokens, and
+   refills at `rate` tokens each second: each request takes one token, and
+   requests finding the bucket empty are answered at once with a pre-built
+   '`429 Too Many Requests`', and the connection is then closed. The first
+   request on each connection takes its token when the connection is
+   accepted, before any of the request is read; later requests on the
+   connection take theirs as soon as their head arrives, before the head is
+   parsed.
+2. A count of the open connections. Connections beyond
+   `max_connections` for the same client are answered with '`429 Too Many
+   Requests`' before any of the request is read, and closed.
+
+The table of clients is bounded by `max_clients`. When the table is full the
+client without open connections seen least recently is forgotten, so a scan
+from many addresses cannot grow the table without limit. A forgotten client
+simply starts again with a full bucket. Clients with open connections are
+never forgotten, as their count of connections would be lost: if every client
+in the table holds a connection, new clients are refused until one of them
+closes its connections.
+"""
+
+# Import the ordered dictionary, which is `ucollections` on older MicroPython
+# releases
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ucollections import OrderedDict  # type: ignore
+
+# Import the typing support
+try:
+    from typing import Optional
+except ImportError:
+    from urest.typing import Optional  # type: ignore
+
+# Import the millisecond timers, falling back to the fake version on CPython
+try:
+    from time import ticks_diff, ticks_ms  # type: ignore
+except ImportError:
+    from urest.ticks import ticks_diff, ticks_ms
+
+###
+### Classes
+###
+
+
+class _Client:
+    """The token bucket, and open connections, of a single client."""
+
+    def __init__(self, tokens: float) -> None:
+        self.tokens = tokens
+        self.stamp = ticks_ms()
+        self.connections = 0
+
+
+class ClientLimits:
+    """Hold a token bucket, and a count of open connections, for each of up to
+    `max_clients` clients, forgetting the client without open connections seen
+    least recently when the table is full.
+
+    Attributes
+    ----------
+
+    rate: Optional[float]
+        The number of requests each client may make each second, once its
+        `burst` is spent; or `None` for no limit.
+    burst: integer
+        The number of requests each client may make at once.
+    max_connections: Optional[integer]
+        The number of connections each client may hold open at once, or `None`
+        for no limit.
+    max_clients: integer
+        The number of clients held in the table.
+    throttled: integer
+        The number of requests refused because the bucket of the client was
+        empty.
+    refused: integer
+        The number of connections refused because the client already held
+        `max_connections` open, or because the table was full of clients
+        holding connections.
+    evicted: integer
+        The number of clients forgotten to make room in the table.
+
+    """
+
+    ##
+    ## Attributes
+    ##
+
+    rate: Optional[float]
+    burst: int
+    max_connections: Optional[int]
+    max_clients: int
+    throttled: int
+    refused: int
+    evicted: int
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(
+        self,
+        rate: Optional[float],
+        burst: int,
+        max_connections: Optional[int],
+        max_clients: int = 64,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_connections = max_connections
+        self.max_clients = max_clients
+        self.throttled = 0
+        self.refused = 0
+        self.evicted = 0
+        self._clients = OrderedDict()
+
+    ##
+    ## Functions
+    ##
+
+    def connect(self, address: Optional[str]) -> bool:
+        """Count a new connection from the client at `address`, returning
+        `False` (without counting the connection) if the client already holds
+        `max_connections` open, or cannot be added to the table."""
+
+        client = self._find(address)
+
+        if client is None or (
+            self.max_connections is not None
+            and client.connections >= self.max_connections
+        ):
+            self.refused += 1
+            return False
+
+        client.connections += 1
+        return True
+
+    def disconnect(self, address: Optional[str]) -> None:
+        """Count the end of a connection from the client at `address`."""
+
+        client = self._clients.get(address)
+
+        if client is not None and client.connections > 0:
+            client.connections -= 1
+
+    def allow(self, address: Optional[str]) -> bool:
+        """Take a token from the bucket of the client at `address`, returning
+        `False` if the bucket is empty, or the client cannot be added to the
+        table."""
+
+        if self.rate is None:
+            return True
+
+        client = self._find(address)
+
+        if client is None:
+            self.throttled += 1
+            return False
+
+        now = ticks_ms()
+        client.tokens = min(
+            self.burst,
+            client.tokens + ticks_diff(now, client.stamp) * self.rate / 1000,
+        )
+        client.stamp = now
+
+        if client.tokens < 1:
+            self.throttled += 1
+            return False
+
+        client.tokens -= 1
+        return True
+
+    def _find(self, address: Optional[str]) -> Optional[_Client]:
+        """Return the entry for the client at `address`, moving it to the end of
+        the table (as the client seen most recently); or add a new entry,
+        forgetting a client if the table is full. Returns `None` if the table
+        is full of clients holding connections."""
+
+        client = self._clients.pop(address, None)
+
+        if client is None:
+            if len(self._clients) >= self.max_clients and not self._evict():
+                return None
+
+            client = _Client(self.burst)
+
+        self._clients[address] = client
+        return client
+
+    def _evict(self) -> bool:
+        """Forget the client without open connections seen least recently,
+        returning `False` if every client holds a connection."""
+
+        for address, client in self._clients.items():
+            if client.connections == 0:
+                del self._clients[address]
+                self.evicted += 1
+                return True
+
+        return False
@@ -0,0 +1,817 @@
+# This module, and all included code, is made available under the terms of the MIT
+# Licence
+#
+# Copyright (c) 2022-2023 David Love
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+# the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""Reads and holds the raw HTTP/1.1 request from the network client. Like the
+[`HTTPResponse`][urest.http.response.HTTPResponse] class, the
+[`HTTPRequest`][urest.http.request.HTTPRequest] class is a utility class used
+by the [`RESTServer`][urest.http.server.RESTServer], and should be largely
+invisible to the API layer.
+
+The request 'head' (the request line and the header fields) is read from the
+client in one pass by [`read_head()`][urest.http.request.read_head], and held
+as a single buffer. Header fields are _not_ split, or decoded, when the head is
+read: instead the buffer is searched only when the value of a field is asked
+for by the [`RESTServer`][urest.http.server.RESTServer], and only the value of
+that field is decoded. Since the server only needs a handful of the fields sent
+by most clients, this avoids creating (and then discarding) a string for every
+field of every request.
+
+Standards
+---------
+
+  * For HTTP/1.1 specification see: https://www.ietf.org/rfc/rfc2616.txt
+"""
+
+# Import the Asynchronous IO Library. Since v1.20 of MicroPython, standard Python names
+# can be used
+import asyncio
+
+# Import const support, falling back to the fake version on Python/CPython
+try:
+    from micropython import const
+except ImportError:
+    from urest.const import const  # type: ignore
+
+# Import the typing support
+try:
+    from typing import Callable, Optional, Union  # noqa: UP035
+except ImportError:
+    from urest.typing import Callable, Optional, Union  # type: ignore
+
+###
+### Constants
+###
+
+HTTP_HEAD_END = b"\r\n\r\n"
+"""Marks the end of the request head, i.e. the empty line following the last
+header field."""
+
+ASCII_COLON = const(58)
+"""Byte value of the ASCII '`:`' character."""
+ASCII_SPACE = const(32)
+"""Byte value of the ASCII '` `' character."""
+ASCII_TAB = const(9)
+"""Byte value of the ASCII tab character."""
+ASCII_SLASH = const(47)
+"""Byte value of the ASCII '`/`' character."""
+
+HTTP_LONGEST_VERB = const(7)
+"""Length of the longest HTTP method (verb) accepted in the request line."""
+
+CHUNK_LINE_LIMIT = const(256)
+"""Maximum length, in bytes, of the size line (or of a trailer field line) of
+a chunked request body."""
+
+DECIMAL_DIGITS = "0123456789"
+"""The characters allowed in the `Content-Length` of a request."""
+
+HEX_DIGITS = b"0123456789abcdefABCDEF"
+"""The characters allowed in the size of a chunk."""
+
+
+def _noun_table() -> bytes:
+    """Build the look-up table used to validate nouns. Each entry maps the byte
+    value of a character allowed in a noun to the lowercase form of that
+    character: all other characters map to `0`."""
+
+    table = bytearray(256)
+
+    for char in b"abcdefghijklmnopqrstuvwxyz0123456789_/":
+        table[char] = char
+
+    for char in b"ABCDEFGHIJKLMNOPQRSTUVWXYZ":
+        table[char] = char + 32
+
+    return bytes(table)
+
+
+NOUN_TABLE = _noun_table()
+"""Look-up table for the characters allowed in a noun: the ASCII letters, the
+ASCII digits, '`_`' and the '`/`' separating the levels of a hierarchical noun.
+Allowed characters map to their lowercase form, and all other characters map
+to `0`."""
+
+_HAS_TRANSLATE = hasattr(bytes, "translate")
+"""Set if `bytes.translate()` is available (i.e. on CPython, but not on
+MicroPython)."""
+
+###
+### Functions
+###
+
+
+async def read_head(
+    reader: asyncio.StreamReader,
+    max_size: int,
+) -> Union[bytes, bytearray]:
+    """Read the head of the next request from the client, up to and including
+    the empty line which ends the head.
+
+    Where the `reader` supports it (e.g. on CPython), the whole head is read with
+    a single call to `readuntil()`. Otherwise (e.g. on MicroPython) the head is
+    read line by line into a single buffer. In either case the caller should
+    place a single deadline on the whole call, rather than on each line of the
+    head.
+
+    Note that `readuntil()` holds up to the `limit` of the `reader` before
+    giving up on finding the end of the head. The `reader` should therefore be
+    created with a `limit` of `max_size`, as [`RESTServer.start()`]
+    [urest.http.server.RESTServer.start] does, so that no more than `max_size`
+    bytes of a head which is too long are held in memory.
+
+    Parameters
+    ----------
+
+    reader: `asyncio.StreamReader`
+        An asynchronous stream, representing the network response _from_ the
+        client.
+    max_size: int
+        The maximum length, in bytes, of the request head.
+
+    Raises
+    ------
+
+    ValueError:
+        When the head is longer than `max_size` bytes.
+
+    Returns
+    -------
+
+    Union[bytes, bytearray]
+        The raw request head, or an empty buffer if the client closed the
+        connection before the head was complete.
+
+    """
+
+    if hasattr(reader, "readuntil"):
+        try:
+            head = await reader.readuntil(HTTP_HEAD_END)
+        except asyncio.IncompleteReadError:
+            return b""
+        except asyncio.LimitOverrunError:
+            msg = "Request head is too long"
+            raise ValueError(msg) from None
+
+        if len(head) > max_size:
+            msg = "Request head is too long"
+            raise ValueError(msg)
+
+        return head
+
+    head = bytearray()
+
+    while True:
+        line = await reader.readline()
+
+        if len(line) == 0:
+            return b""
+
+        # Skip any empty lines sent ahead of the request line (see RFC 2616,
+        # Section 4.1). Otherwise an empty line marks the end of the head
+        if line in (b"\r\n", b"\n"):
+            if len(head) == 0:
+                continue
+
+            head.extend(b"\r\n")
+            return head
+
+        head.extend(line)
+
+        if len(head) > max_size:
+            msg = "Request head is too long"
+            raise ValueError(msg)
+
+
+def parse_request_line(line: bytes) -> tuple[int, int, int]:
+    """Find the boundaries of the method, the path, the query and the HTTP
+    version within the request `line`. The boundaries are found with `find()`,
+    so nothing in the request line is copied or decoded: the caller can then
+    slice out (or take a `memoryview` of) only the parts it needs.
+
+    For example, the request line
+
+    ```
+    GET /led?brightness=1 HTTP/1.1
+    ```
+
+    has the boundaries `(3, 8, 21)`, giving the method `line[:3]` (`b"GET"`),
+    the path `line[4:8]` (`b"/led"`), the query `line[9:21]`
+    (`b"brightness=1"`) and the version `line[22:]` (`b"HTTP/1.1"`).
+
+    Parameters
+    ----------
+
+    line: bytes
+        The raw request line, without the line terminator.
+
+    Raises
+    ------
+
+    ValueError:
+        When the request line cannot be split into a method, request target and
+        HTTP version; or the method is longer than any known method.
+
+    Returns
+    -------
+
+    tuple[int, int, int]
+        The end of the method, the end of the path and the end of the request
+        target (i.e. the end of the query, or of the path if there is no query).
+
+    """
+
+    method_end = line.find(b" ")
+    target_end = line.rfind(b" ")
+
+    if method_end <= 0 or method_end > HTTP_LONGEST_VERB or target_end <= method_end:
+        msg = "Invalid request line"
+        raise ValueError(msg)
+
+    path_end = line.find(b"?", method_end + 1, target_end)
+
+    if path_end == -1:
+        path_end = target_end
+
+    return (method_end, path_end, target_end)
+
+
+def parse_noun(line: bytes, start: int, end: int) -> Optional[bytes]:
+    """Return the noun named by the path `line[start:end]`, in lowercase, or
+    `None` if the path does not name a valid noun.
+
+    The path must start with a '`/`', and may also end with a '`/`': neither
+    of which form part of the noun. Otherwise every character of the path is
+    checked against the [`NOUN_TABLE`]
+    [urest.http.request.NOUN_TABLE] in a single pass. Where `bytes.translate()`
+    is available (CPython), that pass also converts the noun to lowercase, and
+    the noun is copied only once from the `line`.
+
+    Parameters
+    ----------
+
+    line: bytes
+        The raw request line.
+    start: int
+        The start of the path in the `line`.
+    end: int
+        The end of the path in the `line`, as returned by
+        [`parse_request_line()`][urest.http.request.parse_request_line].
+
+    Returns
+    -------
+
+    Optional[bytes]
+        The lowercase noun, or `None` if the path contains characters not allowed
+        in a noun. The root path '`/`' names the empty noun `b""`.
+
+    """
+
+    if end <= start or line[start] != ASCII_SLASH:
+        return None
+
+    start += 1
+
+    if end > start and line[end - 1] == ASCII_SLASH:
+        end -= 1
+
+    if _HAS_TRANSLATE:
+        noun = line[start:end].translate(NOUN_TABLE)
+
+        if b"\x00" in noun:
+            return None
+
+        return noun
+
+    for char in memoryview(line)[start:end]:
+        if NOUN_TABLE[char] == 0:
+            return None
+
+    return line[start:end].lower()
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Return `True` if the entity tag `etag` is one of the tags listed in the
+    value of an `If-None-Match` header field, using the weak comparison
+    required for `If-None-Match` by RFC 7232, Section 3.2.
+
+    Parameters
+    ----------
+
+    if_none_match: str
+        The value of the `If-None-Match` header field sent by the client: either
+        '`*`', or a comma separated list of (quoted) entity tags.
+    etag: str
+        The (quoted) entity tag of the current representation of the noun.
+
+    Returns
+    -------
+
+    bool
+        `True` if the client already holds the representation tagged by `etag`.
+
+    """
+
+    for tag in if_none_match.split(","):
+        candidate = tag.strip()
+
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+
+        if candidate in (etag, "*"):
+            return True
+
+    return False
+
+
+def _weighted(entry: str) -> tuple[str, float]:
+    """Return the (lowercase) value, and the quality (`q`), of a single entry
+    in an `Accept` or `Accept-Encoding` header field."""
+
+    parameters = entry.split(";")
+    quality = 1.0
+
+    for parameter in parameters[1:]:
+        name, _, value = parameter.partition("=")
+
+        if name.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+
+    return (parameters[0].strip().lower(), quality)
+
+
+def negotiate(accept: Optional[str], codecs: tuple) -> object:
+    """Return the codec, from `codecs`, best matching the media ranges of an
+    `Accept` header field (RFC 7231, Section 5.3.2).
+
+    The range with the highest quality (`q`) which names the media type of a
+    codec is chosen, with ties going to the range listed first. Wildcard
+    ranges (`*/*`, or e.g. `application/*`) select the first (default) codec
+    if they match its media type. If no range names a codec (or there is no
+    `Accept` header field) the default codec is returned, rather than
+    refusing the request.
+
+    Parameters
+    ----------
+
+    accept: Optional[str]
+        The value of the `Accept` header field sent by the client, if any.
+    codecs: tuple
+        The codecs supported by the server, with the default codec first. Each
+        codec lists the media types it accepts in `media_types`.
+
+    Returns
+    -------
+
+    object
+        The chosen codec.
+
+    """
+
+    chosen = codecs[0]
+
+    if accept is None:
+        return chosen
+
+    best_quality = 0.0
+
+    for media_range in accept.split(","):
+        media_type, quality = _weighted(media_range)
+
+        if quality <= best_quality:
+            continue
+
+        if media_type.endswith("/*"):
+            if media_type in ("*/*", codecs[0].content_type.split("/")[0] + "/*"):
+                chosen, best_quality = codecs[0], quality
+        else:
+            for codec in codecs:
+                if media_type in codec.media_types:
+                    chosen, best_quality = codec, quality
+                    break
+
+    return chosen
+
+
+def negotiate_coding(accept_encoding: Optional[str], codings: tuple) -> Optional[str]:
+    """Return the content coding, from `codings`, best matching an
+    `Accept-Encoding` header field (RFC 7231, Section 5.3.4): or `None` if the
+    response should not be compressed.
+
+    The coding with the highest quality (`q`) is chosen, with ties going to the
+    coding listed first by the client. A wildcard (`*`) selects the first of
+    the `codings`.
+
+    Parameters
+    ----------
+
+    accept_encoding: Optional[str]
+        The value of the `Accept-Encoding` header field sent by the client, if
+        any.
+    codings: tuple
+        The content codings supported by the server, in order of preference.
+
+    Returns
+    -------
+
+    Optional[str]
+        The chosen coding, or `None` for no compression.
+
+    """
+
+    chosen = None
+
+    if accept_encoding is None or len(codings) == 0:
+        return chosen
+
+    best_quality = 0.0
+
+    for entry in accept_encoding.split(","):
+        coding, quality = _weighted(entry)
+
+        if quality <= best_quality:
+            continue
+
+        if coding == "*":
+            chosen, best_quality = codings[0], quality
+        elif coding in codings:
+            chosen, best_quality = coding, quality
+
+    return chosen
+
+
+def content_codec(content_type: Optional[str], codecs: tuple) -> object:
+    """Return the codec, from `codecs`, for the media type given by a
+    `Content-Type` header field: or the first (default) codec if the media type
+    is unknown, or not given.
+
+    Parameters
+    ----------
+
+    content_type: Optional[str]
+        The value of the `Content-Type` header field sent by the client, if
+        any.
+    codecs: tuple
+        The codecs supported by the server, with the default codec first.
+
+    Returns
+    -------
+
+    object
+        The chosen codec.
+
+    """
+
+    if content_type is not None:
+        media_type = content_type.split(";")[0].strip().lower()
+
+        for codec in codecs:
+            if media_type in codec.media_types:
+                return codec
+
+    return codecs[0]
+
+
+async def read_chunked(
+    reader: asyncio.StreamReader,
+    sink: Callable[[bytes], None],
+    max_chunk_size: int,
+    max_size: int,
+    piece_size: int,
+) -> int:
+    """Read a request body sent with `Transfer-Encoding: chunked` (RFC 7230,
+    Section 4.1) from the `reader`, passing the data of each chunk to `sink` as
+    it arrives.
+
+    The data of each chunk is read, and passed on, in pieces of at most
+    `piece_size` bytes: so neither a chunk nor the body is ever held in memory
+    as a whole. Chunk extensions, and any trailer fields following the last
+    chunk, are read and ignored.
+
+    Parameters
+    ----------
+
+    reader: `asyncio.StreamReader`
+        An asynchronous stream, representing the network response _from_ the
+        client.
+    sink: Callable[[bytes], None]
+        Called with each piece of the body, in order. Any `ValueError` raised by
+        the `sink` stops the reading of the body.
+    max_chunk_size: int
+        The maximum size, in bytes, of a single chunk.
+    max_size: int
+        The maximum size, in bytes, of the whole body.
+    piece_size: int
+        The maximum size, in bytes, of each piece passed to the `sink`.
+
+    Raises
+    ------
+
+    ValueError:
+        When the chunks are not correctly framed, or a chunk (or the body) is
+        larger than the limits. The rest of the body is **not** read, and so the
+        connection cannot be used for further requests.
+    EOFError:
+        When the client closes the connection before the last chunk.
+
+    Returns
+    -------
+
+    int
+        The size, in bytes, of the body.
+
+    """
+
+    total = 0
+
+    while True:
+        line = await _read_chunk_line(reader)
+
+        # The size is given in hex, and may be followed by extensions
+        # (`;name=value`) which are ignored
+        size = line.split(b";", 1)[0].strip()
+
+        if len(size) == 0 or len(size.strip(HEX_DIGITS)) > 0:
+            msg = "Invalid chunk size"
+            raise ValueError(msg)
+
+        length = int(size.decode(), 16)
+
+        if length > max_chunk_size:
+            msg = "Chunk is too large"
+            raise ValueError(msg)
+
+        total += length
+
+        if total > max_size:
+            msg = "Body is too large"
+            raise ValueError(msg)
+
+        # The last chunk has a size of zero, and is followed by the (optional)
+        # trailer fields and an empty line
+        if length == 0:
+            break
+
+        while length > 0:
+            data = await reader.read(min(length, piece_size))
+
+            if len(data) == 0:
+                msg = "Connection closed by the client whilst reading the body"
+                raise EOFError(msg)
+
+            length -= len(data)
+            sink(data)
+
+        if await _read_chunk_line(reader) != b"":
+            msg = "Chunk data is longer than the chunk size"
+            raise ValueError(msg)
+
+    trailer_size = 0
+
+    while True:
+        line = await _read_chunk_line(reader)
+
+        if len(line) == 0:
+            return total
+
+        trailer_size += len(line)
+
+        if trailer_size > CHUNK_LINE_LIMIT:
+            msg = "Trailer fields are too long"
+            raise ValueError(msg)
+
+
+async def _read_chunk_line(reader: asyncio.StreamReader) -> bytes:
+    """Read a single line of the chunk framing from the `reader`, returning the
+    line without the line ending."""
+
+    line = await reader.readline()
+
+    if len(line) > CHUNK_LINE_LIMIT:
+        msg = "Chunk line is too long"
+        raise ValueError(msg)
+
+    # Lines cut short by the end of the stream have no line ending
+    if line[-1:] != b"\n":
+        msg = "Connection closed by the client whilst reading the body"
+        raise EOFError(msg)
+
+    return line.rstrip(b"\r\n")
+
+
+###
+### Classes
+###
+
+
+class HTTPRequest:
+    """Hold the head of a single request from the network client, and provide
+    access to the request line and the header fields.
+
+    The head is held as a single buffer, as returned by [`read_head()`]
+    [urest.http.request.read_head]. Header fields are found by searching the
+    buffer (through a `memoryview`, to avoid copies) only when they are
+    requested through [`HTTPRequest.header()`]
+    [urest.http.request.HTTPRequest.header]. Only the value of the requested
+    field is decoded, and the result is kept for any later look-ups of the same
+    field.
+
+    The boundaries of the parts of the request line are found by
+    [`parse_request_line()`][urest.http.request.parse_request_line] when the
+    request is created, but only the `method` is copied from the request line.
+    The `path` and `query` are returned as views of the request line, and the
+    noun is only checked when [`HTTPRequest.noun()`]
+    [urest.http.request.HTTPRequest.noun] is called.
+
+    Attributes
+    ----------
+
+    request_line: bytes
+        The raw request line, without the line terminator. This is empty if
+        the head contained no request line.
+    method: bytes
+        The HTTP method (verb) of the request, in uppercase.
+
+    """
+
+    ##
+    ## Attributes
+    ##
+
+    request_line: bytes
+    method: bytes
+
+    _head: Union[bytes, bytearray]
+    _view: memoryview
+    _fields_start: int
+    _fields: dict[bytes, Optional[str]]
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(self, head: Union[bytes, bytearray]) -> None:
+        """Wrap the raw request `head` read from the client.
+
+        Parameters
+        ----------
+
+        head: Union[bytes, bytearray]
+            The raw request head, including the request line and all the header
+            fields.
+
+        Raises
+        ------
+
+        ValueError:
+            When the request line cannot be parsed.
+
+        """
+
+        self._head = head
+        self._view = memoryview(head)
+        self._fields = {}
+
+        # Skip any empty lines ahead of the request line
+        start = 0
+        while head.startswith(b"\r\n", start):
+            start += 2
+
+        line_end = head.find(b"\r\n", start)
+        if line_end == -1:
+            line_end = len(head)
+
+        self.request_line = bytes(self._view[start:line_end])
+        self._fields_start = line_end + 2
+
+        if len(self.request_line) > 0:
+            self._method_end, self._path_end, self._target_end = parse_request_line(
+                self.request_line,
+            )
+            self.method = self.request_line[: self._method_end].upper()
+        else:
+            self._method_end = self._path_end = self._target_end = 0
+            self.method = b""
+
+    ##
+    ## Getters and Setters
+    ##
+
+    @property
+    def path(self) -> memoryview:
+        """The path of the request target, without the query."""
+
+        return memoryview(self.request_line)[self._method_end + 1 : self._path_end]
+
+    @property
+    def query(self) -> memoryview:
+        """The query of the request target, without the leading '`?`'. This is
+        empty if the request target has no query."""
+
+        return memoryview(self.request_line)[self._path_end + 1 : self._target_end]
+
+    @property
+    def version(self) -> bytes:
+        """The HTTP version of the request, e.g. `b"HTTP/1.1"`."""
+
+        return self.request_line[self._target_end + 1 :]
+
+    ##
+    ## Functions
+    ##
+
+    def header(self, name: bytes) -> Optional[str]:
+        """Return the value of the header field `name`, or `None` if the field
+        is not in the request. If the field appears more than once, the value of
+        the first field is returned.
+
+        Parameters
+        ----------
+
+        name: bytes
+            The name of the header field, in **lowercase**. Field names in the
+            request are compared without regard to case.
+
+        Returns
+        -------
+
+        Optional[str]
+            The value of the field, without any leading or trailing white space.
+
+        """
+
+        if name in self._fields:
+            return self._fields[name]
+
+        head = self._head
+        view = self._view
+        size = len(name)
+        end = len(head)
+
+        value = None
+        start = self._fields_start
+
+        while start < end:
+            line_end = head.find(b"\r\n", start)
+            if line_end == -1:
+                line_end = end
+
+            # Only look at the name of the field if it has the right length
+            # (i.e. is followed by the ':' separator), so that most fields
+            # are skipped without a copy
+            colon = start + size
+
+            if (
+                colon < line_end
+                and head[colon] == ASCII_COLON
+                and bytes(view[start:colon]).lower() == name
+            ):
+                value_start = colon + 1
+                value_end = line_end
+
+                while value_start < value_end and head[value_start] in (
+                    ASCII_SPACE,
+                    ASCII_TAB,
+                ):
+                    value_start += 1
+
+                while value_end > value_start and head[value_end - 1] in (
+                    ASCII_SPACE,
+                    ASCII_TAB,
+                ):
+                    value_end -= 1
+
+                value = bytes(view[value_start:value_end]).decode("utf-8")
+                break
+
+            start = line_end + 2
+
+        self._fields[name] = value
+        return value
+
+    def noun(self) -> Optional[bytes]:
+        """Return the (lowercase) noun named by the path of the request, or
+        `None` if the path does not name a valid noun. See [`parse_noun()`]
+        [urest.http.request.parse_noun] for details."""
+
+        return parse_noun(self.request_line, self._method_end + 1, self._path_end)
@@ -45,6 +45,12 @@ try:
 except ImportError:
     from urest.enum import IntEnum  # type: ignore
 
+# Import const support, falling back to the fake version on Python/CPython
+try:
+    from micropython import const
+except ImportError:
+    from urest.const import const  # type: ignore
+
 # Import the typing support
 try:
     from typing import Optional, Union
@@ -68,15 +74,107 @@ class HTTPStatus(IntEnum):
     """
 
     OK = 200
+    NOT_MODIFIED = 304
     NOT_OK = 400
     NOT_FOUND = 404
+    METHOD_NOT_ALLOWED = 405
+    TOO_MANY_REQUESTS = 429
+    INTERNAL_SERVER_ERROR = 500
+    SERVICE_UNAVAILABLE = 503
+    GATEWAY_TIMEOUT = 504
+
+
+###
+### Constants
+###
 
+HEAD_BUFFER_SIZE = const(256)
+"""Initial size (in bytes) of the buffer used to assemble the head of each
+response. The buffer grows if a larger head is needed."""
+
+BODY_INLINE_LIMIT = const(512)
+"""Bodies up to this size (in bytes) are copied into the buffer after the head,
+so the whole response is sent in one write. Larger bodies are written
+separately, without being copied."""
+
+STATUS_LINES = {
+    HTTPStatus.OK: b"HTTP/1.1 200 OK\r\n",
+    HTTPStatus.NOT_MODIFIED: b"HTTP/1.1 304 Not Modified\r\n",
+    HTTPStatus.NOT_OK: b"HTTP/1.1 400 Bad Request\r\n",
+    HTTPStatus.NOT_FOUND: b"HTTP/1.1 404 Not Found\r\n",
+    HTTPStatus.METHOD_NOT_ALLOWED: b"HTTP/1.1 405 Method Not Allowed\r\n",
+    HTTPStatus.TOO_MANY_REQUESTS: b"HTTP/1.1 429 Too Many Requests\r\n",
+    HTTPStatus.INTERNAL_SERVER_ERROR: b"HTTP/1.1 500 Internal Server Error\r\n",
+    HTTPStatus.SERVICE_UNAVAILABLE: b"HTTP/1.1 503 Service Unavailable\r\n",
+    HTTPStatus.GATEWAY_TIMEOUT: b"HTTP/1.1 504 Gateway Timeout\r\n",
+}
+"""The encoded status line sent for each [`HTTPStatus`]
+[urest.http.response.HTTPStatus]."""
+
+STATUS_LINE_UNKNOWN = STATUS_LINES[HTTPStatus.INTERNAL_SERVER_ERROR]
+"""The status line sent for any status not in [`STATUS_LINES`]
+[urest.http.response.STATUS_LINES]. This _really_ shouldn't happen, so assume
+an internal error."""
 
 ###
 ### Classes
 ###
 
 
+class _HeadBuffer:
+    """A re-usable buffer for the assembly of the head of a response, holding
+    the bytes appended since the last `reset()`."""
+
+    def __init__(self, size: int) -> None:
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self._length = 0
+
+    def reset(self) -> None:
+        """Empty the buffer, keeping the storage for the next response."""
+        self._length = 0
+
+    def append(self, data: bytes) -> None:
+        """Copy `data` to the end of the buffer, growing the buffer if needed."""
+        end = self._length + len(data)
+
+        if end > len(self._buffer):
+            grown = bytearray(max(end, 2 * len(self._buffer)))
+            grown[: self._length] = self._view[: self._length]
+
+            self._buffer = grown
+            self._view = memoryview(grown)
+
+        self._view[self._length : end] = data
+        self._length = end
+
+    def copy(self) -> bytes:
+        """Return a copy of the bytes held in the buffer."""
+        return bytes(self._view[: self._length])
+
+    def write(self, writer: asyncio.StreamWriter) -> None:
+        """Write the bytes held in the buffer to `writer`, without copying
+        them. Transports which could not send the bytes at once may keep a
+        reference to them (rather than a copy): the storage is then left to the
+        transport, and the buffer given new storage for the next response."""
+        writer.write(self._view[: self._length])
+
+        transport = getattr(writer, "transport", None)
+
+        if transport is not None and transport.get_write_buffer_size() > 0:
+            self._buffer = bytearray(len(self._buffer))
+            self._view = memoryview(self._buffer)
+
+
+_HEAD_BUFFER = _HeadBuffer(HEAD_BUFFER_SIZE)
+
+
+def _is_stream(body: object) -> bool:
+    """Return `True` if `body` is an iterator, or an asynchronous iterator, of
+    body fragments (rather than the complete body)."""
+    return hasattr(body, "__next__") or hasattr(body, "__anext__")
+
+
 class HTTPResponse:
     """Create a response object, representing the raw HTTP header returned to
     the network client.
@@ -90,10 +188,15 @@ class HTTPResponse:
     Attributes
     ----------
 
-    body: string
+    body: Union[str, bytes]
         The raw HTTP body returned to the client. This is `Empty` by default
         as the return string is usually built by the caller via the `getters`
         and `setters` of [`HTTPResponse`][urest.http.response.HTTPResponse].
+        Bodies which have already been encoded may be given as `bytes` (or
+        any other buffer, such as a `memoryview`, which is sent without being
+        copied). The body may also be given as an iterator (or asynchronous
+        iterator) of `bytes` fragments, which are sent to the client as they
+        are produced using `Transfer-Encoding: chunked`.
     status: urest.http.response.HTTPStatus
         HTTP status code, which must be formed from the set [`HTTPResponse`]
         [urest.http.response.HTTPResponse]. Arbitrary return codes are **not**
@@ -120,11 +223,12 @@ class HTTPResponse:
     ## Attributes
     ##
 
-    _body: str
+    _body: Union[str, bytes]
     _status: HTTPStatus
     _mimetype: Optional[str]
     _close: bool
-    _header: Optional[dict[str, str]]
+    _header: dict[str, str]
+    _frozen: Optional[bytes]
 
     ##
     ## Constructor
@@ -132,7 +236,7 @@ class HTTPResponse:
 
     def __init__(
         self,
-        body: str = "",
+        body: Union[str, bytes] = "",
         status: HTTPStatus = HTTPStatus.OK,
         mimetype: Optional[str] = None,
         close: bool = True,
@@ -143,10 +247,15 @@ class HTTPResponse:
         Parameters
         ----------
 
-        body: string
+        body: Union[str, bytes]
             The raw HTTP body returned to the client. This is `Empty` by default
             as the return string is usually built by the caller via the `getters`
             and `setters` of [`HTTPResponse`][urest.http.response.HTTPResponse].
+            Bodies which have already been encoded may be given as `bytes` (or
+            any other buffer, such as a `memoryview`, which is sent without being
+            copied). The body may also be given as an iterator (or asynchronous
+            iterator) of `bytes` fragments, which are sent to the client as they
+            are produced using `Transfer-Encoding: chunked`.
         status: urest.http.response.HTTPStatus
             HTTP status code, which must be formed from the set [`HTTPResponse`]
             [urest.http.response.HTTPResponse]. Arbitrary return codes are **not**
@@ -175,11 +284,7 @@ class HTTPResponse:
             msg = "Invalid HTTP status code passed to the HTTP Response class"
             raise ValueError(msg)
 
-        if body is not None and isinstance(body, str):
-            self._body = body
-        else:
-            self._body = ""
-
+        self.body = body
         self._mimetype = mimetype
         self._close = close
 
@@ -188,6 +293,8 @@ class HTTPResponse:
         else:
             self._header = header
 
+        self._frozen = None
+
     ##
     ## Getters and Setters
     ##
@@ -195,19 +302,43 @@ class HTTPResponse:
     # HTTP Body
 
     @property
-    def body(self) -> str:
+    def body(self) -> Union[str, bytes]:
         """The raw HTTP response, formatted to return to the client as the HTTP
         response."""
 
         return self._body
 
     @body.setter
-    def body(self, new_body: str) -> None:
-        if new_body is not None and isinstance(new_body, str):
+    def body(self, new_body: Union[str, bytes]) -> None:
+        if new_body is not None and (
+            isinstance(new_body, (str, bytes, bytearray, memoryview))
+            or _is_stream(new_body)
+        ):
             self._body = new_body
         else:
             self._body = ""
 
+    # HTTP Mime Type
+
+    @property
+    def mimetype(self) -> Optional[str]:
+        """The MIME type of the `body`, sent as the `Content-Type` of the
+        response. If `None`, the body is sent as `text/html`."""
+        return self._mimetype
+
+    @mimetype.setter
+    def mimetype(self, new_mimetype: Optional[str]) -> None:
+        self._mimetype = new_mimetype
+
+    # HTTP Header Fields
+
+    @property
+    def header(self) -> dict[str, str]:
+        """The (key, value) pairs for the additional HTTP response header fields
+        sent to the client. Fields may be added to the returned dictionary
+        until the response is sent."""
+        return self._header
+
     # HTTP Status
 
     @property
@@ -228,6 +359,103 @@ class HTTPResponse:
     ## Functions
     ##
 
+    def freeze(self) -> "HTTPResponse":
+        """Encode the complete response once, so that each later call of
+        [`send()`][urest.http.response.HTTPResponse.send] writes the same bytes
+        without assembling the response again.
+
+        Intended for the responses built once by the
+        [`RESTServer`][urest.http.server.RESTServer], and shared by many
+        requests (for instance '`404 Not Found`'). Any changes made to the
+        response after this call are **not** sent to the client. Responses
+        with a streamed body cannot be frozen.
+
+        Returns
+        -------
+
+        HTTPResponse
+            This response, to allow the call to be chained with the constructor.
+
+        Raises
+        ------
+
+        ValueError
+            If the body of the response is streamed.
+
+        """
+
+        if _is_stream(self._body):
+            msg = "A response with a streamed body cannot be frozen"
+            raise ValueError(msg)
+
+        body = self._encode_body()
+        head = _HeadBuffer(HEAD_BUFFER_SIZE)
+        self._assemble_head(head, len(body))
+        head.append(body)
+
+        self._frozen = head.copy()
+        return self
+
+    def _encode_body(self) -> Union[bytes, bytearray, memoryview]:
+        """Return the body of the response encoded as bytes. A '`304 Not
+        Modified`' response never has a body (RFC 7232, Section 4.1)."""
+
+        if self._status == HTTPStatus.NOT_MODIFIED:
+            return b""
+
+        if isinstance(self._body, str):
+            return self._body.encode()
+
+        # Views of wider items (e.g. of an `array`) are sent as their bytes, as
+        # the length of the view is counted in items
+        if isinstance(self._body, memoryview) and getattr(
+            self._body,
+            "nbytes",
+            len(self._body),
+        ) != len(self._body):
+            if self._body.contiguous:
+                return self._body.cast("B")
+
+            return self._body.tobytes()
+
+        return self._body
+
+    def _assemble_head(self, head: "_HeadBuffer", body_length: Optional[int]) -> None:
+        """Append the status line and header fields of the response to `head`,
+        ending with the blank line separating the head from the body. A
+        `body_length` of `None` marks the body as sent in chunks."""
+
+        head.append(STATUS_LINES.get(self._status, STATUS_LINE_UNKNOWN))
+
+        # Send the body length, which is counted in bytes (not characters), and
+        # the body content type. A '304 Not Modified' response has neither field
+        if self._status != HTTPStatus.NOT_MODIFIED:
+            if body_length is None:
+                head.append(b"Transfer-Encoding: chunked")
+            else:
+                head.append(b"Content-Length: ")
+                head.append(str(body_length).encode())
+
+            if self._mimetype is None:
+                head.append(b"\r\nContent-Type: text/html\r\n")
+            else:
+                head.append(b"\r\nContent-Type: ")
+                head.append(self._mimetype.encode())
+                head.append(b"\r\n")
+
+        # Send any other header fields
+        for key, value in self._header.items():
+            head.append(key.encode())
+            head.append(b": ")
+            head.append(value.encode())
+            head.append(b"\r\n")
+
+        # Send the HTTP connection state, and end the head
+        if self._close:
+            head.append(b"Connection: close\r\n\r\n")
+        else:
+            head.append(b"Connection: keep-alive\r\n\r\n")
+
     async def send(self, writer: asyncio.StreamWriter) -> None:
         """Send an appropriate response to the client, based on the status
         code.
@@ -236,6 +464,15 @@ class HTTPResponse:
         the content currently in the `body`, and the error code forming the
         `status` of the response to the client.
 
+        The head of the response is assembled in a single buffer, shared by all
+        responses, from the pre-encoded status lines in [`STATUS_LINES`]
+        [urest.http.response.STATUS_LINES]. The response is then handed to the
+        transport in a single write (or two, for bodies larger than
+        [`BODY_INLINE_LIMIT`][urest.http.response.BODY_INLINE_LIMIT]), and
+        drained once. Streamed bodies are instead sent one chunk at a time,
+        draining after each chunk so that no more than one fragment of the
+        body is held by the transport.
+
         !!! Note
              The the actual sending of this HTTP 1.1 header to the client
              is the responsibility of the caller. This function only assists in
@@ -261,50 +498,74 @@ class HTTPResponse:
 
         """
 
-        # **NOTE**: This implementation should be in "match/case", but MicroPython
-        #       doesn't have a 3.10 release yet. When it does, this
-        #       implementation should be updated
+        # Responses built once, and shared, are sent as they are ...
+        if self._frozen is not None:
+            writer.write(self._frozen)
 
-        if self._status == HTTPStatus.OK:
-            # First tell the client we accepted the request
-            writer.write(b"HTTP/1.1 200 OK\r\n")
+        # ... streamed bodies follow the head as a sequence of chunks ...
+        elif _is_stream(self._body) and self._status != HTTPStatus.NOT_MODIFIED:
+            await self._send_chunked(writer)
 
-            # Then we try to assemble the body
-            if self._mimetype is not None:
-                writer.write(f"Content-Type: {self._mimetype}\r\n".encode())
-
-        elif self._status == HTTPStatus.NOT_OK:
-            # Tell the client we think we can route it: but the request
-            # makes no sense
-            writer.write(b"HTTP/1.1 400 Bad Request\r\n")
+        # ... otherwise assemble the head of the response in the shared buffer.
+        # The buffer is only used between here and the (synchronous) call to
+        # `write`, and so is never used by two responses at once
+        else:
+            body = self._encode_body()
+
+            _HEAD_BUFFER.reset()
+            self._assemble_head(_HEAD_BUFFER, len(body))
+
+            # Small bodies join the head, so that the whole response reaches the
+            # transport in one write (and usually leaves in one TCP segment).
+            # Larger bodies are written as they are, to avoid copying them. Note
+            # that nothing should follow the body, as the client will use the
+            # `Content-Length` to find the start of the next response on a
+            # persistent connection
+            if len(body) <= BODY_INLINE_LIMIT:
+                _HEAD_BUFFER.append(body)
+                _HEAD_BUFFER.write(writer)
+            else:
+                _HEAD_BUFFER.write(writer)
+                writer.write(body)
 
-        elif self._status == HTTPStatus.NOT_FOUND:
-            # Tell the client we can't route their request
-            writer.write(b"HTTP/1.1 404 Not Found\r\n")
+        # ... and ensure that it gets back to the client
+        await writer.drain()
 
-        else:
-            # This _really_ shouldn't be here. Assume an internal error
-            writer.write(b"HTTP/1.1 500 Internal Server Error\r\n")
+    async def _send_chunked(self, writer: asyncio.StreamWriter) -> None:
+        """Send the head of the response, followed by each fragment of the
+        streamed body as a separate chunk (RFC 7230, Section 4.1), and the
+        final (empty) chunk."""
 
-        # Send the body length
-        writer.write(f"Content-Length: {len(self._body)}\r\n".encode())
+        _HEAD_BUFFER.reset()
+        self._assemble_head(_HEAD_BUFFER, None)
+        _HEAD_BUFFER.write(writer)
 
-        # Send the body content type
-        writer.write(b"Content-Type: text/html\r\n")
+        if hasattr(self._body, "__anext__"):
+            while True:
+                try:
+                    fragment = await self._body.__anext__()
+                except StopAsyncIteration:
+                    break
 
-        # Send any other header fields
-        if self._header is not None and len(self._header) > 0:
-            for key, value in self._header.items():
-                writer.write(f"{key}: {value}\r\n".encode())
+                await self._send_chunk(writer, fragment)
 
-        # Send the HTTP connection state
-        if self._close:
-            writer.write(b"Connection: close\r\n")
         else:
-            writer.write(b"Connection: keep-alive\r\n")
+            for fragment in self._body:
+                await self._send_chunk(writer, fragment)
 
-        # Send the body itself...
-        writer.write(f"\r\n{self._body}\r\n".encode())
+        writer.write(b"0\r\n\r\n")
 
-        # ... and ensure that it gets back to the client
-        await writer.drain()
+    async def _send_chunk(
+        self,
+        writer: asyncio.StreamWriter,
+        fragment: Union[str, bytes],
+    ) -> None:
+        """Send a single (non-empty) `fragment` of the body as one chunk. Empty
+        fragments are skipped, as an empty chunk marks the end of the body."""
+
+        if isinstance(fragment, str):
+            fragment = fragment.encode()
+
+        if fragment:
+            writer.write(f"{len(fragment):x}\r\n".encode() + fragment + b"\r\n")
+            await writer.drain()
@@ -0,0 +1,317 @@
+# This module, and all included code, is made available under the terms of the MIT
+# Licence
+#
+# Copyright (c) 2022-2023 David Love
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+# the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""Maps the nouns requested by the network clients onto the instances of
+[`APIBase`][urest.api.base.APIBase] registered with the
+[`RESTServer`][urest.http.server.RESTServer].
+
+Nouns may be hierarchical, with each level of the noun separated by a '`/`'
+in the same way as the path of the URI. For instance the noun `bank1/led3`
+will be routed from the request
+
+```
+GET /bank1/led3 HTTP/1.1
+```
+
+All the nouns registered with the [`RESTServer`][urest.http.server.RESTServer]
+are held in a [`RouteTable`][urest.http.route.RouteTable], which is a tree
+('trie') with one level for each level of the noun. Finding the noun for a
+request then takes a single pass over the path of the request, with one
+dictionary look-up for each level of the noun. Requests for nouns which are
+not in the table are simply not found: no exception is raised, and so
+requests for unknown nouns are as cheap to answer as requests for known
+nouns.
+
+The last level of the path may also name a single attribute of a noun,
+rather than a noun in its own right. For instance if `bank1/led3` is a noun
+but `bank1/led3/brightness` is not, then the request
+
+```
+GET /bank1/led3/brightness HTTP/1.1
+```
+
+will be routed to the noun `bank1/led3`, for the attribute `brightness`. See
+[`RouteTable.match()`][urest.http.route.RouteTable.match].
+"""
+
+# Import the typing support
+try:
+    from typing import Optional
+except ImportError:
+    from urest.typing import Optional  # type: ignore
+
+from urest.api.base import APIBase
+
+from .coalesce import WriteCoalescer
+from .concurrency import RWLock
+from .executor import PoolExecutor
+from .request import parse_noun
+
+###
+### Classes
+###
+
+
+class Route:
+    """A noun registered with the [`RESTServer`]
+    [urest.http.server.RESTServer], together with the handler of that noun.
+
+    Attributes
+    ----------
+
+    noun: bytes
+        The canonical (lowercase) name of the noun.
+    handler: APIBase
+        The instance of [`APIBase`][urest.api.base.APIBase] handling the
+        requests for the noun.
+    timeout: Optional[float]
+        The time (in seconds) allowed for each co-routine returned by the
+        `handler`, or `None` for no limit.
+    executor: Optional[PoolExecutor]
+        The pool in which the methods of the `handler` are called, or `None`
+        to call them in the event loop.
+    writes: Optional[WriteCoalescer]
+        The coalescer of the `PUT` requests for the noun, or `None` if each
+        request is applied in full.
+    lock: Optional[RWLock]
+        The lock held by each call to the methods of the `handler`, or `None`
+        if the calls may overlap freely.
+
+    """
+
+    ##
+    ## Attributes
+    ##
+
+    noun: bytes
+    handler: APIBase
+    timeout: Optional[float]
+    executor: Optional[PoolExecutor]
+    writes: Optional[WriteCoalescer]
+    lock: Optional[RWLock]
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(
+        self,
+        noun: bytes,
+        handler: APIBase,
+        timeout: Optional[float] = None,
+        executor: Optional[PoolExecutor] = None,
+        writes: Optional[WriteCoalescer] = None,
+        lock: Optional[RWLock] = None,
+    ) -> None:
+        self.noun = noun
+        self.handler = handler
+        self.timeout = timeout
+        self.executor = executor
+        self.writes = writes
+        self.lock = lock
+
+
+class _RouteNode:
+    """A single level of the [`RouteTable`][urest.http.route.RouteTable],
+    holding the route (if any) for the noun ending at this level, and the next
+    level of the table for each of the nouns continuing past this level."""
+
+    def __init__(self) -> None:
+        self.route: Optional[Route] = None
+        self.children: dict[bytes, _RouteNode] = {}
+
+
+class RouteTable:
+    """Hold the nouns registered with the [`RESTServer`]
+    [urest.http.server.RESTServer] as a tree, with one level of the tree for
+    each level of the noun. See the [module documentation][urest.http.route]
+    for details.
+    """
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(self) -> None:
+        self._root = _RouteNode()
+
+    ##
+    ## Functions
+    ##
+
+    def add(
+        self,
+        noun: str,
+        handler: APIBase,
+        timeout: Optional[float] = None,
+        executor: Optional[PoolExecutor] = None,
+        writes: Optional[WriteCoalescer] = None,
+        lock: Optional[RWLock] = None,
+    ) -> Route:
+        """Add the `handler` for the `noun` to the table, replacing any existing
+        handler for the same noun.
+
+        Parameters
+        ----------
+
+        noun: str
+            The name of the noun. Nouns are not case sensitive, and any leading
+            or trailing '`/`' is ignored.
+        handler: APIBase
+            Instance object handling the request from the client.
+        timeout: Optional[float]
+            The time (in seconds) allowed for each co-routine returned by the
+            `handler`, or `None` for no limit.
+        executor: Optional[PoolExecutor]
+            The pool in which the methods of the `handler` are called, or
+            `None` to call them in the event loop.
+        writes: Optional[WriteCoalescer]
+            The coalescer of the `PUT` requests for the noun, or `None` to
+            apply each request in full.
+        lock: Optional[RWLock]
+            The lock held by each call to the methods of the `handler`, or
+            `None` to let the calls overlap freely.
+
+        Raises
+        ------
+
+        KeyError:
+            When the `noun` contains characters which are not allowed in a noun.
+
+        Returns
+        -------
+
+        Route
+            The route added to the table.
+
+        """
+
+        path = b"/" + noun.strip("/").encode()
+        key = parse_noun(path, 0, len(path))
+
+        if key is None or b"//" in key:
+            msg = f"Invalid noun: {noun}"
+            raise KeyError(msg)
+
+        node = self._root
+
+        if len(key) > 0:
+            for segment in key.split(b"/"):
+                if segment not in node.children:
+                    node.children[segment] = _RouteNode()
+
+                node = node.children[segment]
+
+        node.route = Route(key, handler, timeout, executor, writes, lock)
+        return node.route
+
+    def find(self, noun: bytes) -> Optional[Route]:
+        """Return the route for the (lowercase) `noun`, or `None` if the noun
+        is not in the table.
+
+        Parameters
+        ----------
+
+        noun: bytes
+            The canonical name of the noun, as returned by
+            [`HTTPRequest.noun()`][urest.http.request.HTTPRequest.noun].
+
+        Returns
+        -------
+
+        Optional[Route]
+            The route for the noun, if found.
+
+        """
+
+        node = self._root
+        start = 0
+        end = len(noun)
+
+        while start < end:
+            separator = noun.find(b"/", start)
+
+            if separator == -1:
+                separator = end
+
+            node = node.children.get(noun[start:separator])
+
+            if node is None:
+                return None
+
+            start = separator + 1
+
+        return node.route
+
+    def match(self, noun: bytes) -> tuple[Optional[Route], Optional[bytes]]:
+        """Return the route for the (lowercase) `noun`, together with the name
+        of the attribute requested from that route (if any).
+
+        Nouns in the table are always preferred: only if the _last_ level of
+        the `noun` is not in the table, and the level above it is a registered
+        noun, is the last level taken as the name of an attribute of that noun.
+        The root noun ('`/`') has no attributes.
+
+        Parameters
+        ----------
+
+        noun: bytes
+            The canonical name of the noun, as returned by
+            [`HTTPRequest.noun()`][urest.http.request.HTTPRequest.noun].
+
+        Returns
+        -------
+
+        tuple[Optional[Route], Optional[bytes]]
+            The route for the noun, or `None` if not found; and the name of the
+            attribute requested, or `None` if the request is for the whole
+            noun.
+
+        """
+
+        node = self._root
+        start = 0
+        end = len(noun)
+
+        while start < end:
+            separator = noun.find(b"/", start)
+
+            if separator == -1:
+                separator = end
+
+            child = node.children.get(noun[start:separator])
+
+            if child is None:
+                # The last level may still name an attribute of the noun found
+                # so far
+                if (
+                    separator == end
+                    and node is not self._root
+                    and node.route is not None
+                ):
+                    return (node.route, noun[start:])
+
+                return (None, None)
+
+            node = child
+            start = separator + 1
+
+        return (node.route, None)
@@ -45,41 +45,55 @@ import asyncio
 # Import the standard error library
 import errno
 
-# Import const support, falling back to the fake version on Python/CPython
+# Import the random number library, for the tag unique to each server
+import random
+
+# Import the CRC function, for the entity tags of responses which are not cached
+from binascii import crc32
+
+# Import the typing support. Note that MicroPython has no `collections.abc`, so
+# the `Coroutine` type has to come from the `typing` library
 try:
-    from micropython import const
+    from typing import Callable, Coroutine, Optional, Union  # noqa: UP035
 except ImportError:
-    from urest.const import const  # type: ignore
+    from urest.typing import Callable, Coroutine, Optional, Union  # type: ignore
 
-# Import the typing support
+# Import the millisecond timers, falling back to the fake version on CPython
 try:
-    from typing import Optional, Union
+    from time import ticks_add, ticks_diff, ticks_ms  # type: ignore
 except ImportError:
-    from urest.typing import Optional, Union  # type: ignore
+    from urest.ticks import ticks_add, ticks_diff, ticks_ms
 
 from urest.api.base import APIBase
 
+from .admission import AdmissionControl, Ticket
+from .binary import CBOR, MSGPACK
+from .cache import ResponseCache
+from .coalesce import SingleFlight, WriteCoalescer
+from .codec import (
+    JSON,
+    MAX_BODY_KEYS,
+    MAX_BODY_SIZE,
+    JSONStreamEncoder,
+    estimate_size,
+)
+from .compress import CODINGS, compress
+from .concurrency import POLICIES as CONCURRENCY_POLICIES
+from .concurrency import LockQueueFullError, RWLock
+from .executor import POLICIES, ExecutorFullError, PoolExecutor
+from .ratelimit import ClientLimits
+from .request import (
+    DECIMAL_DIGITS,
+    HTTPRequest,
+    content_codec,
+    etag_matches,
+    negotiate,
+    negotiate_coding,
+    read_chunked,
+    read_head,
+)
 from .response import HTTPResponse, HTTPStatus
-
-##
-## Constants
-##
-
-ASCII_UPPERCASE = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")
-"""Constant for the set of ASCII letters."""
-ASCII_DIGITS = set("0123456789")
-"""Constant for the set of ASCII digits."""
-ASCII_EXTRA = set("_")
-"""Constant for the extra ASCII characters allowed in the URI."""
-
-JSON_TYPE_INT = const(0)
-"""Constant for JSON token type of Integer."""
-JSON_TYPE_STR = const(1)
-"""Constant for JSON token type of String."""
-JSON_TYPE_ERROR = const(1)
-"""Constant for JSON token type of error/unknown."""
-
-HTTP_LONGEST_VERB = const(7)
+from .route import Route, RouteTable
 
 ##
 ## Exceptions
@@ -129,6 +143,423 @@ class RESTParseError(Exception):
 ##
 
 
+class ConnectionManager:
+    """Track the lifecycle of the client connections handled by the
+    [`RESTServer`][urest.http.server.RESTServer], and close those connections
+    as soon as the last response has been sent to the client.
+
+    Each connection moves through three states: _open_ whilst requests are
+    being served, _draining_ whilst any remaining response data is flushed to
+    the client and the socket is closed, and finally _closed_. The draining
+    state is bounded by a single deadline for the flush and close of the
+    socket: if the client does not accept the remaining data before the
+    deadline then the transport will be aborted. Once closed, any lingering of
+    the connection (e.g. the TCP `FIN` handshake) is left to the socket layer of
+    the host, and does not hold a task, or the buffers of the `asyncio` streams.
+
+    !!! Note
+        Lingering is **not** implemented through the `SO_LINGER` socket option,
+        as that would make the close of a non-blocking socket block the whole
+        event loop until the linger time expires.
+
+    The counters held by this class are intended to assist in the sizing of the
+    `backlog` of the [`RESTServer`][urest.http.server.RESTServer]: for
+    instance `peak` gives the largest number of connections seen open at the
+    same time.
+
+    Attributes
+    ----------
+
+    open: integer
+        The number of connections currently open, and serving requests.
+    draining: integer
+        The number of connections currently flushing the last response to the
+        client, and waiting for the socket to close.
+    closed: integer
+        The number of connections which have been closed.
+    aborted: integer
+        The number of connections (also included in `closed`) which were aborted
+        because the flush or close of the socket did not complete in time.
+    expired: integer
+        The number of connections (also included in `closed`) which were cut
+        off because the client did not send a request, or accept a response,
+        within its deadline (see [`Watchdog`][urest.http.server.Watchdog]).
+    peak: integer
+        The largest number of connections seen open or draining at the same time.
+    requests: integer
+        The number of requests served over all the closed connections.
+
+    """
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(self) -> None:
+        self.open = 0
+        self.draining = 0
+        self.closed = 0
+        self.aborted = 0
+        self.expired = 0
+        self.peak = 0
+        self.requests = 0
+
+    ##
+    ## Functions
+    ##
+
+    def connect(self) -> None:
+        """Record a new connection from the client, which will be counted as
+        open until [`ConnectionManager.close()`]
+        [urest.http.server.ConnectionManager.close] is called."""
+
+        self.open += 1
+
+        if self.open + self.draining > self.peak:
+            self.peak = self.open + self.draining
+
+    async def close(
+        self,
+        writer: asyncio.StreamWriter,
+        requests_served: int,
+        deadline: int,
+    ) -> None:
+        """Flush any remaining data to the client, and then close the
+        connection represented by `writer`. If the flush and close does not
+        complete within `deadline` seconds, the underlying transport will be
+        aborted.
+
+        Parameters
+        ----------
+
+        writer: `asyncio.StreamWriter`
+            An asynchronous stream, representing the network response _to_ the
+            client.
+        requests_served: int
+            The number of requests served over the connection.
+        deadline: int
+            Length of time in seconds to allow for the flush and close of the
+            connection.
+
+        """
+
+        self.open -= 1
+        self.draining += 1
+        self.requests += requests_served
+
+        try:
+            await asyncio.wait_for(self._drain_and_close(writer), deadline)
+        except Exception:
+            # Flush or close failed, or the deadline expired. Either way
+            # the client is no longer listening, so drop the connection
+            self.aborted += 1
+
+            transport = getattr(writer, "transport", None)
+            if transport is not None:
+                transport.abort()
+            else:
+                writer.close()
+        finally:
+            self.draining -= 1
+            self.closed += 1
+
+    async def _drain_and_close(self, writer: asyncio.StreamWriter) -> None:
+        """Send any data left in the `writer` buffers to the client, and then
+        close the connection."""
+
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+
+class Watchdog:
+    """A single timer for each client connection, cutting off the connection
+    if the client is too slow.
+
+    The task serving the connection moves the deadline of the watchdog on as
+    it reaches each stage of a request: for instance the whole head of the
+    request must arrive by one deadline, and the whole body by the next. If a
+    deadline passes before the watchdog is armed again, the watchdog cancels
+    the task serving the connection, wherever that task is waiting. A client
+    trickling its request a byte at a time therefore cannot hold the
+    connection for longer than the deadline, however the request is split.
+
+    Attributes
+    ----------
+
+    expired: bool
+        `True` once a deadline has passed, and the task serving the connection
+        has been cancelled.
+
+    """
+
+    ##
+    ## Attributes
+    ##
+
+    expired: bool
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(self, task: asyncio.Task) -> None:
+        """Create a watchdog, not yet armed, for the `task` serving a client
+        connection."""
+
+        self.expired = False
+
+        self._task = task
+        self._deadline = None
+        self._changed = asyncio.Event()
+        self._timer = None
+
+    ##
+    ## Functions
+    ##
+
+    def start(self) -> None:
+        """Start the timer task of the watchdog."""
+
+        self._timer = asyncio.create_task(self._watch())
+
+    def arm(self, timeout: int, limit: Optional[int] = None) -> None:
+        """Set the deadline of the watchdog to `timeout` seconds from now, or to
+        `limit` (from `ticks_ms()`) if that is sooner."""
+
+        deadline = ticks_add(ticks_ms(), timeout * 1000)
+
+        if limit is not None and ticks_diff(limit, deadline) < 0:
+            deadline = limit
+
+        # Only a sooner deadline needs to wake the timer: a later one is found
+        # when the timer next wakes
+        if self._deadline is None or ticks_diff(deadline, self._deadline) < 0:
+            self._changed.set()
+
+        self._deadline = deadline
+
+    def stop(self) -> None:
+        """Stop the timer task of the watchdog, without cancelling the task
+        serving the connection."""
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    async def _watch(self) -> None:
+        """Wait for the deadline of the watchdog, and then cancel the task
+        serving the connection."""
+
+        while True:
+            self._changed.clear()
+
+            if self._deadline is None:
+                await self._changed.wait()
+                continue
+
+            remaining = ticks_diff(self._deadline, ticks_ms())
+
+            if remaining <= 0:
+                self.expired = True
+                self._timer = None
+                self._task.cancel()
+                return
+
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining / 1000)
+            except asyncio.TimeoutError:
+                continue
+
+
+class ResponseQueue:
+    """An ordered queue of the responses to the requests made over a single
+    client connection.
+
+    Clients may send ('pipeline') several requests over a connection before
+    waiting for any of the responses. The handlers for these requests are run
+    as separate tasks as soon as each request has been read, but the
+    [HTTP/1.1 specification](https://www.ietf.org/rfc/rfc2616.txt) requires
+    the responses to be returned in the _same_ order as the requests were
+    received. Each handler is therefore placed in the queue in request order,
+    and the responses are sent to the client in that order by a single sender
+    task.
+
+    The number of requests read from the client, but not yet answered, is
+    limited by the `depth` of the queue. Once the limit is reached, no further
+    requests will be read from the client until the oldest response has been
+    sent.
+
+    Attributes
+    ----------
+
+    error: Optional[Exception]
+        The first exception raised by a handler in the queue, or whilst sending
+        the response. Once set, no further responses will be sent to the client.
+    on_idle: Optional[Callable]
+        If set, called (without arguments) each time the last response in the
+        queue has been sent.
+
+    """
+
+    ##
+    ## Attributes
+    ##
+
+    error: Optional[Exception]
+    on_idle: Optional[Callable]
+
+    ##
+    ## Constructor
+    ##
+
+    def __init__(self, writer: asyncio.StreamWriter, depth: int) -> None:
+        """Create an empty queue, sending the responses to the client through
+        `writer`.
+
+        Parameters
+        ----------
+
+        writer: `asyncio.StreamWriter`
+            An asynchronous stream, representing the network response _to_ the
+            client.
+        depth: int
+            The maximum number of requests whose responses can be waiting in the
+            queue.
+
+        """
+
+        self.error = None
+        self.on_idle = None
+
+        self._writer = writer
+        self._depth = max(depth, 1)
+        self._pending = []
+        self._changed = asyncio.Event()
+        self._closing = False
+        self._sender = None
+
+    ##
+    ## Properties
+    ##
+
+    @property
+    def pending(self) -> int:
+        """The number of requests whose responses have not yet been sent."""
+
+        return len(self._pending)
+
+    ##
+    ## Functions
+    ##
+
+    def start(self) -> None:
+        """Start the task sending the responses from the queue to the
+        client."""
+
+        self._sender = asyncio.create_task(self._send_responses())
+
+    async def put(self, handler: Coroutine) -> None:
+        """Run the `handler` co-routine for the next request, and queue the
+        response it returns to be sent to the client. If the queue is full,
+        wait until the oldest response has been sent.
+
+        Parameters
+        ----------
+
+        handler: Coroutine
+            A co-routine returning the [`HTTPResponse`]
+            [urest.http.response.HTTPResponse] for the request.
+
+        Raises
+        ------
+
+        Exception:
+            Any exception raised by the handlers of the earlier requests in the
+            queue.
+
+        """
+
+        while len(self._pending) >= self._depth and self.error is None:
+            self._changed.clear()
+            await self._changed.wait()
+
+        if self.error is not None:
+            handler.close()
+            raise self.error
+
+        self._pending.append(asyncio.create_task(handler))
+        self._changed.set()
+
+    async def close(self) -> None:
+        """Wait for all the responses in the queue to be sent to the client,
+        and then stop the sender task.
+
+        Raises
+        ------
+
+        Exception:
+            Any exception raised by the handlers of the requests in the queue.
+
+        """
+
+        self._closing = True
+        self._changed.set()
+
+        if self._sender is not None:
+            await self._sender
+
+        if self.error is not None:
+            raise self.error
+
+    def cancel(self) -> None:
+        """Stop sending responses to the client, and cancel the handlers of the
+        requests still in the queue."""
+
+        if self._sender is not None:
+            self._sender.cancel()
+            self._sender = None
+
+        for task in self._pending:
+            task.cancel()
+
+        self._pending = []
+
+    async def _send_responses(self) -> None:
+        """Send the responses in the queue to the client, in request order,
+        until the queue is closed."""
+
+        while True:
+            while len(self._pending) == 0:
+                if self._closing:
+                    return
+
+                self._changed.clear()
+                await self._changed.wait()
+
+            try:
+                response = await self._pending[0]
+                await response.send(self._writer)
+            except Exception as e:
+                # Stop sending responses once anything has gone wrong: the
+                # client can no longer tell which response belongs to which
+                # request
+                self.error = e
+
+                for task in self._pending[1:]:
+                    task.cancel()
+
+                self._pending = []
+                self._changed.set()
+                return
+
+            self._pending.pop(0)
+            self._changed.set()
+
+            if len(self._pending) == 0 and self.on_idle is not None:
+                self.on_idle()
+
+
 class RESTServer:
     """Initialise the server with reasonable defaults. These should work for
     most cases, and should be set so that most clients won't have to touch
@@ -201,12 +632,95 @@ class RESTServer:
         **Default:** 5 (typically the maximum pool size allowed).
     read_timeout: integer
         Length of time in seconds to wait for a response from the client before declaring
-        failure.
+        failure. The whole head of the request (i.e. the request line and all the
+        header fields) must arrive within this time.
 
         **Default:** 30 seconds.
+    body_timeout: integer
+        Length of time in seconds for the whole body of a request to arrive.
+    exchange_timeout: integer
+        Length of time in seconds for each request to be read (and, for the last
+        request on a connection, answered) as a whole.
     write_timeout: integer
         Length of time in seconds to wait for the network socket to accept a write to the
         client, before declaring failure.
+    max_head_size: integer
+        The maximum length, in bytes, of the head of a request (i.e. the request line and
+        all the header fields). Longer requests will be rejected.
+    keep_alive: bool
+        When `True` the connection to the client will be kept open after each
+        response, allowing further requests to be sent over the same connection
+        as described by the [HTTP/1.1 specification](https://www.ietf.org/rfc/rfc2616.txt)
+        for persistent connections. Otherwise every connection will be closed once
+        the first response has been sent.
+    keep_alive_timeout: integer
+        Length of time in seconds to wait for the _next_ request from the client on
+        a persistent connection, before the connection is closed.
+    max_requests: integer
+        The maximum number of requests which will be served over a single connection,
+        before that connection is closed.
+    pipeline_depth: integer
+        The maximum number of requests which can be read from a single connection
+        before the responses to those requests have been sent. Further requests
+        from the client will not be read until the oldest response has been sent.
+    max_body_size: integer
+        The maximum length, in bytes, of the body of a request.
+    max_body_keys: integer
+        The maximum number of keys in the body of a request.
+    stream_body_size: integer
+        Bodies longer than this (in bytes) are decoded as they arrive from the
+        client, rather than being read in full before being decoded.
+    max_chunk_size: integer
+        The maximum length, in bytes, of a single chunk of a request body sent
+        with `Transfer-Encoding: chunked`.
+    stream_state_size: integer
+        The state of nouns likely to be longer than this (in bytes) once
+        encoded is sent to the client in chunks, as it is encoded, rather than
+        being encoded in full before being sent.
+    codecs: tuple
+        The codecs used to encode the state of the nouns, and to decode the
+        bodies of the requests, with the default codec first.
+    compress_min_size: Optional[integer]
+        The smallest body (in bytes) of a `GET` response which is compressed,
+        or `None` if responses are never compressed.
+    max_workers: integer
+        The number of workers in each executor pool.
+    max_queued: integer
+        The number of calls which can wait for a worker in each executor pool.
+    executors: dict[str, PoolExecutor]
+        The executor pool for each execution policy in use, shared by all the
+        nouns registered with that policy. See [`urest.http.executor`]
+        [urest.http.executor] for details.
+    locks: dict[str, RWLock]
+        The lock of each noun registered with the `"rw"` or `"serial"`
+        concurrency policy, under the canonical (lowercase) name of the noun,
+        which also records how long calls waited for the noun. See [`urest.http.concurrency`][urest.http.concurrency] for
+        details.
+    connections: ConnectionManager
+        Tracks the number of client connections currently open, draining and
+        closed by the server.
+    cache: ResponseCache
+        Holds the encoded responses to `GET` requests, keyed on the state version
+        of each noun. See [`urest.http.cache`][urest.http.cache] for details.
+    clients: Optional[ClientLimits]
+        Limits the rate of the requests, and the number of connections, of
+        each client; and counts the requests and connections refused. `None`
+        if neither `client_rate` nor `max_client_connections` is set. See
+        [`urest.http.ratelimit`][urest.http.ratelimit] for details.
+    admission: Optional[AdmissionControl]
+        Admits the requests to the server up to `max_inflight`, and counts the
+        requests admitted and refused; or `None` if every request is admitted.
+        See [`urest.http.admission`][urest.http.admission] for details.
+    flights: SingleFlight
+        Shares the reads of the state of each noun between concurrent `GET`
+        requests, and counts the reads made and shared. See
+        [`urest.http.coalesce`][urest.http.coalesce] for details.
+    connections_served: integer
+        The number of client connections which have been closed by the server.
+    requests_served: integer
+        The number of requests served over all the client connections closed by the
+        server. Taken together with `connections_served`, this gives the average
+        number of requests served by each connection.
 
     Methods
     -------
@@ -230,10 +744,40 @@ class RESTServer:
     ## Attributes
     ##
 
-    _nouns: dict[str, APIBase]
-    """The list of registered objects which should be called when the given
+    _routes: RouteTable
+    """The table of registered objects which should be called when the given
     name is passed in the URI."""
 
+    _not_found: dict[bool, HTTPResponse]
+    """Pre-built '`404 Not Found`' responses, for requests which keep the
+    connection open (`False`) and those which close it (`True`)."""
+
+    _not_allowed: dict[bool, HTTPResponse]
+    """Pre-built '`405 Method Not Allowed`' responses, for requests which keep
+    the connection open (`False`) and those which close it (`True`)."""
+
+    _bad_request: dict[bool, HTTPResponse]
+    """Pre-built '`400 Bad Request`' responses, for requests whose body could
+    not be decoded."""
+
+    _service_unavailable: dict[bool, HTTPResponse]
+    """Pre-built '`503 Service Unavailable`' responses, for requests refused
+    by the admission control, or whose handler could not be queued for the
+    noun."""
+
+    _too_many_requests: HTTPResponse
+    """Pre-built '`429 Too Many Requests`' response, for clients sending
+    requests faster than the `client_rate`, or holding more than
+    `max_client_connections` open. The connection is always closed."""
+
+    _gateway_timeout: dict[bool, HTTPResponse]
+    """Pre-built '`504 Gateway Timeout`' responses, for requests whose handler
+    did not finish within the `timeout` of the noun."""
+
+    _attribute_not_allowed: dict[bool, HTTPResponse]
+    """Pre-built '`405 Method Not Allowed`' responses for requests on a single
+    attribute of a noun, which only allow `GET` and `PUT`."""
+
     ##
     ## Constructor
     ##
@@ -245,6 +789,31 @@ class RESTServer:
         backlog: int = 5,
         read_timeout: int = 30,
         write_timeout: int = 5,
+        body_timeout: Optional[int] = None,
+        exchange_timeout: int = 60,
+        max_head_size: int = 4096,
+        keep_alive: bool = True,
+        keep_alive_timeout: int = 5,
+        max_requests: int = 100,
+        pipeline_depth: int = 4,
+        max_body_size: int = MAX_BODY_SIZE,
+        max_body_keys: int = MAX_BODY_KEYS,
+        stream_body_size: int = 512,
+        max_chunk_size: int = 4096,
+        stream_state_size: int = 4096,
+        codecs: Optional[tuple] = None,
+        compress_min_size: Optional[int] = 256,
+        max_workers: int = 4,
+        max_queued: int = 8,
+        coalesce_window: int = 100,
+        max_inflight: Optional[int] = None,
+        priority_slots: int = 1,
+        target_latency: Optional[int] = None,
+        retry_after: int = 1,
+        client_rate: Optional[float] = None,
+        client_burst: int = 10,
+        max_client_connections: Optional[int] = None,
+        max_clients: int = 64,
     ) -> None:
         """Create an instance of the `RESTServer` class to handle client
         requests. In most cases there should only be once instance of
@@ -281,7 +850,8 @@ class RESTServer:
             **Default:** 5 (typically the maximum pool size allowed).
         read_timeout: integer
             Length of time in seconds to wait for a response from the client before declaring
-            failure.
+            failure. The whole head of the request (i.e. the request line and all the
+            header fields) must arrive within this time.
 
             **Default:** 30 seconds.
         write_timeout: integer
@@ -289,149 +859,352 @@ class RESTServer:
             client, before declaring failure.
 
             **Default:** 5 seconds.
+        body_timeout: Optional[integer]
+            Length of time in seconds for the whole body of a request to arrive, once the
+            head has been read. If `None`, the `read_timeout` is used.
+
+            **Default:** `None`.
+        exchange_timeout: integer
+            Length of time in seconds for each request as a whole: from the start of the
+            wait for the head, until the request (head and body) has been read and handed
+            to its handler. Responses still waiting to be sent when the connection closes
+            are given a further `exchange_timeout`. The deadlines for the head, the body, and the
+            exchange are all kept by a single [`Watchdog`][urest.http.server.Watchdog]
+            for each connection: connections which miss a deadline are closed at once, and
+            counted in `connections.expired`.
+
+            **Default:** 60 seconds.
+        max_head_size: integer
+            The maximum length, in bytes, of the head of a request (i.e. the request line and
+            all the header fields). Longer requests will be rejected with the HTTP response
+            '`400 Bad Request`', and the connection closed.
+
+            **Default:** 4096 bytes.
+        keep_alive: bool
+            When `True` the connection to the client will be kept open after each
+            response, if the client also requests a persistent connection. Otherwise
+            every connection will be closed once the first response has been sent.
+
+            **Default:** `True`.
+        keep_alive_timeout: integer
+            Length of time in seconds to wait for the _next_ request from the client on
+            a persistent connection, before the connection is closed.
+
+            **Default:** 5 seconds.
+        max_requests: integer
+            The maximum number of requests which will be served over a single connection,
+            before that connection is closed.
+
+            **Default:** 100 requests.
+        pipeline_depth: integer
+            The maximum number of requests which can be read from a single connection
+            before the responses to those requests have been sent. Setting this to `1`
+            will serve the requests on each connection strictly one at a time.
+
+            **Default:** 4 requests.
+        max_body_size: integer
+            The maximum length, in bytes, of the body of a request. Requests with
+            longer bodies will be rejected with the HTTP response '`400 Bad
+            Request`', and the connection closed, without reading the body.
+
+            **Default:** 16384 bytes.
+        max_body_keys: integer
+            The maximum number of keys in the body of a request. Requests with more
+            keys will be rejected with the HTTP response '`400 Bad Request`'.
+
+            **Default:** 64 keys.
+        stream_body_size: integer
+            Bodies longer than this (in bytes) are passed to a [`JSONStreamDecoder`]
+            [urest.http.codec.JSONStreamDecoder] as they arrive from the client, so
+            that the body is never held in memory as a whole; and invalid bodies are
+            rejected (and the connection closed) as soon as the error is found.
+            Shorter bodies are read in full, and decoded in a single call of the
+            (faster) JSON library.
+
+            **Default:** 512 bytes.
+        max_chunk_size: integer
+            The maximum length, in bytes, of a single chunk of a request body sent
+            with `Transfer-Encoding: chunked`. Chunked bodies are always passed to
+            a [`JSONStreamDecoder`][urest.http.codec.JSONStreamDecoder] as they
+            arrive, in pieces of at most `stream_body_size` bytes, and the whole
+            body is limited by `max_body_size`. Bodies breaking either limit are
+            rejected with the HTTP response '`400 Bad Request`', and the
+            connection closed.
+
+            **Default:** 4096 bytes.
+        stream_state_size: integer
+            `GET` requests for the state of a noun likely to be longer than
+            this (in bytes) once encoded (see [`estimate_size()`]
+            [urest.http.codec.estimate_size]) are answered with
+            `Transfer-Encoding: chunked`. The state is encoded by a
+            [`JSONStreamEncoder`][urest.http.codec.JSONStreamEncoder] as it is
+            sent, so that the memory used by the response is bounded by the
+            chunk size, rather than by the size of the state. As the full body
+            is never held, streamed responses are neither cached nor
+            compressed: states below this size are encoded in full, and so
+            are. Requests from HTTP/1.0 clients (which do not support chunks)
+            are always answered in full.
+
+            **Default:** 4096 bytes.
+        codecs: Optional[tuple]
+            The codecs used to encode the responses to `GET` requests, and to
+            decode the bodies of requests. The codec for each response is chosen
+            from the `Accept` header field of the request (see
+            [`negotiate()`][urest.http.request.negotiate]), and the codec for
+            each request body from its `Content-Type`: the first codec is used
+            if the client names none of them. Each codec must provide `name`,
+            `content_type`, `media_types`, `encode()`, `decode()` and
+            `stream_decoder()`: see [`JSONCodec`][urest.http.codec.JSONCodec].
+
+            **Default:** `(JSON, CBOR, MSGPACK)`, i.e. JSON unless the client
+            asks for CBOR or MessagePack (see [`urest.http.binary`]
+            [urest.http.binary]).
+        compress_min_size: Optional[integer]
+            Responses to `GET` requests with a body of at least this size (in
+            bytes) are compressed with `gzip` or `deflate`, if the client allows
+            either in the `Accept-Encoding` header field, and the platform can
+            compress (see [`urest.http.compress`][urest.http.compress]). Smaller
+            bodies, and bodies sent in chunks, are never compressed. Set to
+            `None` to turn compression off.
+
+            **Default:** 256 bytes.
+        max_workers: integer
+            The number of workers in each executor pool, i.e. the number of
+            calls to nouns registered with the `"thread"` (or `"process"`)
+            execution policy which can run at the same time. See
+            [`urest.http.executor`][urest.http.executor].
+
+            **Default:** 4 workers.
+        max_queued: integer
+            The number of calls which can wait for a free worker in each executor
+            pool. Requests beyond this limit are answered with '`503 Service
+            Unavailable`'.
+
+            **Default:** 8 calls.
+        coalesce_window: integer
+            Concurrent `GET` requests for the same noun share a single read of
+            its state (see [`urest.http.coalesce`][urest.http.coalesce]). The
+            result is also shared with requests arriving up to this many
+            milliseconds after the read has finished, unless the state of the
+            noun has changed. Set to `0` to only share the reads in flight.
+
+            **Default:** 100 milliseconds.
+        max_inflight: Optional[integer]
+            The most requests the server will work on at once, from the time
+            the head of each request is read until its handler has finished.
+            Requests beyond this limit are answered at once with '`503 Service
+            Unavailable`', and the connection closed (see
+            [`urest.http.admission`][urest.http.admission]). If `None`, every
+            request is admitted.
+
+            **Default:** `None`.
+        priority_slots: integer
+            The number of the `max_inflight` slots which are held back for
+            `GET` requests, so that reads are still answered under a burst of
+            writes. Must be less than `max_inflight`.
+
+            **Default:** 1 slot.
+        target_latency: Optional[integer]
+            If not `None`, the limit on the requests in flight adapts to the
+            time (in milliseconds) each handler takes, or waits to be run:
+            growing (up to `max_inflight`) while requests are faster than this
+            target, and shrinking when they are slower.
+
+            **Default:** `None`, i.e. a fixed limit.
+        retry_after: integer
+            The time (in seconds) clients are asked to wait, in the
+            `Retry-After` header field, before retrying a request answered
+            with '`503 Service Unavailable`' or '`429 Too Many Requests`'.
+
+            **Default:** 1 second.
+        client_rate: Optional[float]
+            The number of requests each client (told apart by IP address) may
+            send each second, once it has sent `client_burst` requests.
+            Requests beyond this rate are answered with '`429 Too Many
+            Requests`', without their head being parsed, and the connection
+            closed (see [`urest.http.ratelimit`][urest.http.ratelimit]). If
+            `None`, the rate of requests is not limited.
+
+            **Default:** `None`.
+        client_burst: integer
+            The number of requests each client may send at once, before the
+            `client_rate` applies.
+
+            **Default:** 10 requests.
+        max_client_connections: Optional[integer]
+            The number of connections each client may hold open at once.
+            Further connections are answered with '`429 Too Many Requests`',
+            and closed, before any of the request is read. If `None`, the
+            connections of each client are not limited.
+
+            **Default:** `None`.
+        max_clients: integer
+            The number of clients whose rate, and connections, are tracked at
+            once. Once the table is full, the client without open connections
+            seen least recently is forgotten; if every client in the table
+            holds a connection, connections from new clients are answered with
+            '`429 Too Many Requests`'.
+
+            **Default:** 64 clients.
+
+        Raises
+        ------
+
+        ValueError:
+            If `max_inflight` is not greater than `priority_slots`.
 
         """
         self.host = host
         self.port = port
         self.backlog = backlog
         self.read_timeout = read_timeout
+        self.body_timeout = read_timeout if body_timeout is None else body_timeout
+        self.exchange_timeout = exchange_timeout
         self.write_timeout = write_timeout
+        self.max_head_size = max_head_size
+        self.keep_alive = keep_alive
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_requests = max_requests
+        self.pipeline_depth = pipeline_depth
+        self.max_body_size = max_body_size
+        self.max_body_keys = max_body_keys
+        self.stream_body_size = stream_body_size
+        self.max_chunk_size = max_chunk_size
+        self.stream_state_size = stream_state_size
+        self.codecs = (JSON, CBOR, MSGPACK) if codecs is None else tuple(codecs)
+        self.compress_min_size = compress_min_size
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.retry_after = retry_after
+        self.executors = {}
+        self.locks = {}
+        self._codings = () if compress_min_size is None else CODINGS
+        self._vary = ", ".join(
+            name
+            for name, varies in (
+                ("Accept", len(self.codecs) > 1),
+                ("Accept-Encoding", len(self._codings) > 0),
+            )
+            if varies
+        )
+        self.connections = ConnectionManager()
+        self.cache = ResponseCache()
+        self.flights = SingleFlight(coalesce_window)
+        self.clients = (
+            None
+            if client_rate is None and max_client_connections is None
+            else ClientLimits(
+                client_rate,
+                client_burst,
+                max_client_connections,
+                max_clients,
+            )
+        )
+        self.admission = (
+            None
+            if max_inflight is None
+            else AdmissionControl(max_inflight, priority_slots, target_latency)
+        )
+        self._etag_prefix = f"{random.getrandbits(24):x}-"
         self._server = None
-        self._nouns = {"": APIBase()}
-
-    def _parse_data(self, data_str: str) -> dict[str, Union[str, int]]:
-        """Attempt to parse a string containing JSON-like formatting into a
-        single dictionary.
-
-        This function is **very** far from a full JSON parser: quite deliberately
-        it will only accept a single object of name/value pairs. Any arrays are
-        **not** accepted. In addition, this parser will coerce the 'name' side of
-        the dictionary into a string; or if this cannot be done will raise a
-        `RESTParseError`. The 'value' of a name/value pair will like-wise be
-        coerced into its JSON type; or a `RESTParseError` raised if this cannot be
-        done.
-
-        The parsing is done via a very simple stack-based parser, assuming no
-        backtracking. This will cope with valid JSON: but will quickly abort if
-        the JSON is malformed, raising a `RESTParseError`. This is quite
-        deliberate as we will only accept valid JSON from the client: if we can't
-        parse the result that is the clients problem...
-
-        The parser will also finish after the first found JSON object. We are
-        expecting only a single dictionary from the client, and so attempts to add
-        something more exotic will be ignored.
-
-        Parameters
-        ----------
+        self._routes = RouteTable()
+        self._routes.add("", APIBase())
+
+        # Build the responses for requests which cannot be routed once, so that
+        # answering them costs (almost) nothing
+        self._bad_request = {}
+        self._not_found = {}
+        self._not_allowed = {}
+        self._attribute_not_allowed = {}
+        self._service_unavailable = {}
+        self._gateway_timeout = {}
+
+        self._too_many_requests = HTTPResponse(
+            body="<http><body><p>Too Many Requests</p></body></http>",
+            status=HTTPStatus.TOO_MANY_REQUESTS,
+            close=True,
+            header={"Retry-After": str(retry_after)},
+        ).freeze()
+
+        for close in (True, False):
+            self._bad_request[close] = HTTPResponse(
+                body="<http><body><p>Invalid Request</p></body></http>",
+                status=HTTPStatus.NOT_OK,
+                close=close,
+            ).freeze()
+            self._not_found[close] = HTTPResponse(
+                body="<http><body><p>Not Found</p></body></http>",
+                status=HTTPStatus.NOT_FOUND,
+                close=close,
+            ).freeze()
+            self._not_allowed[close] = HTTPResponse(
+                body="<http><body><p>Invalid Method in Request</p></body></http>",
+                status=HTTPStatus.METHOD_NOT_ALLOWED,
+                close=close,
+                header={"Allow": "GET, PUT, POST, DELETE"},
+            ).freeze()
+            self._attribute_not_allowed[close] = HTTPResponse(
+                body="<http><body><p>Invalid Method in Request</p></body></http>",
+                status=HTTPStatus.METHOD_NOT_ALLOWED,
+                close=close,
+                header={"Allow": "GET, PUT"},
+            ).freeze()
+            self._service_unavailable[close] = HTTPResponse(
+                body="<http><body><p>Service Unavailable</p></body></http>",
+                status=HTTPStatus.SERVICE_UNAVAILABLE,
+                close=close,
+                header={"Retry-After": str(retry_after)},
+            ).freeze()
+            self._gateway_timeout[close] = HTTPResponse(
+                body="<http><body><p>Gateway Timeout</p></body></http>",
+                status=HTTPStatus.GATEWAY_TIMEOUT,
+                close=close,
+            ).freeze()
 
-        data_str: str
-            A JSON object string, representing a single dictionary
-
-        Raises
-        ------
+    ##
+    ## Getters and Setters
+    ##
 
-        RESTParseError
+    @property
+    def connections_served(self) -> int:
+        """The number of client connections which have been closed by the
+        server."""
 
-        Returns
-        -------
+        return self.connections.closed
 
-        dict[str, Union[str, int]]
-            A mapping of (key, value) pairs which defines the dictionary of the
-            `data_str` object. All `key` values will be in Python string format:
-            values will be as defined in the `data_str` object.
+    @property
+    def requests_served(self) -> int:
+        """The number of requests served over all the client connections
+        closed by the server."""
 
-        """
+        return self.connections.requests
 
-        return_dictionary: dict[str, Union[str, int]] = {}
-        parse_stack = []
-        object_start = False
-
-        token_start = False
-        token_sep = False
-
-        token_type = JSON_TYPE_INT
-        token_str = ""
-
-        for char in data_str:
-            # Look for the first object
-            if char in ["{"]:
-                object_start = True
-
-            # If we are inside an object, attempt to assemble the
-            # tokens
-            if object_start:
-                # If a '"' is found...
-                if char in ['"']:
-                    # ... and if we are building a token, this should be the
-                    # end of a string, so push it to the stack ...
-                    if token_start:
-                        if token_type == JSON_TYPE_STR:
-                            parse_stack.append(token_str)
-
-                            token_start = False
-                        else:
-                            msg = "Invalid string termination"
-                            raise RESTParseError(msg)
-
-                        token_type = JSON_TYPE_INT
-                        token_sep = False
-                        token_start = False
-                        token_str = ""
-
-                    # ... Otherwise if we are not building a token, set the
-                    # type marker, and start building a new string
-                    else:
-                        token_type = JSON_TYPE_STR
-                        token_start = True
-                        token_str = ""
-
-                # Look for the separator between a 'key' and a 'value'
-                if char in [":"]:
-                    token_sep = True
-
-                # Look for the end of a token
-                if char in [",", "}"]:
-                    # Add the key/value to the return dictionary if
-                    # it appears to be valid
-                    if token_sep:
-                        if token_type == JSON_TYPE_INT:
-                            # The token won't have been terminated
-                            # so still should be in `token_str`
-                            #
-                            # NOTE: Technically an un-terminated String
-                            #       is an error, so will parsing will
-                            #       break here (and we won't care)
-                            parse_stack.append(token_str)
-
-                        value = parse_stack.pop()
-                        key = parse_stack.pop()
-
-                        if token_type == JSON_TYPE_STR:
-                            return_dictionary[key] = str(value)
-
-                        if token_type == JSON_TYPE_INT:
-                            return_dictionary[key] = int(value)
-
-                    # If this is the end of the object, then return ...
-                    if char in ["}"]:
-                        return return_dictionary
-
-                    # .. otherwise, cleanup and continue
-                    else:
-                        token_type = JSON_TYPE_ERROR
-                        token_sep = False
-                        token_start = False
+    ##
+    ## Functions
+    ##
 
-                # If this isn't anything interesting, assume it is part of a token
-                if object_start and (
-                    (char in ASCII_UPPERCASE) or (char in ASCII_DIGITS)
-                ):
-                    token_str = token_str + str(char)
+    def register_noun(
+        self,
+        noun: str,
+        handler: APIBase,
+        timeout: Optional[float] = None,
+        executor: str = "inline",
+        write_window: Optional[int] = None,
+        concurrency: str = "none",
+        max_waiting: Optional[int] = None,
+    ) -> None:
+        """Register a new object handler for the noun passed by the client.
 
-        return return_dictionary
+        Nouns may be hierarchical, with each level of the noun separated by a
+        '`/`': for instance `bank1/led3`. See [`urest.http.route`]
+        [urest.http.route] for details.
 
-    def register_noun(self, noun: str, handler: APIBase) -> None:
-        """Register a new object handler for the noun passed by the client.
+        A new `handler` may replace the handler of a noun already registered.
+        As the state versions of the two handlers are unrelated, registering a
+        noun forgets the responses held in the [`ResponseCache`]
+        [urest.http.cache.ResponseCache], and changes the `ETag` of every
+        response, so that no client is sent (or told it holds) the state of
+        the old handler.
 
         Parameters
         ----------
@@ -440,28 +1213,103 @@ class RESTServer:
             String representing the noun to use in the API
         handler: APIBase
             Instance object handling the request from the client
+        timeout: Optional[float]
+            The longest time, in seconds, to wait for the co-routines returned
+            by the methods of the `handler` (see [`APIBase`]
+            [urest.api.base.APIBase]). Requests which take longer are answered
+            with '`504 Gateway Timeout`'. If `None`, wait for as long as the
+            co-routines take.
+        executor: str
+            The execution policy of the noun: `"inline"` to call the methods
+            of the `handler` in the event loop, or `"thread"` or `"process"` to
+            call them in the shared pool of threads or processes (see
+            [`urest.http.executor`][urest.http.executor]). The `timeout`
+            applies to calls in a pool as it does to co-routines; co-routine
+            methods of the `handler` are run to completion by the worker. On platforms
+            without executor pools, such as MicroPython, the methods are always
+            called inline.
+        write_window: Optional[int]
+            If not `None`, the `PUT` requests for the noun which arrive within
+            this many milliseconds of each other are coalesced: only the
+            newest state is applied to the `handler` (see
+            [`urest.http.coalesce`][urest.http.coalesce]). Each request is
+            delayed by up to this time.
+        concurrency: str
+            The concurrency policy of the noun: `"none"` to let the calls to
+            the methods of the `handler` overlap freely, `"rw"` to let reads
+            overlap but give each write sole use of the noun, or `"serial"` to
+            give every call sole use of the noun (see
+            [`urest.http.concurrency`][urest.http.concurrency]).
+        max_waiting: Optional[int]
+            The number of calls which may wait for the noun under the `"rw"`
+            or `"serial"` policies. Requests beyond this limit are answered
+            with '`503 Service Unavailable`'. If `None`, any number of calls
+            may wait.
 
         Raises
         ------
 
         KeyError:
-            When the handler cannot be registered, or the `handler` is
-            not a sub-class of [`APIBase`][urest.api.base.APIBase].
+            When the handler cannot be registered, the `handler` is not a
+            sub-class of [`APIBase`][urest.api.base.APIBase], or the `executor`
+            or `concurrency` is not a known policy.
 
         """
 
-        old_handler = APIBase()
+        if not isinstance(noun, str) or not isinstance(handler, APIBase):
+            msg = "Nouns must be strings, and handlers must be sub-classes of APIBase"
+            raise KeyError(msg)
 
-        try:
-            if noun in self._nouns:
-                old_handler = self._nouns[noun]
+        if executor not in ("inline", "thread", "process"):
+            msg = f"Unknown execution policy '{executor}'"
+            raise KeyError(msg)
+
+        if concurrency not in CONCURRENCY_POLICIES:
+            msg = f"Unknown concurrency policy '{concurrency}'"
+            raise KeyError(msg)
+
+        # Nouns share one pool for each policy, started on first use
+        pool = None
+
+        if executor != "inline" and executor in POLICIES:
+            if executor not in self.executors:
+                self.executors[executor] = PoolExecutor(
+                    executor,
+                    self.max_workers,
+                    self.max_queued,
+                )
+
+            pool = self.executors[executor]
+
+        # Nouns which limit the overlap of their calls have their own lock ...
+        lock = None
+
+        if concurrency != "none":
+            lock = RWLock(concurrency == "serial", max_waiting)
+
+        route = self._routes.add(
+            noun,
+            handler,
+            timeout,
+            pool,
+            None if write_window is None else WriteCoalescer(write_window),
+            lock,
+        )
+
+        # ... held under the canonical name of the route, replacing the lock of
+        # any earlier handler of the noun
+        name = route.noun.decode()
 
-            if isinstance(noun, str) and isinstance(handler, APIBase):
-                self._nouns[noun.lower()] = handler
+        if lock is not None:
+            self.locks[name] = lock
+        elif name in self.locks:
+            del self.locks[name]
 
-        except KeyError:
-            if old_handler is not None:
-                self._nouns[noun] = old_handler
+        # Forget the responses, and tags, which may be from an earlier handler
+        # of the noun
+        self.cache.clear()
+        self.flights.clear()
+        self._etag_prefix = f"{random.getrandbits(24):x}-"
 
     async def dispatch_noun(
         self,
@@ -473,6 +1321,16 @@ class RESTServer:
         the rest of the server. Most of the work is done elsewhere, by the API
         handlers: this is mostly a sanity check and a routing engine.
 
+        Each connection from the client may carry more than one request. Following
+        the [HTTP/1.1 specification](https://www.ietf.org/rfc/rfc2616.txt), the
+        connection will be kept open after each response _unless_ the client asks
+        for the connection to be closed (via the '`Connection: close`' header), or
+        the client is using HTTP/1.0 and _does not_ ask for the connection to be
+        kept open (via the '`Connection: keep-alive`' header). In all cases the
+        connection will be closed once `max_requests` have been served, or if
+        the client does not send the next request within `keep_alive_timeout`
+        seconds.
+
         !!! Danger
             This routine _must_ handle arbitrary network traffic, and so
             **must** be as defensive as possible to avoid security issues in
@@ -505,194 +1363,194 @@ class RESTServer:
 
         """
 
-        # Attempt the parse whatever rubbish the client sends, and assemble the
-        # fragments into an API request. Any failures should result in an
-        # `Exception`: success should result in an API call
-        try:
-            # Get the raw network request and decode into UTF-8
-            request_uri = await asyncio.wait_for(reader.readline(), self.read_timeout)
-
-            request_string = request_uri.decode("utf8")
+        requests_served = 0
+        keep_alive = True
+        tickets = []
 
-            # Check for empty requests, and if found terminate the connection
-            if request_string in [b"", b"\r\n"]:
-                # DEBUG
-                if __debug__:
-                    print(
-                        f"CLIENT: [{writer.get_extra_info('peername')[0]}] Empty request line",
-                    )
-                    return
+        self.connections.connect()
 
-            # DEBUG
-            if __debug__:
-                print(
-                    f"CLIENT URI : [{writer.get_extra_info('peername')[0]}] {request_string.strip()}",
-                )
+        # Create the queue for the responses to the client, allowing the requests
+        # to be read (and the handlers run) ahead of the responses being sent
+        responses = ResponseQueue(writer, self.pipeline_depth)
+        responses.start()
 
-            # Get the header of the request, if it is available, decoded into UTF-8
-            request_header = {}
-            request_line = None
+        # Refuse the connection, before reading anything, if the client already
+        # holds as many connections as it may, or is sending requests faster
+        # than it may: the first request on the connection takes its token now
+        peer = None
+        connected = False
 
-            while request_line not in [b"", b"\r\n"]:
-                request_line = await asyncio.wait_for(
-                    reader.readline(),
-                    self.read_timeout,
-                )
+        if self.clients is not None:
+            peername = writer.get_extra_info("peername")
+            peer = None if peername is None else peername[0]
+            connected = self.clients.connect(peer)
 
-                if request_line.find(b":") != -1:
-                    name, value = request_line.split(b":", 1)
-                    request_header[name.decode("utf-8").lower()] = value.decode(
-                        "utf-8",
-                    ).strip()
+            if not connected or not self.clients.allow(peer):
+                await responses.put(self._respond(self._too_many_requests))
+                keep_alive = False
 
-            # DEBUG
-            if __debug__:
-                print(
-                    f"CLIENT HEAD: [{writer.get_extra_info('peername')[0]}] {request_header}",
-                )
+        # Start the single timer keeping the deadlines of the connection
+        watchdog = Watchdog(asyncio.current_task())
+        watchdog.start()
+        exchange = None
 
-            # Check if there is a body to follow the header ...
-            request_body = {}
+        # Attempt the parse whatever rubbish the client sends, and assemble the
+        # fragments into an API request. Any failures should result in an
+        # `Exception`: success should result in an API call
+        try:
+            try:
+                while keep_alive:
+                    # Wait for the head of the next request. The first request on the
+                    # connection gets the full `read_timeout`: later requests only get
+                    # the (shorter) `keep_alive_timeout` whilst the connection is idle.
+                    # Either way the whole request must also be read by the deadline
+                    # of the exchange
+                    timeout = (
+                        self.read_timeout
+                        if requests_served == 0
+                        else self.keep_alive_timeout
+                    )
 
-            if "content-length" in request_header:
-                request_length = int(request_header["content-length"])
+                    if exchange is None:
+                        exchange = ticks_add(ticks_ms(), self.exchange_timeout * 1000)
 
-                # ... check if there is _really a body to follow ...
-                if request_length > 0:
-                    # ... if so, get the rest of the body of the request, decoded into UTF-8
+                    # The connection is not idle until the responses to the earlier
+                    # requests have been sent: until then the handlers are given
+                    # the deadline of the exchange
+                    if responses.pending > 0:
+                        watchdog.arm(self.exchange_timeout, exchange)
 
-                    try:
-                        request_length = int(request_header["content-length"])
-                        request_data = await asyncio.wait_for(
-                            reader.read(request_length),
-                            self.read_timeout,
-                        )
-                        decoded_data = request_data.decode("utf8")
-                        request_body = self._parse_data(decoded_data)
-                    except IndexError as e:
-                        # DEBUG
-                        if __debug__:
-                            print(f"!EXCEPTION!: {e}")
-                            print(
-                                f"!INVALID DATA!: [{writer.get_extra_info('peername')[0]}] {decoded_data}",
-                            )
-                        request_body = {}
+                        def idle(timeout: int = timeout, limit: int = exchange) -> None:
+                            watchdog.arm(timeout, limit)
 
-                    # DEBUG
-                    if __debug__:
-                        print(
-                            f"CLIENT DATA: [{writer.get_extra_info('peername')[0]}] {decoded_data}",
-                        )
-                        print(
-                            f"CLIENT BODY: [{writer.get_extra_info('peername')[0]}] {request_body}",
-                        )
+                        responses.on_idle = idle
+                    else:
+                        watchdog.arm(timeout, exchange)
 
-                else:
-                    # DEBUG
-                    if __debug__:
-                        print("CLIENT BODY: NONE")
-            else:
-                # DEBUG
-                if __debug__:
-                    print("CLIENT BODY: NONE")
+                    try:
+                        head = await read_head(reader, self.max_head_size)
+                        responses.on_idle = None
+
+                        # Check for the end of the stream, and if found terminate the
+                        # connection
+                        if len(head) == 0:
+                            # DEBUG
+                            if __debug__:
+                                print(
+                                    f"CLIENT: [{writer.get_extra_info('peername')[0]}] Empty request line",
+                                )
+                            break
+
+                        # Later requests on the connection take their token as
+                        # soon as the head arrives, before it is parsed
+                        if (
+                            requests_served > 0
+                            and self.clients is not None
+                            and not self.clients.allow(peer)
+                        ):
+                            await responses.put(self._respond(self._too_many_requests))
+                            break
+
+                        request = HTTPRequest(head)
+
+                    except ValueError:
+                        # The head is too long, or too malformed, to be a sensible
+                        # request, so tell the client and then give up on the connection
+                        await responses.put(self._reject(HTTPStatus.NOT_OK))
+                        break
 
-            ## NOTE: Below is a somewhat long-winded approach to working out
-            ##       the verb is based on the longest assumed verb:
-            ##       '`DELETE`'. To avoid later parsing errors, and to
-            ##       filter out the rubbish which might cause security
-            ##       issues, we will search first for a 'space' within
-            ##       the first six characters; then take either the first
-            ##       six characters or the string up to the 'space'
-            ##       whichever is shorter. These can then be compared
-            ##       for sanity before we run the dispatcher
+                    # Ignore requests consisting only of empty lines (see RFC 2616,
+                    # Section 4.1)
+                    if len(request.request_line) == 0:
+                        continue
 
-            # Work out the action we need to take ...
+                    requests_served += 1
 
-            request_string = request_uri.decode("utf8").strip()
+                    # Refuse the request at once, without reading the body, if the
+                    # server is already working on as many requests as it can
+                    ticket = None
 
-            first_space = request_string.find(" ", 0, 7)
+                    if self.admission is not None:
+                        ticket = self.admission.admit(request.method)
 
-            if first_space > HTTP_LONGEST_VERB:
-                first_space = HTTP_LONGEST_VERB
+                        if ticket is None:
+                            await responses.put(
+                                self._respond(self._service_unavailable[True]),
+                            )
+                            break
 
-            verb = request_string[0:first_space].upper()
+                        tickets.append(ticket)
 
-            # ... Work out the noun defining the class we need to use to resolve the
-            # action ...
+                    watchdog.arm(self.body_timeout, exchange)
 
-            uri_root = request_string.find("/", first_space)
+                    request_body, keep_alive = await self._read_request(
+                        request,
+                        reader,
+                        writer,
+                        requests_served,
+                    )
 
-            noun = ""
-            start_noun = False
+                    handler = self._handle_request(
+                        request,
+                        request_body,
+                        keep_alive,
+                        requests_served,
+                    )
 
-            for char in request_string[uri_root:]:
-                if (
-                    (char in ASCII_UPPERCASE)
-                    or (char in ASCII_DIGITS)
-                    or (char in ASCII_EXTRA)
-                ):
-                    start_noun = True
-                    noun = noun + str(char)
-                else:
-                    if start_noun:
-                        break
+                    if ticket is not None:
+                        ticket.ready = ticks_ms()
+                        handler = self._admitted(ticket, handler)
 
-            # ... and then call the appropriate handler
-            response = HTTPResponse()
+                    # Waiting for room in the queue is part of the exchange, not
+                    # of reading the body
+                    watchdog.arm(self.exchange_timeout, exchange)
+                    await responses.put(handler)
+                    exchange = None
 
-            if verb == "DELETE":
-                self._nouns[noun.lower()].delete_state()
-                response.body = ""
+            # Send any responses still waiting in the queue, unless the client has
+            # already run out of time
+            finally:
+                responses.on_idle = None
 
-            elif verb == "GET":
-                return_state = self._nouns[noun.lower()].get_state()
-                response_str = "{"
+                if not watchdog.expired:
+                    watchdog.arm(self.exchange_timeout, exchange)
+                    await responses.close()
 
-                try:
-                    for key in return_state:
-                        if isinstance(return_state[key], int):
-                            response_str = (
-                                response_str + f'"{key.lower()}": {return_state[key]},'
-                            )
-                        else:
-                            response_str = (
-                                response_str
-                                + f'"{key.lower()}": "{return_state[key]}",'
-                            )
-                finally:
-                    # Properly terminate the body
-                    response_str = response_str[:-1] + "}"
+        # Deal with any exceptions. These are mostly client errors, and since the
+        # REST API _should_ be idempotent, the client _should_ be able to simply
+        # retry. So we won't do anything very fancy here
+        except asyncio.TimeoutError:
+            pass
+        except EOFError:
+            # The client closed the connection part way through the body of a
+            # request (on CPython `asyncio.IncompleteReadError` is also an
+            # `EOFError`): the connection is simply closed, as for a timeout
+            pass
+        except asyncio.CancelledError:
+            # Connections which missed a deadline are cut off: anything else
+            # cancelling the task is passed on
+            if not watchdog.expired:
+                raise
 
-                response.body = response_str
+            responses.cancel()
+            self.connections.expired += 1
 
-            elif verb == "POST":
-                self._nouns[noun.lower()].set_state(request_body)
-                response.body = ""
+            task = asyncio.current_task()
 
-            elif verb == "PUT":
-                self._nouns[noun.lower()].set_state(request_body)
-                response.body = ""
+            if hasattr(task, "uncancel"):
+                task.uncancel()
 
-            else:
-                # Clearly not one of ours
-                response.body = (
-                    "<http><body><p>Invalid Method in Request</p></body></http>"
+            # DEBUG
+            if __debug__:
+                print(
+                    f"CLIENT: [{writer.get_extra_info('peername')[0]}] Deadline expired",
                 )
-                response.status = HTTPStatus.NOT_OK
-
-            await response.send(writer)
-
-            writer.write(b"\r\n")
-
-            await writer.drain()
-
-        # Deal with any exceptions. These are mostly client errors, and since the
-        # REST API _should_ be idempotent, the client _should_ be able to simply
-        # retry. So we won't do anything very fancy here
-        except asyncio.TimeoutError:
-            pass
         except Exception as e:
-            if e.args[0] == errno.ECONNRESET:  # connection reset by client
+            if (
+                isinstance(e, OSError)
+                and len(e.args) > 0
+                and e.args[0] == errno.ECONNRESET
+            ):  # connection reset by client
                 pass
             else:
                 if hasattr(e, "message"):
@@ -705,23 +1563,1010 @@ class RESTServer:
             if __debug__:
                 print(f"!EXCEPTION!: {e}")
 
-            response.body = "<http><body><p>Invalid Request</p></body></http>"
-            response.status = HTTPStatus.NOT_OK
-
         # In principle the response should have been sent back to the client by now.
-        # But we will give it one last try, and then also try to close the
-        # connection cleanly for the client. This may not work due to the earlier
-        # exceptions: but we will try anyway
+        # But we will give it one last try, and then close the connection: giving
+        # the client at most `write_timeout` seconds to accept the remaining data
+        # before the connection is dropped
+        finally:
+            watchdog.stop()
+
+            # DEBUG
+            if __debug__:
+                print(
+                    f"CLIENT: [{writer.get_extra_info('peername')[0]}] Closed after {requests_served} request(s)",
+                )
+
+            # Release the admission of any request whose handler never ran
+            for ticket in tickets:
+                ticket.release()
+
+            if connected:
+                self.clients.disconnect(peer)
+
+            await self.connections.close(writer, requests_served, self.write_timeout)
+
+    async def _admitted(self, ticket: Ticket, handler: Coroutine) -> HTTPResponse:
+        """Run the `handler` of an admitted request, releasing the `ticket` of
+        the request once the handler has finished."""
+
+        started = ticks_ms()
+
+        try:
+            return await handler
         finally:
-            # Do a soft close, dropping our end of the connection
-            # to see if the client closes ...
-            await writer.drain()
-            writer.close()
+            ticket.release(started)
+
+    async def _respond(self, response: HTTPResponse) -> HTTPResponse:
+        """Return the (pre-built) `response`, as the handler of a request."""
+
+        return response
+
+    async def _read_request(
+        self,
+        request: HTTPRequest,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        requests_served: int,
+    ) -> tuple[Optional[dict[str, Union[str, int]]], bool]:
+        """Read a single request from the client, starting from the head of the
+        request already read into `request` and reading the body of the request
+        (if any) from the `reader`.
+
+        Parameters
+        ----------
+
+        request: HTTPRequest
+            The head of the request, already read from the client.
+        reader: `asyncio.StreamReader`
+            An asynchronous stream, representing the network response _from_ the
+            client.
+        writer: `asyncio.StreamWriter`
+            An asynchronous stream, representing the network response _to_ the
+            client.
+        requests_served: int
+            The number of requests served on this connection, _including_ the
+            current request.
+
+        Returns
+        -------
+
+        tuple[Optional[dict[str, Union[str, int]]], bool]
+            The (parsed) body of the request (or `None` if the body could not be
+            decoded), and `True` if the connection to the client should be kept open
+            for the next request (or `False` if the connection should now be closed).
+
+        """
+
+        # DEBUG
+        if __debug__:
+            print(
+                f"CLIENT URI : [{writer.get_extra_info('peername')[0]}] {request.request_line.decode('utf8')}",
+            )
+
+        # Check if there is a body to follow the header, decoded by the codec
+        # named in the `Content-Type` ...
+        request_body = {}
+        body_complete = True
+        transfer_encoding = request.header(b"transfer-encoding")
+        content_length = request.header(b"content-length")
+
+        # ... sent in chunks. The `Transfer-Encoding` overrides any
+        # `Content-Length`; but as the client and any proxies may disagree on
+        # where such a request ends, the connection is closed after the response
+        # (RFC 7230, Section 3.3.3). Only the `chunked` coding is supported ...
+        if transfer_encoding is not None:
+            if transfer_encoding.lower().rstrip().endswith("chunked"):
+                request_body, body_complete = await self._read_chunked_body(
+                    reader,
+                    content_codec(request.header(b"content-type"), self.codecs),
+                )
+                body_complete = body_complete and content_length is None
+            else:
+                request_body, body_complete = (None, False)
+
+            # DEBUG
+            if __debug__:
+                print(
+                    f"CLIENT BODY: [{writer.get_extra_info('peername')[0]}] {request_body}",
+                )
+
+        # ... or with a known length. The length must be a plain decimal
+        # number: otherwise the end of the body, and so the start of the next
+        # request, is unknown and the connection must be closed ...
+        elif content_length is not None and (
+            len(content_length) == 0 or len(content_length.strip(DECIMAL_DIGITS)) > 0
+        ):
+            request_body, body_complete = (None, False)
+
+        elif content_length is not None:
+            request_length = int(content_length)
+
+            # ... check if there is _really a body to follow ...
+            if request_length > 0:
+                # ... if so, get the rest of the body of the request. Note that the
+                # _whole_ body must be read, otherwise the remainder will be mistaken
+                # for the next request on the connection: if it isn't, the connection
+                # must be closed after the response
+                request_body, body_complete = await self._read_body(
+                    reader,
+                    request_length,
+                    content_codec(request.header(b"content-type"), self.codecs),
+                )
+
+                # DEBUG
+                if __debug__:
+                    print(
+                        f"CLIENT BODY: [{writer.get_extra_info('peername')[0]}] {request_body}",
+                    )
+
+            else:
+                # DEBUG
+                if __debug__:
+                    print("CLIENT BODY: NONE")
+        else:
+            # DEBUG
+            if __debug__:
+                print("CLIENT BODY: NONE")
+
+        # Decide if the connection can be kept open after the response. HTTP/1.1
+        # clients keep the connection open unless they ask otherwise: HTTP/1.0 clients
+        # must explicitly ask for the connection to be kept open ...
+
+        connection = request.header(b"connection")
+        connection = "" if connection is None else connection.lower()
+
+        if (
+            not self.keep_alive
+            or not body_complete
+            or requests_served >= self.max_requests
+        ):
+            keep_alive = False
+        elif request.version == b"HTTP/1.0":
+            keep_alive = "keep-alive" in connection
+        else:
+            keep_alive = "close" not in connection
+
+        return (request_body, keep_alive)
+
+    async def _read_body(
+        self,
+        reader: asyncio.StreamReader,
+        length: int,
+        codec: object,
+    ) -> tuple[Optional[dict[str, Union[str, int]]], bool]:
+        """Read, and decode, the body of a request of `length` bytes from the
+        `reader`.
+
+        Bodies up to `stream_body_size` bytes are read in full, and then decoded.
+        Longer bodies are read in pieces of (at most) `stream_body_size` bytes,
+        each passed to the stream decoder of the `codec` (e.g. a
+        [`JSONStreamDecoder`][urest.http.codec.JSONStreamDecoder]) as it arrives:
+        reading stops as soon as the body is found to be invalid.
+        Bodies longer than `max_body_size` are not read at all.
+
+        Parameters
+        ----------
+
+        reader: `asyncio.StreamReader`
+            An asynchronous stream, representing the network response _from_ the
+            client.
+        length: int
+            The length of the body, from the `Content-Length` of the request.
+        codec: object
+            The codec used to decode the body.
+
+        Raises
+        ------
+
+        EOFError
+            If the client closes the connection before the whole body is read.
+
+        Returns
+        -------
+
+        tuple[Optional[dict[str, Union[str, int]]], bool]
+            The (parsed) body of the request, or `None` if the body is invalid; and
+            `True` if the whole body has been read from the `reader`.
+
+        """
+
+        if length > self.max_body_size:
+            return (None, False)
+
+        # Short bodies are read in full, and then decoded ...
+        if length <= self.stream_body_size:
+            request_data = await reader.readexactly(length)
+
+            try:
+                request_body = codec.decode(request_data)
+            except ValueError as e:
+                # DEBUG
+                if __debug__:
+                    print(f"!EXCEPTION!: {e}")
+
+                request_body = None
+
+            if request_body is not None and len(request_body) > self.max_body_keys:
+                request_body = None
+
+            return (request_body, True)
+
+        # ... longer bodies are decoded as they arrive
+        decoder = codec.stream_decoder(self.max_body_size, self.max_body_keys)
+        remaining = length
+
+        while remaining > 0:
+            request_data = await reader.read(min(remaining, self.stream_body_size))
+
+            if len(request_data) == 0:
+                msg = "Connection closed by the client whilst reading the body"
+                raise EOFError(msg)
+
+            remaining -= len(request_data)
+
+            try:
+                decoder.feed(request_data)
+            except ValueError as e:
+                # DEBUG
+                if __debug__:
+                    print(f"!EXCEPTION!: {e}")
+
+                return (None, remaining == 0)
+
+        try:
+            request_body = decoder.close()
+        except ValueError:
+            request_body = None
+
+        return (request_body, True)
+
+    async def _read_chunked_body(
+        self,
+        reader: asyncio.StreamReader,
+        codec: object,
+    ) -> tuple[Optional[dict[str, Union[str, int]]], bool]:
+        """Read, and decode, the body of a request sent with
+        `Transfer-Encoding: chunked` from the `reader`.
+
+        Each piece of the body is passed to the stream decoder of the `codec`
+        (e.g. a [`JSONStreamDecoder`][urest.http.codec.JSONStreamDecoder]) as it
+        arrives (see [`read_chunked()`][urest.http.request.read_chunked]), so the
+        JSON bodies are never held in memory as a whole. Reading stops as soon as
+        the body is found to be invalid, or breaks the `max_chunk_size` or
+        `max_body_size` limits.
+
+        Parameters
+        ----------
+
+        reader: `asyncio.StreamReader`
+            An asynchronous stream, representing the network response _from_ the
+            client.
+        codec: object
+            The codec used to decode the body.
+
+        Raises
+        ------
 
-            # ... if the client doesn't take the hint, wait
-            # for `write_timeout` seconds and then force the close
-            await asyncio.sleep(self.write_timeout)
-            await writer.wait_closed()
+        EOFError
+            If the client closes the connection before the whole body is read.
+
+        Returns
+        -------
+
+        tuple[Optional[dict[str, Union[str, int]]], bool]
+            The (parsed) body of the request, or `None` if the body is invalid; and
+            `True` if the whole body has been read from the `reader`.
+
+        """
+
+        decoder = codec.stream_decoder(self.max_body_size, self.max_body_keys)
+
+        try:
+            length = await read_chunked(
+                reader,
+                decoder.feed,
+                self.max_chunk_size,
+                self.max_body_size,
+                self.stream_body_size,
+            )
+        except ValueError as e:
+            # DEBUG
+            if __debug__:
+                print(f"!EXCEPTION!: {e}")
+
+            return (None, False)
+
+        # An empty body is treated as for a `Content-Length` of zero
+        if length == 0:
+            return ({}, True)
+
+        try:
+            request_body = decoder.close()
+        except ValueError:
+            request_body = None
+
+        return (request_body, True)
+
+    async def _handle_request(
+        self,
+        request: HTTPRequest,
+        request_body: Optional[dict[str, Union[str, int]]],
+        keep_alive: bool,
+        requests_served: int,
+    ) -> HTTPResponse:
+        """Call the handler of the noun named by the `request` for the action
+        requested by the verb, and return the response to be sent to the client.
+
+        Co-routines returned by the handler are awaited, for no longer than the
+        `timeout` of the noun: requests taking longer are answered with
+        '`504 Gateway Timeout`'.
+
+        Parameters
+        ----------
+
+        request: HTTPRequest
+            The head of the request.
+        request_body: Optional[dict[str, Union[str, int]]]
+            The (parsed) body of the request, an empty dictionary if the
+            request has no body, or `None` if the body could not be decoded.
+        keep_alive: bool
+            `True` if the connection to the client will be kept open after the
+            response.
+        requests_served: int
+            The number of requests served on this connection, _including_ the
+            current request.
+
+        Returns
+        -------
+
+        HTTPResponse
+            The response to the request, ready to be sent to the client.
+
+        """
+
+        # Work out the action we need to take, and the noun defining the class we
+        # need to use to resolve the action ...
+
+        verb = request.method
+        noun = request.noun()
+
+        # ... find the route for the noun. Requests which can't be routed, or with a
+        # verb we don't know, get one of the pre-built responses ...
+
+        route, attribute = (None, None) if noun is None else self._routes.match(noun)
+
+        if route is None:
+            return self._not_found[not keep_alive]
+
+        if attribute is None:
+            allowed = verb in (b"DELETE", b"GET", b"POST", b"PUT")
+            not_allowed = self._not_allowed
+        else:
+            allowed = verb in (b"GET", b"PUT")
+            not_allowed = self._attribute_not_allowed
+
+        if not allowed:
+            return not_allowed[not keep_alive]
+
+        # Requests whose body could not be decoded are never passed to the
+        # handler
+        if request_body is None:
+            return self._bad_request[not keep_alive]
+
+        handler = route.handler
+
+        if keep_alive:
+            response = HTTPResponse(
+                close=False,
+                header={
+                    "Keep-Alive": f"timeout={self.keep_alive_timeout}, max={self.max_requests - requests_served}",
+                },
+            )
+        else:
+            response = HTTPResponse(close=True)
+
+        try:
+            # ... reads of the noun, or of a single attribute of the noun, may be
+            # answered from the cache, or by telling the client its copy is still
+            # valid ...
+
+            if verb == b"GET":
+                key = route.noun if attribute is None else route.noun + b"/" + attribute
+
+                response = await self._handle_get(
+                    key,
+                    route,
+                    None if attribute is None else attribute.decode(),
+                    request,
+                    response,
+                )
+
+            # ... writes of a single attribute of the noun only touch that
+            # attribute ...
+
+            elif attribute is not None:
+                response = await self._handle_attribute(
+                    route,
+                    attribute.decode(),
+                    request_body,
+                    response,
+                )
+
+            # ... otherwise call the appropriate handler for the whole noun
+
+            else:
+                response = await self._handle_write(
+                    route,
+                    verb,
+                    request_body,
+                    response,
+                )
+
+        except asyncio.TimeoutError:
+            # The handler may have changed the state before the timeout, so
+            # assume that it has
+            if verb != b"GET":
+                handler.touch()
+
+            return self._gateway_timeout[not keep_alive]
+
+        except (ExecutorFullError, LockQueueFullError):
+            return self._service_unavailable[not keep_alive]
+
+        return response
+
+    async def _call(
+        self,
+        route: Route,
+        write: bool,
+        method: Callable,
+        *args: object,
+    ) -> object:
+        """Call the `method` of the handler of the `route` with `args`, under the
+        concurrency and execution policies of the noun, and return the result.
+        The call holds the lock of the noun (if any) as a writer if `write` is
+        `True`, or otherwise as a reader. Co-routines returned by an inline
+        `method`, and calls run in an executor pool, are awaited for no longer
+        than the `timeout` of the noun (if not `None`).
+
+        Raises
+        ------
+
+        asyncio.TimeoutError
+            If the call does not finish in time. Co-routines are cancelled, but
+            calls already running in an executor pool run on to completion:
+            and keep the lock of the noun until they do.
+        ExecutorFullError
+            If the executor pool of the noun cannot accept another call.
+        LockQueueFullError
+            If the call cannot join the queue for the lock of the noun.
+
+        """
+
+        lock = route.lock
+        release = None
+
+        if lock is not None:
+            await lock.acquire(write)
+
+            def release() -> None:
+                lock.release(write)
+
+        try:
+            if route.executor is None:
+                result = method(*args)
+
+                if not hasattr(result, "send"):
+                    return result
+            else:
+                # Calls in a pool release the lock once the worker has finished
+                # with them, rather than when the caller stops waiting: so a
+                # call which timed out cannot overlap the next holder of the lock
+                result = route.executor.submit(release, method, *args)
+                release = None
+
+            if route.timeout is None:
+                return await result
+
+            return await asyncio.wait_for(result, route.timeout)
+        finally:
+            if release is not None:
+                release()
+
+    async def _handle_write(
+        self,
+        route: Route,
+        verb: bytes,
+        request_body: dict[str, Union[str, int]],
+        response: HTTPResponse,
+    ) -> HTTPResponse:
+        """Write (`DELETE`, `POST` or `PUT`) the state of the noun of the
+        `route`, completing the `response` to the client.
+
+        For nouns registered with a `write_window`, `PUT` requests are passed
+        to the [`WriteCoalescer`][urest.http.coalesce.WriteCoalescer] of the
+        noun, and only the newest state of each window is applied. Requests
+        whose state was replaced are answered with the header field
+        `X-Coalesced: superseded`. Other writes are only made once the open
+        window has been applied.
+
+        Parameters
+        ----------
+
+        route: Route
+            The route of the noun requested by the client.
+        verb: bytes
+            The method of the request.
+        request_body: dict[str, Union[str, int]]
+            The (parsed) body of the request, or an empty dictionary if the
+            request has no body.
+        response: HTTPResponse
+            The response to be sent to the client.
+
+        Returns
+        -------
+
+        HTTPResponse
+            The completed `response`.
+
+        """
+
+        handler = route.handler
+        version = handler.state_version
+
+        if route.writes is not None and verb == b"PUT":
+            applied = await route.writes.put(
+                self._call,
+                route,
+                True,
+                handler.set_state,
+                request_body,
+            )
+
+            if not applied:
+                response.header["X-Coalesced"] = "superseded"
+        else:
+            if route.writes is not None:
+                await route.writes.flush()
+
+            if verb == b"DELETE":
+                await self._call(route, True, handler.delete_state)
+            else:
+                await self._call(route, True, handler.set_state, request_body)
+
+        # The default methods of the noun move on the `state_version` themselves:
+        # only nouns whose methods don't (or which ran in another process) are
+        # touched here
+        if handler.state_version == version:
+            handler.touch()
+
+        response.body = ""
+        return response
+
+    async def _handle_attribute(
+        self,
+        route: Route,
+        key: str,
+        request_body: dict[str, Union[str, int]],
+        response: HTTPResponse,
+    ) -> HTTPResponse:
+        """Write (`PUT`) the single attribute `key` of the noun of the `route`,
+        completing the `response` to the client.
+
+        The new value must be sent in the body of the request as
+        `{"key": value}`: requests without the `key` in the body are rejected.
+
+        Parameters
+        ----------
+
+        route: Route
+            The route of the noun requested by the client.
+        key: str
+            The (lowercase) name of the attribute requested by the client.
+        request_body: dict[str, Union[str, int]]
+            The (parsed) body of the request, or an empty dictionary if the
+            request has no body.
+        response: HTTPResponse
+            The response to be sent to the client.
+
+        Returns
+        -------
+
+        HTTPResponse
+            The completed `response`.
+
+        """
+
+        if key in request_body:
+            if route.writes is not None:
+                await route.writes.flush()
+
+            handler = route.handler
+            version = handler.state_version
+
+            await self._call(
+                route,
+                True,
+                handler.set_attribute,
+                key,
+                request_body[key],
+            )
+
+            # As for the writes of the whole noun, only touch nouns which did
+            # not move on their own `state_version`
+            if handler.state_version == version:
+                handler.touch()
+
+            response.body = ""
+        else:
+            response.status = HTTPStatus.NOT_OK
+            response.body = "<http><body><p>Invalid Request</p></body></http>"
+
+        return response
+
+    async def _handle_get(
+        self,
+        key: bytes,
+        route: Route,
+        attribute: Optional[str],
+        request: HTTPRequest,
+        response: HTTPResponse,
+    ) -> HTTPResponse:
+        """Read (`GET`) the state of the noun of the `route`, or a single
+        `attribute` of that noun, completing the `response` to the client.
+
+        Each response carries a strong `ETag`. For `cacheable` nouns the tag is
+        formed from the `state_version` of the noun (prefixed by a tag unique to
+        this server, so that tags are not re-used after a restart); otherwise
+        the tag is formed from the length and CRC of the encoded body. If the
+        tag matches the `If-None-Match` header field sent by the client, then
+        the response is '`304 Not Modified`', with no body. For `cacheable`
+        nouns that answer is given without reading, or encoding, the state of
+        the noun.
+
+        States returned already encoded by [`APIBase.get_raw()`]
+        [urest.api.base.APIBase.get_raw] are sent as they are.
+
+        Large states (see `stream_state_size`) are sent in chunks as they are
+        encoded. As the full body is never assembled, streamed responses are
+        neither cached nor compressed, and those from nouns which are not
+        `cacheable` carry no `ETag`.
+
+        The state is encoded by the codec named in the `Accept` header field of
+        the request, and compressed with the coding named in the
+        `Accept-Encoding` header field. Each encoding, and compressed body, is
+        cached and tagged separately.
+
+        Parameters
+        ----------
+
+        key: bytes
+            The name of the entry for the response in the cache.
+        route: Route
+            The route of the noun requested by the client.
+        attribute: Optional[str]
+            The (lowercase) name of the attribute requested by the client, or
+            `None` for the full state of the noun.
+        request: HTTPRequest
+            The request from the client.
+        response: HTTPResponse
+            The response to be sent to the client.
+
+        Returns
+        -------
+
+        HTTPResponse
+            The completed `response`.
+
+        """
+
+        handler = route.handler
+        if_none_match = request.header(b"if-none-match")
+
+        # Nouns which hold their state already encoded send it as it is. Only
+        # nouns overriding `get_raw()` are asked, to save a call (through the
+        # lock, and executor, of the noun) for every other noun ...
+        if attribute is None and type(handler).get_raw is not APIBase.get_raw:
+            raw = await self._call(route, False, handler.get_raw)
+
+            if raw is not None:
+                return self._handle_raw(handler, raw, if_none_match, response)
+
+        # ... otherwise choose the encoding of the response. Encodings other than the default
+        # have their own cache entries and tags
+        codec = self.codecs[0]
+        variant = ""
+
+        if len(self.codecs) > 1:
+            codec = negotiate(request.header(b"accept"), self.codecs)
+
+            if codec is not self.codecs[0]:
+                key = key + b";" + codec.name.encode()
+                variant = "-" + codec.name
+
+        coding = negotiate_coding(request.header(b"accept-encoding"), self._codings)
+
+        if self._vary:
+            response.header["Vary"] = self._vary
+
+        if handler.cacheable:
+            etag = f'"{self._etag_prefix}{handler.state_version}{variant}"'
+
+            if self._not_modified(response, if_none_match, etag, coding):
+                return response
+
+        body = await self._get_body(
+            key,
+            route,
+            attribute,
+            codec,
+            request.version != b"HTTP/1.0",
+        )
+
+        if body is None:
+            response.status = HTTPStatus.NOT_FOUND
+            response.body = "<http><body><p>Not Found</p></body></http>"
+            return response
+
+        # Only the bodies of the state are labelled as encoded by the codec: the
+        # other responses are plain HTML
+        response.mimetype = codec.content_type
+
+        if not isinstance(body, bytes):
+            response.body = body
+
+            if handler.cacheable:
+                response.header["ETag"] = etag
+
+            return response
+
+        if not handler.cacheable:
+            etag = f'"{len(body):x}-{crc32(body):08x}"'
+
+            if self._not_modified(response, if_none_match, etag, coding):
+                return response
+
+        # Compress the larger bodies, if the client allows it. The compressed
+        # body is a different representation, and so has a different tag
+        if coding is not None and len(body) >= self.compress_min_size:
+            body = self._compress(key, handler, body, coding)
+            etag = f'{etag[:-1]}-{coding}"'
+            response.header["Content-Encoding"] = coding
+
+        response.body = body
+        response.header["ETag"] = etag
+        return response
+
+    def _handle_raw(
+        self,
+        handler: APIBase,
+        raw: tuple[Union[bytes, bytearray, memoryview], str],
+        if_none_match: Optional[str],
+        response: HTTPResponse,
+    ) -> HTTPResponse:
+        """Complete the `response` to a `GET` request of a noun from the
+        encoded state returned by [`APIBase.get_raw()`]
+        [urest.api.base.APIBase.get_raw], without copying the state.
+
+        As for encoded states, the response carries an `ETag` formed from the
+        `state_version` of `cacheable` nouns, or from the CRC of the state
+        otherwise.
+        """
+
+        body, content_type = raw
+
+        if handler.cacheable:
+            etag = f'"{self._etag_prefix}{handler.state_version}-raw"'
+        else:
+            etag = f'"{len(body):x}-{crc32(body):08x}"'
+
+        if self._not_modified(response, if_none_match, etag, None):
+            return response
+
+        response.mimetype = content_type
+        response.body = body
+        response.header["ETag"] = etag
+        return response
+
+    def _not_modified(
+        self,
+        response: HTTPResponse,
+        if_none_match: Optional[str],
+        etag: str,
+        coding: Optional[str],
+    ) -> bool:
+        """Return `True`, and turn the `response` into '`304 Not Modified`', if
+        the `If-None-Match` header field of the request names the `etag` of the
+        body, or the tag of the body compressed with `coding`.
+
+        Both tags are accepted, as whether the body is compressed depends on its
+        size; which isn't known until the body has been encoded. Either tag
+        shows that the client holds the current state of the noun.
+        """
+
+        if if_none_match is None:
+            return False
+
+        tag = etag
+
+        if not etag_matches(if_none_match, tag):
+            if coding is None:
+                return False
+
+            tag = f'{etag[:-1]}-{coding}"'
+
+            if not etag_matches(if_none_match, tag):
+                return False
+
+        response.status = HTTPStatus.NOT_MODIFIED
+        response.header["ETag"] = tag
+        return True
+
+    def _compress(
+        self,
+        key: bytes,
+        handler: APIBase,
+        body: bytes,
+        coding: str,
+    ) -> bytes:
+        """Return the `body` compressed with `coding`, from the response cache
+        if the body of a `cacheable` noun has already been compressed at the
+        current state version."""
+
+        if not handler.cacheable:
+            return compress(body, coding)
+
+        key = key + b"+" + coding.encode()
+        version = handler.state_version
+        compressed = self.cache.get(key, version)
+
+        if compressed is None:
+            compressed = compress(body, coding)
+            self.cache.put(key, version, compressed)
+
+        return compressed
+
+    async def _get_body(
+        self,
+        key: bytes,
+        route: Route,
+        attribute: Optional[str],
+        codec: object,
+        stream: bool = False,
+    ) -> Optional[Union[bytes, JSONStreamEncoder]]:
+        """Return the encoded state of the noun of the `route` (or of a single
+        `attribute` of that noun), from the response cache if the state has not
+        changed since it was last encoded. Otherwise the state is read, and
+        encoded, once for all the concurrent requests for the same `key`.
+
+        If `stream` is `True`, the `codec` can encode in chunks, and the state
+        is likely to be longer than `stream_state_size` bytes once encoded, the
+        state is returned as a
+        [`JSONStreamEncoder`][urest.http.codec.JSONStreamEncoder] (and is not
+        cached).
+
+        Parameters
+        ----------
+
+        key: bytes
+            The name of the entry for the response in the cache.
+        route: Route
+            The route of the noun requested by the client.
+        attribute: Optional[str]
+            The (lowercase) name of the attribute requested by the client, or
+            `None` for the full state of the noun.
+        codec: object
+            The codec used to encode the state.
+        stream: bool
+            Allow the state to be returned in chunks.
+
+        Returns
+        -------
+
+        Optional[Union[bytes, JSONStreamEncoder]]
+            The encoded body of the response, or `None` if the noun has no such
+            `attribute`.
+
+        """
+
+        handler = route.handler
+        version = handler.state_version
+
+        if handler.cacheable:
+            body = self.cache.get(key, version)
+
+            if body is not None:
+                return body
+
+        # Concurrent requests share a single read of the state, and its encoded
+        # body ...
+        result = await self.flights.run(
+            key,
+            version,
+            self._read_state,
+            key,
+            version,
+            route,
+            attribute,
+            codec,
+        )
+
+        if result is None:
+            return None
+
+        state, body = result
+
+        if body is not None:
+            return body
+
+        # ... apart from the larger states, which are encoded separately for
+        # each client
+        if stream:
+            return codec.encode_stream(state)
+
+        return codec.encode(state)
+
+    async def _read_state(
+        self,
+        key: bytes,
+        version: int,
+        route: Route,
+        attribute: Optional[str],
+        codec: object,
+    ) -> Optional[tuple[dict[str, Union[str, int]], Optional[bytes]]]:
+        """Read the state of the noun of the `route` (or of a single
+        `attribute` of that noun), and encode it with the `codec`, caching the
+        body for `cacheable` nouns. Called by [`SingleFlight.run()`]
+        [urest.http.coalesce.SingleFlight.run] on behalf of all the requests
+        for the same `key` and state `version`.
+
+        Returns
+        -------
+
+        Optional[tuple[dict[str, Union[str, int]], Optional[bytes]]]
+            The state and its encoded body, or `None` if the noun has no such
+            `attribute`. The body is `None` if the state is likely to be longer
+            than `stream_state_size` bytes once encoded (and the `codec` can
+            encode in chunks), so that each request can choose how to encode
+            it.
+
+        """
+
+        handler = route.handler
+
+        if attribute is None:
+            state = await self._call(route, False, handler.get_state)
+
+            if (
+                hasattr(codec, "encode_stream")
+                and estimate_size(state, self.stream_state_size)
+                > self.stream_state_size
+            ):
+                return (state, None)
+        else:
+            value = await self._call(route, False, handler.get_attribute, attribute)
+
+            if value is None:
+                return None
+
+            state = {attribute: value}
+
+        body = codec.encode(state)
+
+        if handler.cacheable:
+            self.cache.put(key, version, body)
+
+        return (state, body)
+
+    async def _reject(self, status: HTTPStatus) -> HTTPResponse:
+        """Return a response to the client rejecting the request with the
+        given `status`, and closing the connection."""
+
+        return HTTPResponse(
+            body="<http><body><p>Invalid Request</p></body></http>",
+            status=status,
+            close=True,
+        )
 
     async def start(self) -> None:
         """Attach the method [`RESTServer.dispatch_noun()`]
@@ -746,12 +2591,25 @@ class RESTServer:
         if __debug__:
             print(f"SERVER: Started on {self.host}:{self.port}")
 
-        self._server = await asyncio.start_server(
-            self.dispatch_noun,
-            host=self.host,
-            port=self.port,
-            backlog=self.backlog,
-        )  # type: ignore
+        # Limit the buffer of each stream to the longest head, so that a head
+        # which is too long is refused before more of it is held in memory.
+        # The `limit` is not known to the streams of MicroPython, which read the
+        # head line by line instead (see `read_head()`)
+        try:
+            self._server = await asyncio.start_server(
+                self.dispatch_noun,
+                host=self.host,
+                port=self.port,
+                backlog=self.backlog,
+                limit=self.max_head_size,
+            )  # type: ignore
+        except TypeError:
+            self._server = await asyncio.start_server(
+                self.dispatch_noun,
+                host=self.host,
+                port=self.port,
+                backlog=self.backlog,
+            )  # type: ignore
 
     async def stop(self) -> None:
         """Remove the tasks from an event loop, in preparation for the
@@ -767,6 +2625,9 @@ class RESTServer:
             await self._server.wait_closed()
             self._server = None
 
+            for pool in self.executors.values():
+                pool.shutdown()
+
             # DEBUG
             if __debug__:
                 print("SERVER: Stopped")
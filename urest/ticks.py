@@ -0,0 +1,59 @@
+# This module, and all included code, is made available under the terms of the MIT
+# Licence
+#
+# Copyright (c) 2022-2023 David Love
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal in
+# the Software without restriction, including without limitation the rights to
+# use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of
+# the Software, and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""A very minimal 'implementation' of the `ticks_ms()`, `ticks_add()` and
+`ticks_diff()` functions from the MicroPython `time` module.
+
+Used to avoid import errors, and to enforce a single code base between
+CPython and MicroPython. Modules should import these functions as
+
+```python
+try:
+    from time import ticks_add, ticks_diff, ticks_ms
+except ImportError:
+    from urest.ticks import ticks_add, ticks_diff, ticks_ms
+```
+"""
+
+import time
+
+
+def ticks_ms() -> int:
+    """Return a monotonic counter of milliseconds, from an arbitrary reference
+    point. Only the difference between two values, from
+    [`ticks_diff()`][urest.ticks.ticks_diff], is meaningful."""
+
+    return time.monotonic_ns() // 1000000
+
+
+def ticks_add(ticks: int, delta: int) -> int:
+    """Return the counter value `delta` milliseconds (which may be negative)
+    after `ticks`. Unlike MicroPython, the CPython counter never wraps
+    around."""
+
+    return ticks + delta
+
+
+def ticks_diff(ticks1: int, ticks2: int) -> int:
+    """Return the (signed) number of milliseconds from `ticks2` to `ticks1`.
+    Unlike MicroPython, the CPython counter never wraps around."""
+
+    return ticks1 - ticks2